@@ -0,0 +1,302 @@
+import argparse
+import csv
+import io
+import json
+import os
+import zlib
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from letter_box_game import STATS_FILE_PATH, SOLUTIONS_DIR_PATH
+from lbg_archive import SolutionArchive
+from lbg_data_inspector import day_signature
+from lbg_puzzle_source import GAME_DATA_FILE_NAME
+from lbg_utils import parse_geometry
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), "LetterBoxed/analytics")
+RUNS_FILE_NAME = "runs.bin"
+DAYS_FILE_NAME = "days.npy"
+
+# Columns of the rows save_stats() appends to the statistics CSV, one per solve.
+# ourSolution and the best solution are kept out of the arrays. The board shape
+# is split into its number of sides and letters per side.
+STATS_COLUMNS = [
+    "date",
+    "par",
+    "super_set",
+    "num_solutions",
+    "num_best_sols",
+    "our_solution",
+    "our_solution_found",
+    "best_solution",
+    "break_out_counter",
+    "solve_time",
+    "board",
+]
+# Rows written before boards could have other shapes stop at solve_time, and are all of the NYT's
+OLD_STATS_COLUMNS = len(STATS_COLUMNS) - 1
+OLD_BOARD = "4x3"
+RUN_DTYPE = np.dtype([
+    ("date", "M8[D]"),
+    ("par", "i1"),
+    ("super_set", "S32"),
+    ("num_solutions", "i8"),
+    ("num_best_sols", "i8"),
+    ("our_solution_found", "?"),
+    ("break_out_counter", "i4"),
+    ("solve_time", "f8"),
+    ("num_sides", "i1"),
+    ("side_len", "i1"),
+])
+# The runs file is a header followed by RUN_DTYPE records: a magic string, how many
+# bytes of the CSV have been read into it and how many records it has. New rows
+# are appended and the header updated last, so a write cut short is just ignored.
+RUNS_MAGIC = b"LBGRUNS2"
+RUNS_HEADER_DTYPE = np.dtype("<u8")
+RUNS_HEADER_SIZE = len(RUNS_MAGIC) + 2 * RUNS_HEADER_DTYPE.itemsize
+
+# Solutions of up to this many words are counted per archived day
+MAX_COUNTED_WORDS = 8
+DAY_DTYPE = np.dtype([
+    ("date", "M8[D]"),
+    # -1 if the day has no saved game data or solutions
+    ("par", "i1"),
+    # num_sols[n] is the number of archived n-word solutions
+    ("num_sols", "i8", (MAX_COUNTED_WORDS + 1,)),
+    # checksum of the day's file signature, to tell when it needs counting again
+    ("signature", "u8"),
+])
+
+
+def parse_stats_row(fields) -> Tuple:
+    """One statistics CSV row as a RUN_DTYPE record. Raises ValueError if it is malformed."""
+    if len(fields) == OLD_STATS_COLUMNS:
+        fields = list(fields) + [OLD_BOARD]
+    if len(fields) != len(STATS_COLUMNS):
+        raise ValueError(f"expected {len(STATS_COLUMNS)} columns, got {len(fields)}")
+    the_date, par, super_set, num_solutions, num_best_sols, _, found, _, counter, solve_time, board = fields
+    num_sides, side_len = parse_geometry(board)
+    return (
+        np.datetime64(the_date, "D"),
+        int(par),
+        super_set.encode(),
+        int(num_solutions),
+        int(num_best_sols),
+        found == "True",
+        int(counter),
+        float(solve_time),
+        num_sides,
+        side_len,
+    )
+
+
+def group_mean(values: np.ndarray, keys: np.ndarray) -> Dict:
+    """{key: mean of the values with that key}"""
+    if len(keys) == 0:
+        return {}
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse, weights=values)
+    counts = np.bincount(inverse)
+    return {k.item(): s / c for k, s, c in zip(uniq, sums, counts)}
+
+
+class LBGAnalytics:
+    """
+    The whole history of solves (from the statistics CSV) and of the solutions
+    archive, as NumPy columns for queries across every date at once.
+
+    `runs` has one entry per row of the CSV and `days` one per archived day,
+    both as {column name: array}. They are cached under `cache_path`. Only
+    CSV rows appended since the last time and days whose files changed are
+    read again.
+    """
+
+    def __init__(
+        self,
+        stats_path: str = STATS_FILE_PATH,
+        archive_root: str = SOLUTIONS_DIR_PATH,
+        cache_path: str = DEFAULT_CACHE_PATH,
+    ):
+        self.stats_path = stats_path
+        self.archive_root = archive_root
+        self.cache_path = cache_path
+        self.runs: Dict[str, np.ndarray] = {}
+        self.days: Dict[str, np.ndarray] = {}
+        self.refresh()
+
+    @property
+    def runs_path(self) -> str:
+        return os.path.join(self.cache_path, RUNS_FILE_NAME)
+
+    @property
+    def days_path(self) -> str:
+        return os.path.join(self.cache_path, DAYS_FILE_NAME)
+
+    def refresh(self):
+        os.makedirs(self.cache_path, exist_ok=True)
+        runs = self._refresh_runs()
+        days = self._refresh_days()
+        self.runs = {name: runs[name] for name in RUN_DTYPE.names}
+        self.days = {name: days[name] for name in DAY_DTYPE.names}
+
+    def _read_runs_header(self) -> Tuple[int, int]:
+        if not os.path.isfile(self.runs_path):
+            return 0, 0
+        with open(self.runs_path, "rb") as f:
+            header = f.read(RUNS_HEADER_SIZE)
+        if len(header) < RUNS_HEADER_SIZE or not header.startswith(RUNS_MAGIC):
+            print(f"rebuilding {self.runs_path}")
+            return 0, 0
+        offset, count = np.frombuffer(header[len(RUNS_MAGIC):], dtype=RUNS_HEADER_DTYPE)
+        return int(offset), int(count)
+
+    def _refresh_runs(self) -> np.ndarray:
+        offset, count = self._read_runs_header()
+        size = os.path.getsize(self.stats_path) if os.path.isfile(self.stats_path) else 0
+        # The CSV is only ever appended to. If it got shorter, start over
+        if size < offset:
+            offset, count = 0, 0
+
+        if size > offset:
+            new_rows, offset = self._parse_stats(offset)
+            self._append_runs(new_rows, offset, count)
+            count += len(new_rows)
+
+        if count == 0:
+            return np.zeros(0, dtype=RUN_DTYPE)
+        return np.fromfile(self.runs_path, dtype=RUN_DTYPE, count=count, offset=RUNS_HEADER_SIZE)
+
+    def _parse_stats(self, offset: int) -> Tuple[np.ndarray, int]:
+        """The complete rows after byte `offset` of the CSV, and where they end."""
+        with open(self.stats_path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        # A row still being written is left for next time
+        end = data.rfind(b"\n") + 1
+
+        rows = []
+        for fields in csv.reader(io.StringIO(data[:end].decode())):
+            if not fields:
+                continue
+            try:
+                rows.append(parse_stats_row(fields))
+            except ValueError as e:
+                print(f"skipping stats row {fields}: {e}")
+        return np.array(rows, dtype=RUN_DTYPE), offset + end
+
+    def _append_runs(self, rows: np.ndarray, offset: int, count: int):
+        mode = "r+b" if count > 0 else "wb"
+        with open(self.runs_path, mode) as f:
+            if count == 0:
+                f.write(RUNS_MAGIC + np.zeros(2, dtype=RUNS_HEADER_DTYPE).tobytes())
+            f.seek(RUNS_HEADER_SIZE + count * RUN_DTYPE.itemsize)
+            f.write(rows.tobytes())
+            f.truncate()
+            f.flush()
+            f.seek(len(RUNS_MAGIC))
+            f.write(np.array([offset, count + len(rows)], dtype=RUNS_HEADER_DTYPE).tobytes())
+
+    def _refresh_days(self) -> np.ndarray:
+        cached = {}
+        if os.path.isfile(self.days_path):
+            for day in np.load(self.days_path):
+                cached[day["date"]] = day
+
+        days = []
+        changed = False
+        names = sorted(os.listdir(self.archive_root)) if os.path.isdir(self.archive_root) else []
+        for name in names:
+            data_root = os.path.join(self.archive_root, name)
+            try:
+                the_date = np.datetime64(name, "D")
+            except ValueError:
+                continue
+            if not os.path.isdir(data_root):
+                continue
+
+            signature = self._day_checksum(data_root)
+            day = cached.pop(the_date, None)
+            if day is None or day["signature"] != signature:
+                day = self._count_day(data_root, the_date, signature)
+                changed = True
+            days.append(day)
+
+        # Days that are no longer in the archive count as a change too
+        if changed or cached:
+            table = np.array(days, dtype=DAY_DTYPE)
+            np.save(self.days_path, table)
+            return table
+        return np.array(days, dtype=DAY_DTYPE)
+
+    @staticmethod
+    def _day_checksum(data_root: str) -> int:
+        signature = list(day_signature(data_root))
+        game_data_path = os.path.join(data_root, GAME_DATA_FILE_NAME)
+        if os.path.isfile(game_data_path):
+            st = os.stat(game_data_path)
+            signature.append((GAME_DATA_FILE_NAME, st.st_mtime_ns, st.st_size))
+        return zlib.crc32(repr(signature).encode())
+
+    @staticmethod
+    def _count_day(data_root: str, the_date: np.datetime64, signature: int) -> np.void:
+        day = np.zeros((), dtype=DAY_DTYPE)
+        day["date"] = the_date
+        day["signature"] = signature
+
+        archive = SolutionArchive(data_root)
+        lengths = archive.lengths()
+        for length in lengths:
+            if length <= MAX_COUNTED_WORDS:
+                day["num_sols"][length] = archive.count(length)
+
+        # Same as LBGDataInspector.find_par() when there is no game data
+        game_data_path = os.path.join(data_root, GAME_DATA_FILE_NAME)
+        if os.path.isfile(game_data_path):
+            with open(game_data_path, "r") as f:
+                day["par"] = json.load(f)["par"]
+        else:
+            day["par"] = max(lengths, default=-1)
+        return day[()]
+
+    def date_mask(self, table: Dict[str, np.ndarray], start: Optional[str] = None, end: Optional[str] = None) -> np.ndarray:
+        """Which entries of `table` (self.runs or self.days) are dated from `start` to `end`, inclusive."""
+        mask = np.ones(len(table["date"]), dtype=bool)
+        if start is not None:
+            mask &= table["date"] >= np.datetime64(start, "D")
+        if end is not None:
+            mask &= table["date"] <= np.datetime64(end, "D")
+        return mask
+
+    def mean_by(self, table: Dict[str, np.ndarray], column: str, by: str, mask: Optional[np.ndarray] = None) -> Dict:
+        """{value of `by`: mean of `column`} over `table`, e.g. mean_by(self.runs, "solve_time", "par")."""
+        values, keys = table[column], table[by]
+        if mask is not None:
+            values, keys = values[mask], keys[mask]
+        return group_mean(values.astype(np.float64), keys)
+
+    def solutions_by_par(self, num_words: int = 2) -> Dict[int, float]:
+        """Average number of archived `num_words`-word solutions per day, by par."""
+        known = self.days["par"] >= 0
+        return group_mean(self.days["num_sols"][known, num_words].astype(np.float64), self.days["par"][known])
+
+    def our_solution_found_rate(self, by: Optional[str] = None):
+        """Share of solves that found NYT's own solution, overall or by the runs column `by`."""
+        found = self.runs["our_solution_found"].astype(np.float64)
+        if by is None:
+            return float(found.mean()) if len(found) else None
+        return group_mean(found, self.runs[by])
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--num-words", type=int, default=2, help="number of words of the solutions averaged by par")
+    args = parser.parse_args()
+
+    analytics = LBGAnalytics()
+    print(f"{len(analytics.runs['date'])} solves over {len(analytics.days['date'])} archived days")
+    print(f"Average {args.num_words}-word solutions by par: {analytics.solutions_by_par(args.num_words)}")
+    print(f"NYT solution found: {analytics.our_solution_found_rate()}")
+    print(f"NYT solution found by par: {analytics.our_solution_found_rate('par')}")
+    print(f"Average solve time by break-out counter: {analytics.mean_by(analytics.runs, 'solve_time', 'break_out_counter')}")
@@ -0,0 +1,421 @@
+from __future__ import annotations
+
+import argparse
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from lbg_utils import iter_decode, lazy_import
+
+np = lazy_import("numpy")
+
+WORD_TABLE_FILE_NAME = "words.txt"
+# Solutions are stored as word ids into the day's word table, one little-endian
+# uint16 per word. Every solution in a length file has the same number of words,
+# so a file is just a flat (num solutions x length) array with no header.
+WORD_ID_DTYPE = "<u2"
+WORD_ID_SIZE = 2
+MAX_WORD_ID = 0xFFFF
+SOLUTION_FILE_PATTERN = re.compile(r"length_(\d+)_solutions\.bin")
+LEGACY_SOLUTION_FILE_PATTERN = re.compile(r"length_(\d+)_solutions\.txt")
+# The shortest solutions of each total number of letters, see TotalLengthArchive
+TOTAL_LENGTH_FILE_PATTERN = re.compile(r"total_length_(\d+)_(\d+)_words\.bin")
+LEGACY_TOTAL_LENGTH_FILE_PATTERN = re.compile(r"total_length_(\d+)_solutions\.txt")
+
+# Each length file has a sidecar hash index so new solutions can be checked
+# against it without reading the file. The index is an open addressing table
+# of 64-bit solution hashes, 0 marking an empty slot, preceded by one uint64
+# holding the number of entries.
+HASH_DTYPE = "<u8"
+MIN_HASH_CAPACITY = 1024
+
+# Number of solutions read at a time when streaming a length file
+STREAM_CHUNK_SIZE = 4096
+
+
+def solution_file_name(length: int) -> str:
+    return f"length_{length}_solutions.bin"
+
+
+def legacy_solution_file_name(length: int) -> str:
+    return f"length_{length}_solutions.txt"
+
+
+def hash_index_file_name(length: int) -> str:
+    return f"length_{length}_solutions.hidx"
+
+
+def total_length_file_name(total_length: int, length: int) -> str:
+    return f"total_length_{total_length}_{length}_words.bin"
+
+
+def solution_hashes(ids: np.ndarray) -> np.ndarray:
+    """64-bit hash of every row of word ids (FNV-1a over the ids, then a final mix)."""
+    h = np.full(len(ids), 0xCBF29CE484222325, dtype=np.uint64)
+    for col in ids.T.astype(np.uint64):
+        h = (h ^ col) * np.uint64(0x100000001B3)
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xFF51AFD7ED558CCD)
+    h ^= h >> np.uint64(33)
+    h[h == 0] = 1
+    return h
+
+
+def stored_lengths(data_root: str) -> List[int]:
+    """Solution lengths that have a file in `data_root`, in either format."""
+    found = set()
+    for f in os.listdir(data_root):
+        match = SOLUTION_FILE_PATTERN.fullmatch(f) or LEGACY_SOLUTION_FILE_PATTERN.fullmatch(f)
+        if match:
+            found.add(int(match.group(1)))
+    return sorted(found)
+
+
+def stored_total_lengths(data_root: str) -> List[int]:
+    """Total letter lengths that have shortest solutions stored in `data_root`, in either format."""
+    found = set()
+    for f in os.listdir(data_root):
+        match = TOTAL_LENGTH_FILE_PATTERN.fullmatch(f) or LEGACY_TOTAL_LENGTH_FILE_PATTERN.fullmatch(f)
+        if match:
+            found.add(int(match.group(1)))
+    return sorted(found)
+
+
+class SolutionHashIndex:
+    """
+    Persistent set of solution hashes, memory-mapped from `path`.
+    Adding m hashes touches O(m) slots, however many are already stored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if not os.path.isfile(self.path):
+            self._create(self.path, MIN_HASH_CAPACITY)
+        self._open()
+
+    @staticmethod
+    def _create(path: str, capacity: int):
+        with open(path, "wb") as f:
+            f.write(np.zeros(capacity + 1, dtype=HASH_DTYPE).tobytes())
+
+    def _open(self):
+        self.table = np.memmap(self.path, dtype=HASH_DTYPE, mode="r+")
+        self.slots = self.table[1:]
+        self.mask = len(self.slots) - 1
+
+    def __len__(self):
+        return int(self.table[0])
+
+    def _insert(self, h: int) -> bool:
+        slots, mask = self.slots, self.mask
+        i = h & mask
+        while True:
+            current = int(slots[i])
+            if current == h:
+                return False
+            if current == 0:
+                slots[i] = h
+                return True
+            i = (i + 1) & mask
+
+    def add(self, hashes: np.ndarray) -> np.ndarray:
+        """Insert `hashes`, returning a mask of the ones that weren't there before."""
+        # Keep the table at most half full
+        capacity = len(self.slots)
+        while (len(self) + len(hashes)) * 2 > capacity:
+            capacity *= 2
+        if capacity != len(self.slots):
+            self._grow(capacity)
+
+        is_new = np.array([self._insert(h) for h in hashes.tolist()], dtype=bool)
+        self.table[0] = len(self) + int(is_new.sum())
+        return is_new
+
+    def _grow(self, capacity: int):
+        stored = self.slots[self.slots != 0].copy()
+        count = len(self)
+        del self.table, self.slots
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        self._create(tmp_path, capacity)
+        os.replace(tmp_path, self.path)
+        self._open()
+        for h in stored.tolist():
+            self._insert(h)
+        self.table[0] = count
+
+    def flush(self):
+        self.table.flush()
+
+
+class SolutionArchive:
+    """
+    Reader/writer for one day's directory of the solutions archive.
+
+    Days that haven't been migrated yet still have the old text files, in
+    `str(list)` form. Those are read transparently, and converted the first
+    time new solutions of that length are written.
+    """
+
+    def __init__(self, data_root: str):
+        self.data_root = data_root
+        self.words: List[str] = []
+        self.word_ids: Dict[str, int] = {}
+
+        table_path = os.path.join(self.data_root, WORD_TABLE_FILE_NAME)
+        if os.path.isfile(table_path):
+            with open(table_path, "r") as f:
+                for line in f:
+                    self._add_word(line.rstrip("\n"))
+
+    def _add_word(self, word: str) -> int:
+        self.word_ids[word] = len(self.words)
+        self.words.append(word)
+        return self.word_ids[word]
+
+    def path(self, length: int) -> str:
+        return os.path.join(self.data_root, solution_file_name(length))
+
+    def legacy_path(self, length: int) -> str:
+        return os.path.join(self.data_root, legacy_solution_file_name(length))
+
+    def hash_index_path(self, length: int) -> str:
+        return os.path.join(self.data_root, hash_index_file_name(length))
+
+    def num_stored(self, length: int) -> int:
+        if not os.path.isfile(self.path(length)):
+            return 0
+        return os.path.getsize(self.path(length)) // (length * WORD_ID_SIZE)
+
+    def hash_index(self, length: int) -> SolutionHashIndex:
+        """
+        The hash index of the `length` file. It is (re)built from the file if
+        it is missing or doesn't agree with it, e.g. after a migration or an
+        interrupted write.
+        """
+        index = SolutionHashIndex(self.hash_index_path(length))
+        if len(index) == self.num_stored(length):
+            return index
+
+        print(f"rebuilding {self.hash_index_path(length)}")
+        del index
+        os.remove(self.hash_index_path(length))
+        index = SolutionHashIndex(self.hash_index_path(length))
+        stored = self.read_ids(length)
+        if stored is not None:
+            index.add(solution_hashes(stored))
+        return index
+
+    def lengths(self) -> List[int]:
+        return stored_lengths(self.data_root)
+
+    def exists(self, length: int) -> bool:
+        return os.path.isfile(self.path(length)) or os.path.isfile(self.legacy_path(length))
+
+    def read_ids(self, length: int) -> Optional[np.ndarray]:
+        """The stored solutions of `length` words as a (num solutions x length) array of word ids."""
+        if not os.path.isfile(self.path(length)):
+            if not os.path.isfile(self.legacy_path(length)):
+                return None
+            return self.encode(self._read_legacy(length), length)
+        return np.fromfile(self.path(length), dtype=WORD_ID_DTYPE).reshape(-1, length)
+
+    def read(self, length: int) -> Optional[List[List[str]]]:
+        """The stored solutions of `length` words, or None if there is no file for it."""
+        if not os.path.isfile(self.path(length)) and os.path.isfile(self.legacy_path(length)):
+            return self._read_legacy(length)
+        ids = self.read_ids(length)
+        if ids is None:
+            return None
+        return [[self.words[i] for i in row] for row in ids.tolist()]
+
+    def count(self, length: int) -> int:
+        """Number of stored `length`-word solutions, without decoding any of them."""
+        if os.path.isfile(self.path(length)):
+            return self.num_stored(length)
+        if not os.path.isfile(self.legacy_path(length)):
+            return 0
+        with open(self.legacy_path(length), "r") as f:
+            return sum(1 for l in f if l.strip())
+
+    def iter_ids(self, length: int, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[np.ndarray]:
+        """Stream the stored word ids in (at most chunk_size x length) arrays."""
+        if not os.path.isfile(self.path(length)):
+            ids = self.read_ids(length)
+            if ids is not None:
+                for start in range(0, len(ids), chunk_size):
+                    yield ids[start:start + chunk_size]
+            return
+
+        with open(self.path(length), "rb") as f:
+            while True:
+                chunk = np.fromfile(f, dtype=WORD_ID_DTYPE, count=chunk_size * length)
+                if chunk.size == 0:
+                    return
+                yield chunk.reshape(-1, length)
+
+    def iter_solutions(self, length: int) -> Iterator[List[str]]:
+        """
+        Stream the stored `length`-word solutions one at a time, in constant
+        memory. Yields nothing if there is no file for `length`.
+        """
+        if not os.path.isfile(self.path(length)):
+            if os.path.isfile(self.legacy_path(length)):
+                with open(self.legacy_path(length), "r") as f:
+                    yield from iter_decode(l for l in f if l.strip())
+            return
+
+        words = self.words
+        for chunk in self.iter_ids(length):
+            for row in chunk.tolist():
+                yield [words[i] for i in row]
+
+    def _read_legacy(self, length: int) -> List[List[str]]:
+        with open(self.legacy_path(length), "r") as f:
+            return list(iter_decode(l for l in f if l.strip()))
+
+    def encode(self, solutions: Iterable[List[str]], length: int) -> np.ndarray:
+        """Word ids of `solutions`, adding any new words to the in-memory word table."""
+        rows = [
+            [self.word_ids[w] if w in self.word_ids else self._add_word(w) for w in s]
+            for s in solutions
+        ]
+        if len(self.words) > MAX_WORD_ID + 1:
+            raise ValueError(f"word table for {self.data_root} outgrew {WORD_ID_DTYPE} word ids")
+        return np.array(rows, dtype=WORD_ID_DTYPE).reshape(-1, length)
+
+    def write(self, length: int, solutions: List[List[str]]):
+        """
+        Add the `length`-word `solutions` that aren't stored yet. The file is
+        created even if there is nothing to add, since the lengths that have a
+        file tell readers what the par was.
+        """
+        if os.path.isfile(self.legacy_path(length)) and not os.path.isfile(self.path(length)):
+            self.migrate(length)
+
+        num_words = len(self.words)
+        new_ids = self.encode(solutions, length)
+
+        index = self.hash_index(length)
+        is_new = index.add(solution_hashes(new_ids))
+
+        # The word table has to be on disk before any solution refers to it.
+        # The index is flushed last: if we stop halfway its entry count won't
+        # match the file and it gets rebuilt next time.
+        self._save_words(num_words)
+        with open(self.path(length), "ab") as f:
+            f.write(new_ids[is_new].tobytes())
+        index.flush()
+
+    def _save_words(self, start: int):
+        if start == len(self.words):
+            return
+        with open(os.path.join(self.data_root, WORD_TABLE_FILE_NAME), "a") as f:
+            f.write("".join(w + "\n" for w in self.words[start:]))
+
+    def migrate(self, length: int):
+        """Convert the legacy text file of `length`-word solutions and remove it."""
+        solutions = self._read_legacy(length)
+        num_words = len(self.words)
+        ids = self.encode(solutions, length)
+        self._save_words(num_words)
+        with open(self.path(length), "wb") as f:
+            f.write(ids.tobytes())
+
+        if self.read(length) != solutions:
+            raise RuntimeError(f"migration check failed for {self.legacy_path(length)}")
+        os.remove(self.legacy_path(length))
+
+    def migrate_all(self):
+        for length in self.lengths():
+            if os.path.isfile(self.legacy_path(length)):
+                print(f"migrating {self.legacy_path(length)}")
+                self.migrate(length)
+
+
+class TotalLengthArchive(SolutionArchive):
+    """
+    The shortest solutions of `total_length` letters of one day. They are
+    stored like the rest of the day's solutions, a file of word ids per
+    number of words, with the day's word table.
+
+    The old text files held solutions of any number of words together, so
+    they are converted by migrate_total_lengths() rather than one length at
+    a time.
+    """
+
+    def __init__(self, data_root: str, total_length: int):
+        super().__init__(data_root)
+        self.total_length = total_length
+
+    def path(self, length: int) -> str:
+        return os.path.join(self.data_root, total_length_file_name(self.total_length, length))
+
+    def legacy_path(self, length: int) -> str:
+        # Never written, so never found
+        return os.path.join(self.data_root, f"total_length_{self.total_length}_{length}_words.txt")
+
+    def hash_index_path(self, length: int) -> str:
+        return os.path.join(self.data_root, f"total_length_{self.total_length}_{length}_words.hidx")
+
+    def lengths(self) -> List[int]:
+        found = []
+        for f in os.listdir(self.data_root):
+            match = TOTAL_LENGTH_FILE_PATTERN.fullmatch(f)
+            if match and int(match.group(1)) == self.total_length:
+                found.append(int(match.group(2)))
+        return sorted(found)
+
+    def read_all(self) -> List[List[str]]:
+        """The stored solutions of every number of words, fewest words first."""
+        solutions = []
+        for length in self.lengths():
+            solutions += self.read(length)
+        # A day that hasn't been migrated yet
+        legacy_path = os.path.join(self.data_root, f"total_length_{self.total_length}_solutions.txt")
+        if os.path.exists(legacy_path):
+            with open(legacy_path, "r") as legacy:
+                for s in iter_decode(l for l in legacy if l.strip()):
+                    if s not in solutions:
+                        solutions.append(s)
+        return solutions
+
+    def write_all(self, solutions: List[List[str]]):
+        """Add the `solutions` that aren't stored yet, whatever their number of words."""
+        for length in sorted(set(len(s) for s in solutions)):
+            self.write(length, [s for s in solutions if len(s) == length])
+
+
+def migrate_total_lengths(data_root: str):
+    """Convert the day's legacy total_length_N_solutions.txt files and remove them."""
+    for f in sorted(os.listdir(data_root)):
+        match = LEGACY_TOTAL_LENGTH_FILE_PATTERN.fullmatch(f)
+        if not match:
+            continue
+        path = os.path.join(data_root, f)
+        print(f"migrating {path}")
+        with open(path, "r") as legacy:
+            solutions = list(iter_decode(l for l in legacy if l.strip()))
+        archive = TotalLengthArchive(data_root, int(match.group(1)))
+        archive.write_all(solutions)
+        if sorted(map(tuple, archive.read_all())) != sorted(set(map(tuple, solutions))):
+            raise RuntimeError(f"migration check failed for {path}")
+        os.remove(path)
+
+
+def migrate_archive(archive_root: str):
+    """One-shot conversion of every day in the archive to the word id format."""
+    for day in sorted(os.listdir(archive_root)):
+        data_root = os.path.join(archive_root, day)
+        if os.path.isdir(data_root):
+            SolutionArchive(data_root).migrate_all()
+            migrate_total_lengths(data_root)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("archive_root", nargs="?", default=os.path.join(os.path.expanduser("~"), "LetterBoxed/solutions_archive"), help="root of the solutions archive to migrate")
+    args = parser.parse_args()
+
+    migrate_archive(args.archive_root)
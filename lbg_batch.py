@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import time
+import concurrent.futures
+from typing import List, Optional, Tuple
+
+from letter_box_game import (
+    LetterBoxGame,
+    SOLUTIONS_DIR_PATH,
+    SOLVE_MODES,
+    init_dictionary_worker,
+    keep_worker_dictionary,
+    load_dictionary,
+    worker_dictionary,
+)
+from lbg_dictionary import DictionaryIndex
+from lbg_puzzle_source import GAME_DATA_FILE_NAME, ArchiveSource, ExplicitSource, PuzzleSource
+
+
+def archived_sources(dates: Optional[List[str]] = None, archive_root: str = SOLUTIONS_DIR_PATH) -> List[PuzzleSource]:
+    """Sources for the given archived dates, or for every date with saved game data."""
+    if dates is None:
+        dates = sorted(
+            d for d in os.listdir(archive_root)
+            if os.path.isfile(os.path.join(archive_root, d, GAME_DATA_FILE_NAME))
+        )
+    return [ArchiveSource(archive_root, d, scrape=False) for d in dates]
+
+
+def file_sources(path: str) -> List[PuzzleSource]:
+    """
+    Sources for the boards in `path`: either a JSON list of gameData dicts
+    or one gameData dict per line.
+
+    Each board's solutions and stats go to the archive directory named after
+    its date, so every board needs a date of its own. Raises ValueError if
+    one has none, or shares it with another board.
+    """
+    with open(path, "r") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        boards = json.loads(text)
+    else:
+        boards = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    dates = set()
+    for i, board in enumerate(boards):
+        the_date = board.get("date")
+        if not the_date:
+            raise ValueError(f"board {i} in {path} has no date")
+        if the_date in dates:
+            raise ValueError(f"board {i} in {path} has the same date as another board, {the_date}")
+        dates.add(the_date)
+
+    return [ExplicitSource.from_game_data(b) for b in boards]
+
+
+def solve_board(
+    source: PuzzleSource, dict_index: DictionaryIndex, mode: str, counter: Optional[int]
+) -> Tuple[LetterBoxGame, Tuple[str, int, float]]:
+    lbg = LetterBoxGame(source, dict_index)
+    lbg.solve_mode = mode
+    if counter is not None:
+        lbg.break_out_counter = counter
+    lbg.solve()
+    return lbg, (source.date, len(lbg.solutions), lbg.solve_time)
+
+
+def _solve_in_worker(source: PuzzleSource, mode: str, counter: Optional[int]):
+    lbg, result = solve_board(source, worker_dictionary(), mode, counter)
+    # Keep whatever the board pruned from the dictionary for the next board
+    keep_worker_dictionary(lbg.dict_index)
+    return result
+
+
+def solve_batch(
+    sources: List[PuzzleSource],
+    jobs: int = 1,
+    mode: str = "monte-carlo",
+    counter: Optional[int] = None,
+) -> List[Tuple[str, int, float]]:
+    """
+    Solve every board in `sources`, writing each one's solution directory and
+    stats row. The dictionary is loaded once (once per worker when `jobs` > 1)
+    and reused for every board.
+
+    Returns a (date, number of solutions, solve time) tuple per board.
+
+    NOTE: workers prune their own copy of the dictionary, so with several jobs
+    the last one to save it wins. Pruning is idempotent, so anything lost is
+    simply pruned again the next time that board's letters come up.
+    """
+    if jobs <= 1:
+        results = []
+        dict_index = load_dictionary()
+        for source in sources:
+            lbg, result = solve_board(source, dict_index, mode, counter)
+            dict_index = lbg.dict_index
+            results.append(result)
+        return results
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=init_dictionary_worker) as pool:
+        return list(pool.map(
+            _solve_in_worker, sources, [mode] * len(sources), [counter] * len(sources)
+        ))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dates", nargs="*", help="archived dates (YYYY-MM-DD) to re-solve. Defaults to every archived date")
+    parser.add_argument("-f", "--file", type=str, help="solve the boards in [file] (JSON list or JSON lines of gameData) instead")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of boards solved in parallel")
+    parser.add_argument("-m", "--mode", choices=SOLVE_MODES, default="monte-carlo", help="solve mode used for every board")
+    parser.add_argument("-c", "--counter", type=int, help="break-out counter for the monte-carlo mode")
+    args = parser.parse_args()
+
+    if args.file is not None:
+        sources = file_sources(args.file)
+    else:
+        sources = archived_sources(args.dates or None)
+
+    start = time.time()
+    results = solve_batch(sources, args.jobs, args.mode, args.counter)
+    for the_date, num_sols, solve_time in results:
+        print(f"{the_date}: {num_sols} solutions in {solve_time}sec")
+    print(f"Solved {len(results)} boards in {round(time.time() - start, 3)}sec")
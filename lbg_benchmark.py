@@ -0,0 +1,330 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+import letter_box_game
+from letter_box_game import LetterBoxGame, MIN_WORD_LEN, SOLVE_MODES, load_dictionary
+from lbg_archive import SolutionArchive
+from lbg_batch import file_sources
+from lbg_data_inspector import LBGDataInspector, drop_day_index
+from lbg_dictionary import DictionaryIndex
+from lbg_puzzle_source import ExplicitSource, PuzzleSource
+from lbg_utils import decode, parse_geometry
+
+# Fixed boards (sides, dictionary, par) the benchmark is run on, one gameData dict per line.
+# They have made-up dates, so their results never mix with real archived days.
+BENCHMARK_BOARDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_boards.jsonl")
+DEFAULT_MODE = "exhaustive"
+DEFAULT_SEED = 1234
+DEFAULT_REPEAT = 3
+
+# Modules whose cold import time is tracked, the ones tools and the tests start from
+IMPORT_MODULES = ["lbg_utils", "lbg_archive", "lbg_data_inspector", "lbg_puzzle_source", "letter_box_game"]
+
+# (number of sides, letters per side) of the random boards the scaling benchmark solves
+SCALING_GEOMETRIES = [(3, 3), (4, 3), (5, 3), (4, 4), (6, 3), (5, 4), (6, 4)]
+SCALING_BOARDS = 5
+SCALING_PAR = 3
+# Seconds each scaling solve gets, so the big boards can't run away
+SCALING_TIME_BUDGET = 30.0
+
+
+def benchmark_words() -> List[str]:
+    """The word list load_dictionary() builds the dictionary from when there is no saved one."""
+    from english_words import get_english_words_set
+    return sorted(
+        w for w in get_english_words_set(["web2"], lower=True, alpha=True)
+        if len(w) >= MIN_WORD_LEN
+    )
+
+
+@contextlib.contextmanager
+def isolated_paths(work_dir: str) -> Iterator[None]:
+    """Point everything LetterBoxGame reads and writes at `work_dir` instead of $HOME."""
+    names = ["ENG_DICT_FILE_PATH", "ENG_DICT_INDEX_PATH", "STATS_FILE_PATH", "SOLUTIONS_DIR_PATH"]
+    saved = {name: getattr(letter_box_game, name) for name in names}
+    letter_box_game.ENG_DICT_FILE_PATH = os.path.join(work_dir, "eng_dictionary.txt")
+    letter_box_game.ENG_DICT_INDEX_PATH = os.path.join(work_dir, "eng_dictionary.idx")
+    letter_box_game.STATS_FILE_PATH = os.path.join(work_dir, "LetterBoxedStatistics.csv")
+    letter_box_game.SOLUTIONS_DIR_PATH = os.path.join(work_dir, "solutions_archive")
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(letter_box_game, name, value)
+
+
+class PhaseRecorder:
+    """Runs the phases of one pass, recording how long each took and, if `trace`, its peak memory."""
+
+    def __init__(self, trace: bool):
+        self.trace = trace
+        self.records: List[Dict] = []
+        # board -> number of candidates and solutions it had, to tell whether a change altered the results
+        self.boards: Dict[str, Dict] = {}
+
+    def run(self, board: str, phase: str, fn: Callable):
+        # Peak memory is what the phase allocated on top of what was already there
+        if self.trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            seconds = time.perf_counter() - start
+            peak_bytes = None
+            if self.trace:
+                peak_bytes = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            self.records.append({"board": board, "phase": phase, "seconds": seconds, "peak_bytes": peak_bytes})
+
+
+def run_board(recorder: PhaseRecorder, source: PuzzleSource, dict_index: DictionaryIndex,
+              mode: str, seed: int, counter: Optional[int]) -> Dict:
+    board = source.date
+    random.seed(seed)
+
+    def setup():
+        lbg = LetterBoxGame(source, dict_index)
+        lbg.solve_mode = mode
+        if counter is not None:
+            lbg.break_out_counter = counter
+        return lbg
+
+    lbg = recorder.run(board, "game_setup", setup)
+    candidates = recorder.run(board, "candidate_filtering", lambda: dict_index.candidates(lbg.letter_sets))
+    recorder.run(board, "solve", lambda: lbg.solve(save=False))
+
+    lengths = range(2, lbg.solution_standard + 1)
+
+    def save_solution_files():
+        for n in reversed(lengths):
+            lbg.save_solution_file(n)
+
+    recorder.run(board, "save_solution_file", save_solution_files)
+    recorder.run(board, "save_stats", lbg.save_stats)
+
+    archive = SolutionArchive(lbg.solution_path)
+    recorder.run(board, "archive_read", lambda: [archive.read(n) for n in lengths])
+
+    lines = [str(s) + "\n" for s in lbg.solutions]
+    recorder.run(board, "decode", lambda: decode(lines))
+
+    def inspector_queries():
+        drop_day_index(lbg.solution_path)
+        inspector = LBGDataInspector(board, letter_box_game.SOLUTIONS_DIR_PATH)
+        sols = inspector.get_sols(inspector.par)
+        if sols:
+            inspector.get_range_of_sols_length(sols)
+        inspector.get_length_histogram(inspector.par)
+        inspector.get_sols_with_word(lbg.stats.most_coveraging_word)
+
+    recorder.run(board, "inspector_queries", inspector_queries)
+
+    return {"candidates": len(candidates), "solutions": len(lbg.solutions)}
+
+
+def run_pass(sources: List[PuzzleSource], words: List[str], mode: str, seed: int,
+             counter: Optional[int], trace: bool) -> PhaseRecorder:
+    """One pass over every phase and board, in a fresh scratch directory."""
+    recorder = PhaseRecorder(trace)
+    with tempfile.TemporaryDirectory() as work_dir, isolated_paths(work_dir), \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        recorder.run(None, "dictionary_build", lambda: DictionaryIndex(words).save(letter_box_game.ENG_DICT_INDEX_PATH))
+        dict_index = recorder.run(None, "dictionary_load", load_dictionary)
+
+        for source in sources:
+            recorder.boards[source.date] = run_board(recorder, source, dict_index, mode, seed, counter)
+    return recorder
+
+
+def run_benchmark(
+    sources: List[PuzzleSource],
+    words: List[str],
+    repeat: int = DEFAULT_REPEAT,
+    mode: str = DEFAULT_MODE,
+    seed: int = DEFAULT_SEED,
+    counter: Optional[int] = None,
+    memory: bool = True,
+) -> Dict:
+    """
+    Run every phase on every board `repeat` times, plus once more with
+    tracemalloc on to measure peak memory (tracing slows everything down,
+    so those times aren't used). Every pass starts from the same seed and
+    an empty scratch directory, so passes do the same work.
+
+    Returns a JSON-serializable dict with the run's settings and, per board
+    and phase, the median and every individual time in seconds.
+    """
+    passes = [run_pass(sources, words, mode, seed, counter, trace=False) for _ in range(repeat)]
+    traced = run_pass(sources, words, mode, seed, counter, trace=True) if memory else None
+
+    results = []
+    for i, record in enumerate(passes[0].records):
+        runs = [p.records[i]["seconds"] for p in passes]
+        results.append({
+            "board": record["board"],
+            "phase": record["phase"],
+            "seconds": statistics.median(runs),
+            "runs": runs,
+            "peak_bytes": traced.records[i]["peak_bytes"] if traced is not None else None,
+        })
+
+    return {
+        "settings": {
+            "mode": mode,
+            "seed": seed,
+            "counter": counter,
+            "repeat": repeat,
+            "num_words": len(words),
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "boards": passes[0].boards,
+        "results": results,
+    }
+
+
+def import_time(module: str) -> float:
+    """Seconds it takes to import `module` in a fresh interpreter, as reported by -X importtime."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stderr
+    # The module's own line is the last one, with its cumulative time in microseconds
+    for line in reversed(out.splitlines()):
+        fields = [f.strip() for f in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1e6
+    raise RuntimeError(f"no import time reported for {module}")
+
+
+def run_import_benchmark(modules: List[str] = IMPORT_MODULES, repeat: int = DEFAULT_REPEAT) -> Dict:
+    """Median cold import time of each of `modules`, in seconds."""
+    results = []
+    for module in modules:
+        runs = [import_time(module) for _ in range(repeat)]
+        results.append({"module": module, "seconds": statistics.median(runs), "runs": runs})
+    return {"settings": {"repeat": repeat}, "results": results}
+
+
+def random_sides(rng: random.Random, num_sides: int, side_len: int) -> List[str]:
+    """A board of `num_sides` sides of `side_len` distinct random letters."""
+    letters = rng.sample(string.ascii_lowercase, num_sides * side_len)
+    return ["".join(letters[i:i + side_len]) for i in range(0, len(letters), side_len)]
+
+
+def run_scaling_benchmark(
+    words: List[str],
+    geometries: List[Tuple[int, int]] = SCALING_GEOMETRIES,
+    boards: int = SCALING_BOARDS,
+    par: int = SCALING_PAR,
+    seed: int = DEFAULT_SEED,
+    time_budget: float = SCALING_TIME_BUDGET,
+) -> Dict:
+    """
+    Exhaustively solve `boards` random boards of every geometry, against a
+    dictionary of `words`, to see how solve time grows with the board.
+
+    Returns a JSON-serializable dict with, per geometry, the median candidate
+    filtering and solve times in seconds, the mean numbers of candidates and
+    solutions, and how many solves ran out of `time_budget`.
+    """
+    rng = random.Random(seed)
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir, isolated_paths(work_dir), \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        dict_index = DictionaryIndex(words)
+        for num_sides, side_len in geometries:
+            runs = []
+            for i in range(boards):
+                sides = random_sides(rng, num_sides, side_len)
+                start = time.perf_counter()
+                candidates = dict_index.candidates(sides)
+                filter_time = time.perf_counter() - start
+
+                source = ExplicitSource(sides, candidates, par, f"scaling-{num_sides}x{side_len}-{i}")
+                lbg = LetterBoxGame(source, dict_index)
+                lbg.solve_mode = "exhaustive"
+                lbg.time_budget = time_budget
+                lbg.solve(save=False)
+                runs.append({
+                    "sides": sides,
+                    "candidates": len(candidates),
+                    "solutions": len(lbg.solutions),
+                    "filter_seconds": filter_time,
+                    "solve_seconds": lbg.solve_time,
+                    "timed_out": lbg.coverage_estimate is None,
+                })
+            results.append({
+                "sides": num_sides,
+                "side_len": side_len,
+                "letters": num_sides * side_len,
+                "filter_seconds": statistics.median(r["filter_seconds"] for r in runs),
+                "solve_seconds": statistics.median(r["solve_seconds"] for r in runs),
+                "candidates": statistics.mean(r["candidates"] for r in runs),
+                "solutions": statistics.mean(r["solutions"] for r in runs),
+                "timed_out": sum(r["timed_out"] for r in runs),
+                "runs": runs,
+            })
+
+    return {
+        "settings": {
+            "boards": boards,
+            "par": par,
+            "seed": seed,
+            "time_budget": time_budget,
+            "num_words": len(words),
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-b", "--boards", default=BENCHMARK_BOARDS_PATH, help="boards to benchmark on (JSON list or JSON lines of gameData)")
+    parser.add_argument("-r", "--repeat", type=int, default=DEFAULT_REPEAT, help="number of timed passes")
+    parser.add_argument("-m", "--mode", choices=SOLVE_MODES, default=DEFAULT_MODE, help="solve mode used for every board. Monte carlo is seeded, but takes much longer")
+    parser.add_argument("-s", "--seed", type=int, default=DEFAULT_SEED, help="random seed every board is solved from")
+    parser.add_argument("-c", "--counter", type=int, help="break-out counter for the monte-carlo mode")
+    parser.add_argument("--imports", action="store_true", help="only measure how long the modules take to import")
+    parser.add_argument("--scaling", action="store_true", help="only measure how solve time grows with the size of random boards")
+    parser.add_argument("-g", "--geometry", type=parse_geometry, action="append", help="with --scaling, board shape as [sides]x[letters per side], e.g. 5x4. Can be repeated")
+    parser.add_argument("-p", "--par", type=int, default=SCALING_PAR, help="with --scaling, most words in a solution")
+    parser.add_argument("--no-memory", action="store_true", help="skip the extra pass measuring peak memory")
+    parser.add_argument("-o", "--output", type=str, help="write the JSON results to [output] instead of stdout")
+    args = parser.parse_args()
+
+    if args.imports:
+        report = run_import_benchmark(repeat=args.repeat)
+    elif args.scaling:
+        report = run_scaling_benchmark(benchmark_words(), args.geometry or SCALING_GEOMETRIES, par=args.par, seed=args.seed)
+    else:
+        report = run_benchmark(
+            file_sources(args.boards), benchmark_words(), args.repeat, args.mode, args.seed, args.counter, not args.no_memory
+        )
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -1,49 +1,175 @@
 import letter_box_game
+import argparse
+import csv
+import random
 import time
 import logging
 import os
+import concurrent.futures
+from typing import Dict, List, Optional, Tuple
 
 from datetime import date
-LOG_PATH = os.path.join(os.environ["HOME"], "LetterBoxed/solutions_archive/", str(date.today()), ".data_colector_log.log")
-print(f"logging to {LOG_PATH}")
-os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+from lbg_dictionary import DictionaryIndex
+from lbg_puzzle_source import ArchiveSource, ExplicitSource
 
-
-logging.basicConfig(filename=LOG_PATH, encoding='utf-8', level=logging.INFO, format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %I:%M:%S %p')
+LOG_FILE_NAME = ".data_colector_log.log"
 LOG = logging.getLogger()
 
-if __name__ == "__main__":
 
-    TEST_CONFIG = {
-        1: 10,
-        2: 10,
-        3: 10,
-        4: 10,
-        5: 10,
-        6: 10,
-        7: 10,
-        8: 10,
-        9: 10,
-        10: 10,
-        20: 2,
-        30: 2,
-        40: 2,
-        50: 2,
+def setup_logging(log_path: Optional[str] = None):
+    """Send the log to `log_path`, by default in today's archive directory. Only done when run as a script."""
+    if log_path is None:
+        log_path = os.path.join(letter_box_game.SOLUTIONS_DIR_PATH, str(date.today()), LOG_FILE_NAME)
+    print(f"logging to {log_path}")
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    logging.basicConfig(filename=log_path, encoding='utf-8', level=logging.INFO, format='%(asctime)s %(message)s', datefmt='%m/%d/%Y %I:%M:%S %p')
+
+
+# break-out counter value -> number of trials run with it
+TEST_CONFIG = {
+    1: 10,
+    2: 10,
+    3: 10,
+    4: 10,
+    5: 10,
+    6: 10,
+    7: 10,
+    8: 10,
+    9: 10,
+    10: 10,
+    20: 2,
+    30: 2,
+    40: 2,
+    50: 2,
+}
+
+RESULTS_FILE_NAME = "experiment_results.csv"
+RESULT_FIELDS = [
+    "counter",
+    "trial",
+    "seed",
+    "num_solutions",
+    "num_best_sols",
+    "solve_time",
+    "coverage_estimate",
+    "iterations",
+    "duplicate_hits",
+    "dead_ends",
+]
+
+
+def experiment_trials(config: Dict[int, int], seed: int = 0) -> List[Tuple[int, int, int]]:
+    """
+    (counter, trial number, seed) of every trial in `config`. Each trial's seed
+    only depends on `seed`, its counter and its number, so any trial can be
+    re-run on its own.
+    """
+    return [
+        (counter, i, random.Random(f"{seed}-{counter}-{i}").getrandbits(32))
+        for counter, num_trials in config.items()
+        for i in range(num_trials)
+    ]
+
+
+def trial_path(out_root: str, counter: int, trial: int) -> str:
+    return os.path.join(out_root, f"counter_{counter}_trial_{trial}")
+
+
+def run_trial(
+    game_data: dict, dict_index: DictionaryIndex, out_root: str, counter: int, trial: int, seed: int
+) -> Dict:
+    """Solve the board once, saving everything to the trial's own directory under `out_root`."""
+    random.seed(seed)
+    path = trial_path(out_root, counter, trial)
+    lbg = letter_box_game.LetterBoxGame(
+        ExplicitSource.from_game_data(game_data),
+        dict_index,
+        solution_path=path,
+        stats_file_path=os.path.join(path, "stats.csv"),
+    )
+    lbg.break_out_counter = counter
+    lbg.collect_metrics = True
+    lbg.progress_interval = None
+    lbg.solve()
+
+    counters = lbg.metrics.counters
+    return {
+        "counter": counter,
+        "trial": trial,
+        "seed": seed,
+        "num_solutions": len(lbg.solutions),
+        "num_best_sols": len(lbg.best_sols),
+        "solve_time": lbg.solve_time,
+        "coverage_estimate": lbg.coverage_estimate,
+        "iterations": counters.get("iterations", 0),
+        "duplicate_hits": counters.get("duplicate_hits", 0),
+        "dead_ends": counters.get("dead_ends", 0),
     }
+
+
+def _run_trial_in_worker(game_data: dict, out_root: str, counter: int, trial: int, seed: int) -> Dict:
+    return run_trial(game_data, letter_box_game.worker_dictionary(), out_root, counter, trial, seed)
+
+
+def run_experiment(
+    game_data: dict,
+    out_root: str,
+    config: Dict[int, int] = TEST_CONFIG,
+    jobs: int = 1,
+    seed: int = 0,
+) -> str:
+    """
+    Run every trial in `config` on the board in `game_data`, `jobs` at a time,
+    and write one row per trial to RESULTS_FILE_NAME in `out_root`. Rows are
+    written in trial order as they finish. Returns the path of the results file.
+    """
+    os.makedirs(out_root, exist_ok=True)
+    trials = experiment_trials(config, seed)
+    results_path = os.path.join(out_root, RESULTS_FILE_NAME)
+
+    with open(results_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+
+        def write(rows):
+            for row in rows:
+                LOG.info(f"Finished trial {row['trial']} for counter_val: {row['counter']}")
+                writer.writerow(row)
+                f.flush()
+
+        if jobs <= 1:
+            dict_index = letter_box_game.load_dictionary()
+            write(run_trial(game_data, dict_index, out_root, *t) for t in trials)
+        else:
+            counters, numbers, seeds = zip(*trials)
+            n = len(trials)
+            with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=letter_box_game.init_dictionary_worker) as pool:
+                write(pool.map(_run_trial_in_worker, [game_data] * n, [out_root] * n, counters, numbers, seeds))
+    return results_path
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--date", type=str, help="run the experiment on the archived puzzle of [date] (YYYY-MM-DD) instead of today's")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of trials run in parallel")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="seed the per-trial seeds are derived from")
+    parser.add_argument("-o", "--output", type=str, help="directory for the trials' output and the results file. Defaults to experiments/<start time> in the day's archive directory")
+    args = parser.parse_args()
+
+    setup_logging()
     start = time.time()
     LOG.info(f"starting data collection at {start}")
-    lbg_unit = letter_box_game.LetterBoxGame()
-    for counter_val, num_trials in TEST_CONFIG.items():
-
-        LOG.info(f"Starting trails for counter_val: {counter_val}")
 
-        for i in range(0,num_trials):
+    # Loading the game once here also updates the dictionary and archives the game data,
+    # so the trials only need the board itself
+    lbg_unit = letter_box_game.LetterBoxGame(ArchiveSource(letter_box_game.SOLUTIONS_DIR_PATH, args.date))
+    out_root = args.output
+    if out_root is None:
+        out_root = os.path.join(lbg_unit.solution_path, "experiments", time.strftime("%Y%m%d-%H%M%S"))
 
-            LOG.info(f"Starting trail number: {i}")
+    results_path = run_experiment(lbg_unit.lbg_data_dict, out_root, TEST_CONFIG, args.jobs, args.seed)
 
-            lbg_unit.reset_stats()
-            lbg_unit.break_out_counter = counter_val
-            lbg_unit.solve()
-    
     duration = time.time() - start
-    LOG.info(f"Data Collection complete. Runtime: {duration} sec")
\ No newline at end of file
+    LOG.info(f"Data Collection complete. Runtime: {duration} sec")
+    print(f"Results written to {results_path}")
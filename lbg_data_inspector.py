@@ -1,15 +1,118 @@
+from __future__ import annotations
+
 import os
+from collections import OrderedDict
 from datetime import date
-from typing import Optional, List
-from lbg_utils import decode
+from typing import Dict, Optional, List, Tuple
+
+from lbg_utils import lazy_import
+from lbg_archive import (
+    SolutionArchive,
+    TotalLengthArchive,
+    WORD_TABLE_FILE_NAME,
+    legacy_solution_file_name,
+    solution_file_name,
+    stored_lengths,
+    stored_total_lengths,
+)
+
+np = lazy_import("numpy")
+
+DEFAULT_DATA_PATH = os.path.join(os.path.expanduser("~"), "LetterBoxed/solutions_archive")
+# Number of days kept in memory by all inspectors together
+DAY_CACHE_SIZE = 32
+
+
+def day_signature(data_root: str) -> Tuple:
+    """(name, mtime, size) of every file a DayIndex is built from, to tell when it went stale."""
+    names = [WORD_TABLE_FILE_NAME]
+    for length in stored_lengths(data_root):
+        names += [solution_file_name(length), legacy_solution_file_name(length)]
+
+    signature = []
+    for name in names:
+        try:
+            st = os.stat(os.path.join(data_root, name))
+        except FileNotFoundError:
+            continue
+        signature.append((name, st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+class DayIndex:
+    """
+    Everything the inspector asks about one day, built once from its archive:
+    the solutions of each length as word ids, their total letter lengths and
+    a histogram of those, and an inverted index from word to the solutions
+    it appears in.
+    """
+
+    def __init__(self, data_root: str):
+        self.signature = day_signature(data_root)
+        archive = SolutionArchive(data_root)
+        self.ids = {length: archive.read_ids(length) for length in archive.lengths()}
+        self.words = archive.words
+
+        word_lens = np.array([len(w) for w in self.words], dtype=np.int64)
+        self.total_lengths = {n: word_lens[ids].sum(axis=1) for n, ids in self.ids.items()}
+        self.histograms = {n: np.bincount(t) for n, t in self.total_lengths.items()}
+
+        # word -> {solution length: rows of the solutions containing it}
+        self.word_index: Dict[str, Dict[int, np.ndarray]] = {}
+        for n, ids in self.ids.items():
+            flat = ids.ravel()
+            order = np.argsort(flat, kind="stable")
+            rows = order // n
+            word_ids, starts = np.unique(flat[order], return_index=True)
+            for word_id, row_group in zip(word_ids.tolist(), np.split(rows, starts[1:])):
+                self.word_index.setdefault(self.words[word_id], {})[n] = np.unique(row_group)
+
+        self._solutions: Dict[int, List[List[str]]] = {}
+
+    def solutions(self, length: int) -> Optional[List[List[str]]]:
+        if length not in self.ids:
+            return None
+        if length not in self._solutions:
+            self._solutions[length] = [[self.words[i] for i in row] for row in self.ids[length].tolist()]
+        return self._solutions[length]
+
+    def lengths_of(self, sols: List[List[str]]) -> np.ndarray:
+        """Total letter length of each of `sols`."""
+        # Lists handed out by solutions() already have theirs computed
+        for n, cached in self._solutions.items():
+            if sols is cached:
+                return self.total_lengths[n]
+        return np.array([len(''.join(s)) for s in sols], dtype=np.int64)
+
+    def sols_with_word(self, word: str, length: int) -> List[List[str]]:
+        rows = self.word_index.get(word, {}).get(length)
+        if rows is None:
+            return []
+        sols = self.solutions(length)
+        return [sols[r] for r in rows.tolist()]
+
+
+# data root -> DayIndex, least recently used first
+_day_cache: "OrderedDict[str, DayIndex]" = OrderedDict()
+
+
+def get_day_index(data_root: str) -> DayIndex:
+    day = _day_cache.get(data_root)
+    if day is None or day.signature != day_signature(data_root):
+        day = DayIndex(data_root)
+        _day_cache[data_root] = day
+    _day_cache.move_to_end(data_root)
+    while len(_day_cache) > DAY_CACHE_SIZE:
+        _day_cache.popitem(last=False)
+    return day
+
+
+def drop_day_index(data_root: str):
+    _day_cache.pop(data_root, None)
 
-DEFAULT_DATA_PATH = os.path.join(os.environ["HOME"], "LetterBoxed/solutions_archive")
 
 class LBGDataInspector:
 
-    # solutions in dict for of {length: list of sols} form
-    solutions = {}
-
     def __init__(self, the_date: Optional[str] = None, sol_path: Optional[str] = None):
 
         if the_date is None:
@@ -31,48 +134,52 @@ class LBGDataInspector:
 
 
     def find_par(self):
-        found_exception = False
+        archive = SolutionArchive(self.data_root)
         len = 2
-        while not found_exception:
-            try:
-                f = open(os.path.join(self.data_root, f"length_{len}_solutions.txt"), "r")
-            except FileNotFoundError:
-                found_exception = True
-            finally:
-                if found_exception:
-                    len -= 1
-                else:
-                    len += 1
+        while archive.exists(len):
+            len += 1
+        len -= 1
 
         print(f"par is {len}")
 
         return len  
 
 
+    def get_day(self) -> DayIndex:
+        return get_day_index(self.data_root)
+
     def get_sols(self, length: int):
-        if not length in self.solutions.keys():
-            f = f"length_{length}_solutions.txt"
-            try:
-                with open(os.path.join(self.data_root, f), "r") as sols:
-                    self.solutions[length] = decode(sols.readlines())
-            except FileNotFoundError:
-                print(f"Error: could not find length {length} file ({f})")
-                return None
-
-        return self.solutions[length]
-    
+        sols = self.get_day().solutions(length)
+        if sols is None:
+            print(f"Error: could not find length {length} file in {self.data_root}")
+        return sols
+
     def get_range_of_sols_length(self, sols):
-        lengths = [len(''.join(s)) for s in sols]
-        return (min(lengths), max(lengths))
+        lengths = self.get_day().lengths_of(sols)
+        return (int(lengths.min()), int(lengths.max()))
     
     def get_sols_of_length(self, sols, length):
-        query_res = []
-        for s in sols:
-            if len(''.join(s)) == length:
-                query_res.append(s)
-
-        return query_res
+        return [sols[i] for i in np.flatnonzero(self.get_day().lengths_of(sols) == length)]
+
+    def get_length_histogram(self, length: int) -> Dict[int, int]:
+        """{total number of letters: number of solutions} for the `length`-word solutions."""
+        histogram = self.get_day().histograms.get(length)
+        if histogram is None:
+            return {}
+        return {total: int(count) for total, count in enumerate(histogram) if count}
     
+    def get_shortest_sols(self, total_length: Optional[int] = None) -> List[List[str]]:
+        """
+        The shortest solutions saved for the day, of `total_length` letters or
+        else of the fewest letters there are.
+        """
+        if total_length is None:
+            total_lengths = stored_total_lengths(self.data_root)
+            if not total_lengths:
+                return []
+            total_length = total_lengths[0]
+        return TotalLengthArchive(self.data_root, total_length).read_all()
+
     def get_sols_with_word(self, word: str, stop_length: int = None):
         if stop_length is None:
             print("wtf")
@@ -80,22 +187,20 @@ class LBGDataInspector:
         elif stop_length < 2:
             stop_length = 2
 
+        day = self.get_day()
         ret_sols = []
         for len in range(2, stop_length + 1):
-            sols = self.get_sols(len)
-            for s in sols:
-                if word in s:
-                    ret_sols.append(s)
+            ret_sols += day.sols_with_word(word, len)
 
         return ret_sols
     
-    # If the data has been updated since initial read, it may be useful to clear
-    # so that subsequent calls to get_sols will refresh the data stored in this object
+    # Cached days are rebuilt by themselves when their files change on disk.
+    # These force a re-read anyway; either way the whole day is dropped.
     def clear_solutions_entry(self, length):
-        self.solutions.pop(length, None)
+        drop_day_index(self.data_root)
 
     def clear_solutions_dict(self):
-        self.solutions = {}
+        drop_day_index(self.data_root)
             
 
 if __name__ == "__main__":
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+from typing import Iterable, List, Sequence
+
+from lbg_utils import lazy_import
+
+np = lazy_import("numpy")
+
+# Letters are stored as codes 1-26 ('a'-'z'). 0 is the padding after the end of
+# a word and 27 is anything that isn't a lowercase ascii letter.
+PAD_CODE = 0
+OTHER_CODE = 27
+NUM_CODES = 28
+
+# On-disk layout of a saved index: the magic string, then the number of words,
+# the size of the word blob and the padded word width as uint64, followed by
+# each array in INDEX_ARRAYS order. Every section starts on an 8 byte boundary
+# so the file can be memory-mapped and viewed without copying.
+INDEX_MAGIC = b"LBGDICT1"
+INDEX_ARRAYS = [
+    ("offsets", "int64"),
+    ("letter_masks", "uint32"),
+    ("lengths", "uint8"),
+    ("first", "uint8"),
+    ("last", "uint8"),
+    ("bigrams", "uint16"),
+    ("blob", "uint8"),
+]
+
+
+def letter_codes(letters: str) -> List[int]:
+    return [ord(l) - ord("a") + 1 if "a" <= l <= "z" else OTHER_CODE for l in letters]
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class DictionaryIndex:
+    """
+    Precomputed, array-backed view of the english dictionary.
+
+    Words are kept sorted in one ascii blob, addressed through an offsets
+    array. For every word we also keep a bitmask of the letters it uses
+    (bit n is letter code n), its length, first and last letter codes and its
+    bigram signature, i.e. the code of every pair of adjacent letters.
+    Checking a whole board against the dictionary is then a couple of
+    vectorized passes instead of a python loop over every letter of every word.
+
+    An index can be saved to disk and opened again with `load()`, which
+    memory-maps the file instead of parsing it.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        words = sorted(set(words))
+        width = max((len(w) for w in words), default=1)
+
+        padded = "".join(w.ljust(width, "\0") for w in words).encode("ascii", "replace")
+        raw = np.frombuffer(padded, dtype=np.uint8).reshape(len(words), width)
+        codes = np.where((raw >= ord("a")) & (raw <= ord("z")), raw - (ord("a") - 1), OTHER_CODE)
+        codes[raw == 0] = PAD_CODE
+
+        self.lengths = (codes != PAD_CODE).sum(axis=1).astype(np.uint8)
+        self.offsets = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum(self.lengths, out=self.offsets[1:])
+        self.blob = np.frombuffer("".join(words).encode("ascii", "replace"), dtype=np.uint8)
+
+        rows = np.arange(len(words))
+        self.first = codes[:, 0].astype(np.uint8)
+        self.last = codes[rows, np.maximum(self.lengths.astype(np.int64) - 1, 0)].astype(np.uint8)
+        self.letter_masks = np.bitwise_or.reduce(
+            np.left_shift(np.uint32(1), codes.astype(np.uint32)), axis=1
+        )
+        self.bigrams = codes[:, :-1].astype(np.uint16) * NUM_CODES + codes[:, 1:]
+        self._words = words
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __contains__(self, word: str):
+        return self.find(word) >= 0
+
+    def word(self, i: int) -> str:
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("ascii")
+
+    @property
+    def words(self) -> List[str]:
+        # Only materialized when someone asks for the whole list
+        if self._words is None:
+            text = self.blob.tobytes().decode("ascii")
+            offsets = self.offsets.tolist()
+            self._words = [text[s:e] for s, e in zip(offsets[:-1], offsets[1:])]
+        return self._words
+
+    def find(self, word: str) -> int:
+        """Binary search for `word`, returns its position or -1."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word(mid) < word:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self) and self.word(lo) == word:
+            return lo
+        return -1
+
+    def select(self, keep: np.ndarray) -> "DictionaryIndex":
+        """Return a new index holding only the words flagged in the `keep` mask."""
+        sub = DictionaryIndex.__new__(DictionaryIndex)
+        sub.lengths = self.lengths[keep]
+        sub.first = self.first[keep]
+        sub.last = self.last[keep]
+        sub.letter_masks = self.letter_masks[keep]
+        sub.bigrams = self.bigrams[keep]
+
+        sub.offsets = np.zeros(len(sub.lengths) + 1, dtype=np.int64)
+        np.cumsum(sub.lengths, out=sub.offsets[1:])
+        # Gather the bytes of every kept word: each byte's source is its
+        # position in the new blob shifted by where its word used to start
+        shift = np.repeat(self.offsets[:-1][keep] - sub.offsets[:-1], sub.lengths)
+        sub.blob = self.blob[np.arange(sub.offsets[-1]) + shift]
+        sub._words = None
+        return sub
+
+    def valid_mask(self, letter_sets: Sequence[str]) -> np.ndarray:
+        """
+        Boolean mask of the words that meet the game criteria for `letter_sets`:
+        1) all letters in the word are included in one of the letter sets
+        2) no letters in same set are adjacent
+        """
+        board_mask = 1 << PAD_CODE
+        forbidden = np.zeros(NUM_CODES * NUM_CODES, dtype=bool)
+        for letter_set in letter_sets:
+            codes = letter_codes(letter_set)
+            for c in codes:
+                board_mask |= 1 << c
+                for d in codes:
+                    forbidden[c * NUM_CODES + d] = True
+
+        valid = (self.letter_masks & np.uint32(~board_mask & 0xFFFFFFFF)) == 0
+        # Only the few words made of board letters need their bigrams checked
+        rows = np.flatnonzero(valid)
+        valid[rows] = ~forbidden[self.bigrams[rows]].any(axis=1)
+        return valid
+
+    def candidates(self, letter_sets: Sequence[str]) -> List[str]:
+        ids = np.flatnonzero(self.valid_mask(letter_sets))
+        if self._words is not None:
+            return [self._words[i] for i in ids.tolist()]
+        # Gather the words' bytes and decode them in one go
+        starts = self.offsets[ids].astype(np.int64)
+        lengths = self.offsets[ids + 1].astype(np.int64) - starts
+        ends = np.cumsum(lengths)
+        positions = np.repeat(starts - (ends - lengths), lengths) + np.arange(ends[-1] if len(ends) else 0)
+        text = self.blob[positions].tobytes().decode("ascii")
+        ends = ends.tolist()
+        return [text[s:e] for s, e in zip([0] + ends[:-1], ends)]
+
+    def save(self, path: str):
+        # Write next to the target and swap it in, so processes that still
+        # have the old file mapped keep a consistent view
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        header = np.array([len(self), len(self.blob), self.bigrams.shape[1] + 1], dtype=np.uint64)
+        with open(tmp_path, "wb") as f:
+            f.write(INDEX_MAGIC)
+            f.write(header.tobytes())
+            for name, dtype in INDEX_ARRAYS:
+                data = np.ascontiguousarray(getattr(self, name), dtype=dtype).tobytes()
+                f.write(data)
+                f.write(b"\0" * (_align(len(data)) - len(data)))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "DictionaryIndex":
+        mm = np.memmap(path, dtype=np.uint8, mode="r")
+        if mm[:len(INDEX_MAGIC)].tobytes() != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a dictionary index")
+        pos = len(INDEX_MAGIC)
+        num_words, blob_len, width = (int(n) for n in mm[pos:pos + 24].view(np.uint64))
+        pos += 24
+
+        sizes = {
+            "offsets": num_words + 1,
+            "bigrams": num_words * (width - 1),
+            "blob": blob_len,
+        }
+        index = cls.__new__(cls)
+        for name, dtype in INDEX_ARRAYS:
+            nbytes = sizes.get(name, num_words) * np.dtype(dtype).itemsize
+            setattr(index, name, mm[pos:pos + nbytes].view(dtype))
+            pos += _align(nbytes)
+        index.bigrams = index.bigrams.reshape(num_words, width - 1)
+        index._words = None
+        return index
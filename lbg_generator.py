@@ -0,0 +1,206 @@
+import argparse
+import collections
+import concurrent.futures
+import itertools
+import json
+import random
+import string
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from letter_box_game import (
+    LETTER_SET_LEN, MAX_NUM_LETTER_SETS, board_geometry, init_dictionary_worker, open_dictionary, worker_dictionary
+)
+from lbg_dictionary import DictionaryIndex, letter_codes
+from lbg_solver import CandidateIndex, count_two_word_solutions, ruled_out, shortest_solution
+from lbg_utils import lazy_import, parse_geometry
+
+np = lazy_import("numpy")
+
+DEFAULT_PAR = 4
+DEFAULT_OUTPUT = "generated_boards.jsonl"
+# Boards generated and scored per task handed to a worker process
+BOARDS_PER_TASK = 64
+# When keeping only solvable boards, give up after this many tries per board asked for
+MAX_ATTEMPTS_PER_BOARD = 100
+
+
+def letter_weights(dict_index: DictionaryIndex) -> List[int]:
+    """How many words of the dictionary use each letter a-z."""
+    masks = dict_index.letter_masks
+    return [int(np.count_nonzero(masks & np.uint32(1 << code))) for code in letter_codes(string.ascii_lowercase)]
+
+
+def sample_sides(rng: random.Random, weights: Sequence[int], num_sides: int, side_len: int) -> List[str]:
+    """
+    A board of `num_sides` sides of `side_len` letters. Letters are drawn
+    without replacement, each in proportion to its weight (see
+    letter_weights()), so common letters come up about as often as they
+    do in the dictionary and no letter is on the board twice.
+    """
+    if num_sides * side_len > len(string.ascii_lowercase):
+        raise ValueError(f"a board of {num_sides} sides of {side_len} letters needs more than 26 letters")
+    letters = list(string.ascii_lowercase)
+    weights = list(weights)
+    chosen = []
+    for _ in range(num_sides * side_len):
+        i = rng.choices(range(len(letters)), weights if any(weights) else None)[0]
+        chosen.append(letters.pop(i))
+        weights.pop(i)
+    return ["".join(chosen[i:i + side_len]) for i in range(0, len(chosen), side_len)]
+
+
+def score_board(index: CandidateIndex, par: int) -> Dict:
+    """
+    How hard the board of `index` is:
+        candidates: number of valid words
+        solvable: whether there is a solution of at most `par` words
+        two_word_solutions: number of 2-word solutions
+        min_letters: total letters of the shortest solution within par, None if there is none
+        shortest: that solution
+    """
+    # Most boards that can't be solved are told apart without searching
+    if ruled_out(index, par):
+        shortest = None
+        two_word_solutions = 0 if ruled_out(index, 2) else count_two_word_solutions(index)
+    else:
+        shortest = shortest_solution(index, par)
+        two_word_solutions = count_two_word_solutions(index)
+    return {
+        "candidates": len(index),
+        "solvable": shortest is not None,
+        "two_word_solutions": two_word_solutions,
+        "min_letters": None if shortest is None else sum(len(w) for w in shortest),
+        "shortest": shortest,
+    }
+
+
+def make_board(
+    dict_index: DictionaryIndex, weights: Sequence[int], number: int, seed: int, num_sides: int, side_len: int, par: int
+) -> Dict:
+    """
+    Board number `number` of the corpus generated from `seed`, as a gameData
+    dict (see PuzzleSource) with its score under "score". A board only depends
+    on `seed` and its number, so any board can be made again on its own.
+    """
+    rng = random.Random(f"{seed}-{number}")
+    sides = sample_sides(rng, weights, num_sides, side_len)
+    board_geometry(sides)
+
+    candidates = dict_index.candidates(sides)
+    score = score_board(CandidateIndex(candidates, "".join(sides)), par)
+    return {
+        "sides": sides,
+        "dictionary": candidates,
+        "par": par,
+        "ourSolution": score["shortest"] or [],
+        "date": f"generated-{seed}-{number:06d}",
+        "score": score,
+    }
+
+
+# letter_weights() of the worker's dictionary, worked out with its first boards
+_worker_weights: Optional[List[int]] = None
+
+
+def _make_boards_in_worker(numbers: List[int], seed: int, num_sides: int, side_len: int, par: int) -> List[Dict]:
+    global _worker_weights
+    dict_index = worker_dictionary()
+    if _worker_weights is None:
+        _worker_weights = letter_weights(dict_index)
+    return [make_board(dict_index, _worker_weights, n, seed, num_sides, side_len, par) for n in numbers]
+
+
+def generate_boards(
+    count: int,
+    num_sides: int = MAX_NUM_LETTER_SETS,
+    side_len: int = LETTER_SET_LEN,
+    par: int = DEFAULT_PAR,
+    seed: int = 0,
+    jobs: int = 1,
+    solvable_only: bool = True,
+    dict_path: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Generate and score `count` boards, `jobs` processes at a time. With
+    `solvable_only`, boards without a solution within par are dropped and
+    more are made until there are `count` of them, or until
+    MAX_ATTEMPTS_PER_BOARD tries per board asked for.
+
+    Boards are numbered, and made from their number and `seed` alone, so the
+    result is the same however many jobs there are. The dictionary is the one
+    saved at `dict_path`, by default the english one.
+    """
+    max_attempts = count * MAX_ATTEMPTS_PER_BOARD if solvable_only else count
+    numbers = iter(range(max_attempts))
+    chunks: Iterator[List[int]] = iter(lambda: list(itertools.islice(numbers, BOARDS_PER_TASK)), [])
+    boards = []
+
+    def keep(chunk_boards: List[Dict]) -> bool:
+        # Returns True once there are enough boards
+        for board in chunk_boards:
+            if board["score"]["solvable"] or not solvable_only:
+                boards.append(board)
+                if len(boards) == count:
+                    return True
+        return False
+
+    if count <= 0:
+        return boards
+
+    if jobs <= 1:
+        dict_index = open_dictionary(dict_path)
+        weights = letter_weights(dict_index)
+        for chunk in chunks:
+            if keep([make_board(dict_index, weights, n, seed, num_sides, side_len, par) for n in chunk]):
+                break
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs, initializer=init_dictionary_worker, initargs=(dict_path,)
+        ) as pool:
+            # A couple of tasks per worker in flight, taken back in order
+            pending = collections.deque()
+            for chunk in itertools.islice(chunks, 2 * jobs):
+                pending.append(pool.submit(_make_boards_in_worker, chunk, seed, num_sides, side_len, par))
+            while pending:
+                if keep(pending.popleft().result()):
+                    break
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.append(pool.submit(_make_boards_in_worker, chunk, seed, num_sides, side_len, par))
+            for future in pending:
+                future.cancel()
+
+    if len(boards) < count:
+        print(f"only found {len(boards)} of {count} boards in {max_attempts} tries")
+    return boards
+
+
+def write_boards(boards: List[Dict], path: str):
+    """One gameData dict per line, which lbg_batch.file_sources() and the benchmark read."""
+    with open(path, "w") as f:
+        for board in boards:
+            f.write(json.dumps(board) + "\n")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=1000, help="number of boards to generate")
+    parser.add_argument("-g", "--geometry", type=parse_geometry, default=(MAX_NUM_LETTER_SETS, LETTER_SET_LEN), help="board shape as [sides]x[letters per side], e.g. 4x3")
+    parser.add_argument("-p", "--par", type=int, default=DEFAULT_PAR, help="most words in a solution")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="seed the boards are generated from")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of processes generating boards")
+    parser.add_argument("-a", "--all", action="store_true", help="keep boards with no solution within par too")
+    parser.add_argument("-d", "--dictionary", type=str, help="saved dictionary index to use instead of the english one")
+    parser.add_argument("-o", "--output", type=str, default=DEFAULT_OUTPUT, help="file to write the boards to, one gameData dict per line")
+    args = parser.parse_args()
+
+    start = time.time()
+    num_sides, side_len = args.geometry
+    boards = generate_boards(args.count, num_sides, side_len, args.par, args.seed, args.jobs, not args.all, args.dictionary)
+    duration = time.time() - start
+    write_boards(boards, args.output)
+
+    print(f"Generated {len(boards)} boards in {round(duration, 3)}sec ({round(len(boards) / duration, 1)} boards/sec)")
+    print(f"Written to {args.output}")
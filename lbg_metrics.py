@@ -0,0 +1,58 @@
+import json
+import time
+from typing import Dict, Optional
+
+METRICS_FILE_NAME = "metrics.json"
+
+
+class SolveMetrics:
+    """
+    Counters and timers filled in by the solve loop. A game holds None
+    instead of one when metrics are off, so each hook costs a single
+    `is not None` check.
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.timers: Dict[str, float] = {}
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name: str, seconds: float):
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def ratio(self, numerator: str, denominator: str) -> Optional[float]:
+        total = self.counters.get(denominator, 0)
+        if total == 0:
+            return None
+        return self.counters.get(numerator, 0) / total
+
+    def to_dict(self) -> Dict:
+        return {
+            "counters": dict(self.counters),
+            "timers": dict(self.timers),
+            "duplicate_rate": self.ratio("duplicate_hits", "iterations"),
+            "dead_end_rate": self.ratio("dead_ends", "iterations"),
+        }
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class Progress:
+    """Prints a progress line, overwriting the last one, at most once every `interval` seconds."""
+
+    def __init__(self, interval: Optional[float] = 0.5):
+        # None turns progress off altogether
+        self.interval = interval
+        self.next_time = 0.0
+
+    def update(self, *values):
+        if self.interval is None:
+            return
+        now = time.monotonic()
+        if now >= self.next_time:
+            self.next_time = now + self.interval
+            print(*values, end="\r")
@@ -0,0 +1,130 @@
+import json
+import os
+from datetime import date
+from typing import List, Optional
+
+GAME_DATA_FILE_NAME = "game_data.json"
+
+
+def load_game_data(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_game_data(data: dict, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+class PuzzleSource:
+    """
+    Where a LetterBoxGame gets its gameData dict from. The dict has the same
+    keys scrape_lbg_data() returns: sides, dictionary, par, ourSolution, date.
+    """
+
+    # Whether the dictionary is the NYT's own list of valid words for the board.
+    # Only then can it be used to prune the english dictionary.
+    authoritative = True
+
+    def __init__(self, the_date: Optional[str] = None):
+        if the_date is None:
+            self.date = str(date.today())
+        else:
+            self.date = the_date
+
+    def prefetch(self):
+        """Start getting the game data in the background, if that takes a while."""
+        pass
+
+    def get_game_data(self) -> dict:
+        raise NotImplementedError
+
+
+class ScraperSource(PuzzleSource):
+    """
+    Today's puzzle, straight from the NYT site: over plain HTTP, or with a
+    browser if that doesn't work.
+    """
+
+    def __init__(self, the_date: Optional[str] = None):
+        super().__init__(the_date)
+        self._fetcher = None
+        self._pending = None
+
+    def prefetch(self):
+        from lbg_site_scraper import GameDataFetcher
+        if self._pending is None:
+            self._fetcher = GameDataFetcher()
+            self._pending = self._fetcher.prefetch()
+
+    def get_game_data(self) -> dict:
+        from lbg_site_scraper import fetch_lbg_data
+        if self._pending is None:
+            return fetch_lbg_data()
+        try:
+            return fetch_lbg_data(pending=self._pending)
+        finally:
+            self._fetcher.close()
+            self._fetcher = None
+            self._pending = None
+
+
+class ArchiveSource(PuzzleSource):
+    """
+    Replays the gameData saved in the solutions archive for `the_date`.
+    If today's puzzle hasn't been saved yet it is scraped once and stored,
+    so every later construction for that date is served from the file.
+    """
+
+    def __init__(self, archive_root: str, the_date: Optional[str] = None, scrape: bool = True):
+        super().__init__(the_date)
+        self.path = os.path.join(archive_root, self.date, GAME_DATA_FILE_NAME)
+        self.scrape = scrape and self.date == str(date.today())
+        self._scraper = None
+
+    def prefetch(self):
+        if self.scrape and not os.path.isfile(self.path):
+            self._scraper = ScraperSource(self.date)
+            self._scraper.prefetch()
+
+    def get_game_data(self) -> dict:
+        if os.path.isfile(self.path):
+            print(f"loading game data from {self.path}")
+            return load_game_data(self.path)
+        if not self.scrape:
+            raise FileNotFoundError(f"no saved game data for {self.date} ({self.path})")
+
+        data = (self._scraper or ScraperSource(self.date)).get_game_data()
+        save_game_data(data, self.path)
+        return data
+
+
+class ExplicitSource(PuzzleSource):
+    """A board given by hand, e.g. for experiments and tests. Needs no browser or network."""
+
+    authoritative = False
+
+    def __init__(
+        self,
+        sides: List[str],
+        dictionary: List[str],
+        par: int,
+        the_date: Optional[str] = None,
+        our_solution: Optional[List[str]] = None,
+    ):
+        super().__init__(the_date)
+        self.data = {
+            "sides": [s.lower() for s in sides],
+            "dictionary": [w.lower() for w in dictionary],
+            "par": par,
+            "ourSolution": [w.lower() for w in our_solution or []],
+            "date": self.date,
+        }
+
+    @classmethod
+    def from_game_data(cls, data: dict) -> "ExplicitSource":
+        return cls(data["sides"], data["dictionary"], data["par"], data.get("date"), data.get("ourSolution"))
+
+    def get_game_data(self) -> dict:
+        return dict(self.data)
@@ -0,0 +1,288 @@
+import argparse
+import json
+import os
+import random
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from letter_box_game import LetterBoxGame, MIN_WORD_LEN, SOLUTION_ORDERS, SOLVE_MODES, board_geometry, load_dictionary
+from lbg_dictionary import DictionaryIndex
+from lbg_solver import CandidateIndex, exhaustive_solutions, monte_carlo_solutions, shortest_solutions, solutions_by_word_count
+from lbg_utils import good_turing_coverage, parse_duration
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8421
+# Number of boards whose candidate index is kept between requests
+INDEX_CACHE_SIZE = 64
+# Most solutions sent back for one request, unless it asks for another limit
+DEFAULT_LIMIT = 1000
+DEFAULT_MODE = "exhaustive"
+
+# (sides, sorted dictionary or None for the resident one)
+BoardKey = Tuple[Tuple[str, ...], Optional[Tuple[str, ...]]]
+
+
+def validate_sides(sides) -> List[str]:
+    """The board's sides, lower case. Raises ValueError if they don't make a board, see board_geometry()."""
+    if isinstance(sides, list) and all(isinstance(s, str) for s in sides):
+        sides = [s.lower() for s in sides]
+    board_geometry(sides)
+    return sides
+
+
+def int_field(request: Dict, name: str, default: Optional[int], minimum: int) -> int:
+    value = request.get(name, default)
+    if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+        raise ValueError(f"{name} must be an integer of at least {minimum}")
+    return value
+
+
+class SolverService:
+    """
+    Solves boards against a dictionary that is loaded once and kept open.
+
+    The candidate index of every board solved lately is kept too, so solving
+    the same board again goes straight to the search. Indexes are read-only
+    once built, so requests on several threads can share them. The on-disk
+    dictionary is never changed.
+    """
+
+    def __init__(self, dict_index: Optional[DictionaryIndex] = None, cache_size: int = INDEX_CACHE_SIZE):
+        self.dict_index = load_dictionary() if dict_index is None else dict_index
+        self.cache_size = cache_size
+        # board -> CandidateIndex, least recently used first
+        self._indexes: "OrderedDict[BoardKey, CandidateIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def candidate_index(self, sides: List[str], dictionary: Optional[List[str]] = None) -> Tuple[CandidateIndex, bool]:
+        """The board's candidate index, and whether it came from the cache."""
+        words = None if dictionary is None else tuple(sorted(set(w.lower() for w in dictionary)))
+        key = (tuple(sides), words)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                self.hits += 1
+                return index, True
+            self.misses += 1
+
+        # Built outside the lock, so other boards aren't held up. Two requests
+        # for the same new board may both build it, which is only wasted work
+        if words is None:
+            candidates = self.dict_index.candidates(sides)
+        else:
+            # A given dictionary is checked against the board like the english one
+            candidates = DictionaryIndex(words).candidates(sides)
+        # Same order as LetterBoxGame.candidate_set, most coverage first
+        candidates.sort(key=lambda w: len(set(w)), reverse=True)
+        index = CandidateIndex(candidates, "".join(sides))
+
+        with self._lock:
+            self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.cache_size:
+                self._indexes.popitem(last=False)
+        return index, False
+
+    def solve(self, request: Dict) -> Dict:
+        """
+        Solve the board described by `request`, a dict with:
+            sides: the board's sides, e.g. ["abc", "def", "ghi", "jkl"]. Any number
+                of sides of any length, see board_geometry()
+            par: most words in a solution
+            dictionary: valid words for the board, of at least MIN_WORD_LEN letters. Defaults to the english dictionary
+            mode: one of SOLVE_MODES, exhaustive by default
+            order: one of SOLUTION_ORDERS, overrides `mode` like in LetterBoxGame.iter_solutions()
+            limit: most solutions to find (DEFAULT_LIMIT)
+            time_budget: seconds, or a duration like "200ms", to search for
+            top: number of shortest solutions the shortest mode looks for
+            counter: break-out counter of the monte carlo mode
+            seed: random seed of the monte carlo mode
+
+        Raises ValueError if the request is malformed.
+        """
+        start = time.time()
+        sides = validate_sides(request.get("sides"))
+        par = int_field(request, "par", None, 1)
+        dictionary = request.get("dictionary")
+        if dictionary is not None and (
+            not isinstance(dictionary, list) or not all(isinstance(w, str) for w in dictionary)
+        ):
+            raise ValueError("dictionary must be a list of strings")
+        if dictionary is not None and any(len(w) < MIN_WORD_LEN for w in dictionary):
+            raise ValueError(f"dictionary words must have at least {MIN_WORD_LEN} letters")
+        mode = request.get("mode", DEFAULT_MODE)
+        if mode not in SOLVE_MODES:
+            raise ValueError(f"unknown solve mode {mode}, expected one of {SOLVE_MODES}")
+        order = request.get("order")
+        if order is not None and order not in SOLUTION_ORDERS:
+            raise ValueError(f"unknown solution order {order}, expected one of {SOLUTION_ORDERS}")
+        limit = int_field(request, "limit", DEFAULT_LIMIT, 0)
+
+        time_budget = request.get("time_budget")
+        deadline = None
+        if time_budget is not None:
+            if isinstance(time_budget, str):
+                time_budget = parse_duration(time_budget)
+            elif not isinstance(time_budget, (int, float)) or isinstance(time_budget, bool):
+                raise ValueError("time_budget must be a number of seconds or a duration")
+            if not time_budget >= 0:
+                raise ValueError("time_budget must be at least 0 seconds")
+            deadline = start + time_budget
+        seed = request.get("seed")
+        if seed is not None and (not isinstance(seed, (int, str)) or isinstance(seed, bool)):
+            raise ValueError("seed must be an integer or a string")
+
+        index, cached = self.candidate_index(sides, dictionary)
+
+        hits = {}
+        if order == "words":
+            engine = solutions_by_word_count(index, par, deadline)
+        elif order == "length":
+            engine = shortest_solutions(index, par, deadline=deadline)
+        elif mode == "exhaustive":
+            engine = exhaustive_solutions(index, par, deadline)
+        elif mode == "shortest":
+            engine = shortest_solutions(index, par, int_field(request, "top", LetterBoxGame.num_shortest, 1), deadline)
+        else:
+            rng = random.Random(seed)
+            counter = int_field(request, "counter", LetterBoxGame.break_out_counter, 0)
+            engine = monte_carlo_solutions(index, par, counter, deadline, rng, hits)
+
+        solutions = []
+        if limit > 0:
+            for solution in engine:
+                solutions.append(solution)
+                if len(solutions) == limit:
+                    break
+        # The search went through everything unless the limit or deadline stopped it
+        finished = len(solutions) < limit and (deadline is None or time.time() < deadline)
+
+        if mode == "monte-carlo" and order is None:
+            coverage_estimate = good_turing_coverage(hits)
+        elif finished and (order == "words" or (order is None and mode == "exhaustive")):
+            coverage_estimate = 1.0
+        else:
+            coverage_estimate = None
+
+        return {
+            "sides": sides,
+            "par": par,
+            "mode": mode,
+            "order": order,
+            "num_candidates": len(index),
+            "cached": cached,
+            "solutions": solutions,
+            "finished": finished,
+            "coverage_estimate": coverage_estimate,
+            "solve_time": round(time.time() - start, 6),
+        }
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "dictionary_words": len(self.dict_index),
+                "cached_boards": len(self._indexes),
+                "cache_size": self.cache_size,
+                "cache_hits": self.hits,
+                "cache_misses": self.misses,
+            }
+
+
+class SolverRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON over HTTP:
+        POST /solve   body is a solve request, see SolverService.solve()
+        GET /status   dictionary and cache stats
+    """
+
+    # Keep-alive, so a client can send request after request on one connection
+    protocol_version = "HTTP/1.1"
+
+    def send_json(self, status: int, body: Dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/status":
+            self.send_json(200, self.server.service.status())
+        else:
+            self.send_json(404, {"error": f"no such path {self.path}"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.path != "/solve":
+            self.send_json(404, {"error": f"no such path {self.path}"})
+            return
+        try:
+            request = json.loads(body)
+            if not isinstance(request, dict):
+                raise ValueError("the request must be a JSON object")
+            response = self.server.service.solve(request)
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            # Anything else is a bug, but the client still gets an answer and the connection lives on
+            self.log_error("error solving %r: %r", body, e)
+            self.send_json(500, {"error": f"internal error: {e!r}"})
+            return
+        self.send_json(200, response)
+
+    def address_string(self):
+        # Unix socket clients have no address
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix"
+
+
+class UnixSolverServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(
+    service: SolverService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_socket: Optional[str] = None
+) -> socketserver.BaseServer:
+    """A server handing requests to `service`, each on its own thread. Listens on `unix_socket` if given."""
+    if unix_socket is not None:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = UnixSolverServer(unix_socket, SolverRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), SolverRequestHandler)
+    server.service = service
+    return server
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument("-p", "--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument("-u", "--unix-socket", type=str, help="listen on the unix socket [unix-socket] instead")
+    parser.add_argument("-c", "--cache-size", type=int, default=INDEX_CACHE_SIZE, help="number of boards whose candidate index is kept")
+    args = parser.parse_args()
+
+    service = SolverService(cache_size=args.cache_size)
+    server = make_server(service, args.host, args.port, args.unix_socket)
+    where = args.unix_socket if args.unix_socket is not None else f"http://{args.host}:{server.server_address[1]}"
+    print(f"serving {len(service.dict_index)} words on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.unix_socket is not None:
+            os.remove(args.unix_socket)
@@ -1,10 +1,22 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-
-from json import loads
+import gzip
+import http.client
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from json import JSONDecoder, loads
+from typing import Optional, Tuple
+from urllib.parse import urljoin, urlsplit
 
 LETTER_BOXED_URL = 'https://www.nytimes.com/puzzles/letter-boxed'
+GAME_DATA_KEYS = ['ourSolution', 'dictionary', 'sides', 'date', 'par']
+GAME_DATA_MARKER = 'window.gameData'
+
+FETCH_TIMEOUT = 10
+MAX_REDIRECTS = 5
+FETCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Accept": "text/html",
+    "Accept-Encoding": "gzip",
+}
 
 
 # DEPRECATED:
@@ -28,18 +40,146 @@ LETTER_BOXED_URL = 'https://www.nytimes.com/puzzles/letter-boxed'
 # gameData struct remain the same.
 XPATH_SEARCH_STR = "//script[contains(text(), 'window.gameData')]"
 
+def clean_game_data(orig_dict: dict) -> dict:
+    data = {k: orig_dict[k] for k in orig_dict.keys() if k in GAME_DATA_KEYS}
+    for k in ['ourSolution', 'dictionary', 'sides']:
+        data[k] = [i.lower() for i in data[k]]
+    return data
+
+
+def extract_game_data(html: str) -> dict:
+    """
+    The gameData object assigned to window.gameData in the page's HTML.
+    Raises ValueError if it can't be found or parsed.
+    """
+    marker = html.find(GAME_DATA_MARKER)
+    if marker < 0:
+        raise ValueError(f"no {GAME_DATA_MARKER} in the page")
+    start = html.find('{', marker)
+    if start < 0:
+        raise ValueError(f"no object assigned to {GAME_DATA_MARKER}")
+    # raw_decode stops at the end of the object, ignoring the rest of the script
+    orig_dict, _ = JSONDecoder().raw_decode(html, start)
+    try:
+        return clean_game_data(orig_dict)
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"unexpected gameData: {e!r}")
+
+
+class GameDataFetcher:
+    """
+    Gets gameData from the Letter Boxed page over plain HTTP instead of a
+    browser. The connection is kept open and reused by later fetches, and
+    prefetch() runs a fetch in the background so it can overlap with other
+    work, like loading the dictionary.
+    """
+
+    def __init__(self, url: str = LETTER_BOXED_URL, timeout: float = FETCH_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self._conn = None
+        self._conn_key = None
+        self._executor = None
+        # One request at a time on the shared connection
+        self._lock = threading.Lock()
+
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        if self._conn is None or self._conn_key != (scheme, netloc):
+            self.close_connection()
+            conn_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            self._conn = conn_class(netloc, timeout=self.timeout)
+            self._conn_key = (scheme, netloc)
+        return self._conn
+
+    def _get(self, url: str) -> Tuple[http.client.HTTPResponse, bytes]:
+        parts = urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        for attempt in range(2):
+            conn = self._connection(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers=FETCH_HEADERS)
+                response = conn.getresponse()
+                return response, response.read()
+            except (http.client.HTTPException, OSError):
+                # The server may have closed the kept-alive connection. Retry once on a new one
+                self.close_connection()
+                if attempt == 1:
+                    raise
+
+    def get_html(self) -> str:
+        url = self.url
+        for _ in range(MAX_REDIRECTS + 1):
+            response, body = self._get(url)
+            if response.status in (301, 302, 303, 307, 308):
+                url = urljoin(url, response.getheader("Location"))
+                continue
+            if response.status != 200:
+                raise OSError(f"GET {url} returned {response.status} {response.reason}")
+            if response.getheader("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            return body.decode(response.headers.get_content_charset() or "utf-8", "replace")
+        raise OSError(f"too many redirects from {self.url}")
+
+    def fetch(self) -> dict:
+        with self._lock:
+            return extract_game_data(self.get_html())
+
+    def prefetch(self) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        return self._executor.submit(self.fetch)
+
+    def close_connection(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = None
+        self._conn_key = None
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.close_connection()
+
+
+def fetch_lbg_data(
+    fetcher: Optional[GameDataFetcher] = None, pending: Optional[Future] = None, fallback: bool = True
+) -> dict:
+    """
+    Today's gameData over plain HTTP, from `pending` (a fetcher's prefetch())
+    if given. If the page can't be fetched or has no gameData in it, falls
+    back to scraping it with the browser, unless `fallback` is False.
+    """
+    try:
+        if pending is not None:
+            return pending.result()
+        if fetcher is None:
+            fetcher = GameDataFetcher()
+            try:
+                return fetcher.fetch()
+            finally:
+                fetcher.close()
+        return fetcher.fetch()
+    except (OSError, http.client.HTTPException, ValueError) as e:
+        if not fallback:
+            raise
+        print(f"fetching gameData over HTTP failed ({e!r}), falling back to the browser")
+        return scrape_lbg_data()
+
+
 def scrape_lbg_data():
+    # Selenium is only needed (and imported) when the plain HTTP fetch doesn't work
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
 
     def get_data():
 
-        SELECT = ['ourSolution', 'dictionary', 'sides', 'date', 'par']
-
         data_elem = browser.find_element(By.XPATH, XPATH_SEARCH_STR)
         text = data_elem.get_property("text")
         idx = text.index('{')
         json_text = text[idx:]
         orig_dict = loads(json_text)
-        return {k: orig_dict[k] for k in orig_dict.keys() if k in SELECT}
+        return clean_game_data(orig_dict)
 
     op = webdriver.ChromeOptions()
     op.add_argument(argument="headless=new")
@@ -48,9 +188,6 @@ def scrape_lbg_data():
 
     data = get_data()
 
-    for k in ['ourSolution', 'dictionary', 'sides']:
-        data[k] = [i.lower() for i in data[k]]
-
     browser.close()
 
     return data
@@ -58,7 +195,7 @@ def scrape_lbg_data():
 
 if __name__ == "__main__":
 
-   data = scrape_lbg_data()
+   data = fetch_lbg_data()
    print(data.keys())
    print(f"{data['date']}")
    print(f"The sides are {data['sides']}")
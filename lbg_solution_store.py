@@ -0,0 +1,100 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Sequence, Set
+
+# Bits per word id in a solution's key. Word ids fit in a uint32 either way
+KEY_BITS = 32
+
+
+class SolutionStore:
+    """
+    In-memory set of solutions, kept as word ids into a table of interned
+    words (the candidate words, plus any new ones as they come up).
+
+    Solutions of each length are stored back to back in one array of ids,
+    and membership goes through a set of integer keys packing the ids, so
+    adding and looking up a solution take the same time however many are
+    stored. Iterating gives the solutions back as lists of words, in the
+    order they were added.
+    """
+
+    __slots__ = ("words", "word_ids", "_ids", "_keys", "_order")
+
+    def __init__(self, words: Iterable[str] = ()):
+        self.words: List[str] = []
+        self.word_ids: Dict[str, int] = {}
+        for w in words:
+            self._word_id(w)
+        # number of words -> flat array of the solutions' word ids
+        self._ids: Dict[int, array] = {}
+        # number of words -> keys of the solutions of that length
+        self._keys: Dict[int, Set[int]] = {}
+        # Number of words of each solution, in the order they were added
+        self._order = array("B")
+
+    def _word_id(self, word: str) -> int:
+        i = self.word_ids.get(word)
+        if i is None:
+            i = self.word_ids[word] = len(self.words)
+            self.words.append(word)
+        return i
+
+    @staticmethod
+    def _pack(ids: Sequence[int]) -> int:
+        key = 0
+        for i in ids:
+            key = (key << KEY_BITS) | i
+        return key
+
+    def key(self, solution: Sequence[str]) -> int:
+        """Integer that identifies `solution` among those of its length."""
+        return self._pack([self._word_id(w) for w in solution])
+
+    def add(self, solution: Sequence[str]) -> bool:
+        """Store `solution`, returning False if it was already there."""
+        ids = [self._word_id(w) for w in solution]
+        key = self._pack(ids)
+        n = len(ids)
+        keys = self._keys.get(n)
+        if keys is None:
+            keys = self._keys[n] = set()
+            self._ids[n] = array("I")
+        elif key in keys:
+            return False
+        keys.add(key)
+        self._ids[n].extend(ids)
+        self._order.append(n)
+        return True
+
+    def __contains__(self, solution: Sequence[str]) -> bool:
+        ids = []
+        for w in solution:
+            i = self.word_ids.get(w)
+            if i is None:
+                return False
+            ids.append(i)
+        return self._pack(ids) in self._keys.get(len(ids), ())
+
+    def __len__(self):
+        return len(self._order)
+
+    def __iter__(self) -> Iterator[List[str]]:
+        words = self.words
+        position = {n: 0 for n in self._ids}
+        for n in self._order:
+            start = position[n]
+            position[n] = start + n
+            yield [words[i] for i in self._ids[n][start:start + n]]
+
+    def lengths(self) -> List[int]:
+        """Numbers of words there are solutions with."""
+        return sorted(self._ids)
+
+    def count(self, length: int) -> int:
+        return len(self._keys.get(length, ()))
+
+    def solutions(self, length: int) -> Iterator[List[str]]:
+        """The solutions of `length` words, in the order they were added."""
+        ids = self._ids.get(length, array("I"))
+        words = self.words
+        for start in range(0, len(ids), length):
+            yield [words[i] for i in ids[start:start + length]]
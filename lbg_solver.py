@@ -0,0 +1,751 @@
+import heapq
+import itertools
+import random
+import time
+import concurrent.futures
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from lbg_utils import lazy_import
+
+np = lazy_import("numpy")
+
+# How many pieces of the search each worker gets in parallel_solutions()
+CHUNKS_PER_JOB = 16
+# Most (chain, word) pairs _grow_table_chains() looks at in one go
+GROW_CHUNK_CELLS = 1 << 16
+# Boards of up to this many letters get superset tables (see superset_table()),
+# which take 2^letters entries per board letter
+MAX_TABLE_LETTERS = 16
+
+
+def letter_bits(super_set: str) -> Dict[str, int]:
+    """
+    One bit per board letter, in board order. Masks are plain python ints,
+    so they are as wide as the board needs.
+    """
+    return {letter: 1 << i for i, letter in enumerate(super_set)}
+
+
+class CandidateIndex:
+    """
+    Bitmask view of a board's candidate words.
+
+    Every letter of the super set is given one bit, so each candidate word
+    can be described by the mask of board letters it covers. Words are
+    referred to by their position (word id) in `words` and bucketed by their
+    first letter, which is all the solver needs to chain words together.
+    """
+
+    def __init__(self, words: Iterable[str], super_set: str):
+        self.super_set = super_set
+        self.bits = letter_bits(super_set)
+        self.full_mask = (1 << len(super_set)) - 1
+
+        self.words = list(words)
+        self.masks = [self.word_mask(w) for w in self.words]
+
+        self.by_first: Dict[str, List[int]] = {letter: [] for letter in super_set}
+        for word_id, word in enumerate(self.words):
+            self.by_first[word[0]].append(word_id)
+
+        # Union of everything reachable from a given letter in a single word.
+        # Used to prune chains that can no longer be completed.
+        self.bucket_union = {
+            letter: _union(self.masks[i] for i in ids) for letter, ids in self.by_first.items()
+        }
+        self.max_gain = max((bin(m).count("1") for m in self.masks), default=0)
+        self.lengths = [len(w) for w in self.words]
+        self.last = [w[-1] for w in self.words]
+
+        # The first letter buckets again, with the words that cover the same
+        # letters grouped together: (mask, word ids) pairs. Far fewer masks
+        # than words, which is what the random walker goes through.
+        self.mask_groups: Dict[str, List[Tuple[int, List[int]]]] = {}
+        for letter, ids in self.by_first.items():
+            groups: Dict[int, List[int]] = {}
+            for i in ids:
+                groups.setdefault(self.masks[i], []).append(i)
+            self.mask_groups[letter] = list(groups.items())
+
+    def word_mask(self, word: str) -> int:
+        mask = 0
+        for letter in word:
+            mask |= self.bits[letter]
+        return mask
+
+    def __len__(self):
+        return len(self.words)
+
+
+def _union(masks: Iterable[int]) -> int:
+    ret = 0
+    for m in masks:
+        ret |= m
+    return ret
+
+
+def random_walk(index: CandidateIndex, max_words: int, rng: random.Random = random) -> Optional[List[str]]:
+    """
+    One random greedy walk of the monte carlo solver, or None if it doesn't
+    cover every letter within `max_words` words.
+
+    The walk starts from a random word. Each next word starts with the last
+    letter of the previous one and covers all of the missing letters if it
+    can. Otherwise it covers the longest run of missing letters, in board
+    order. Ties are broken at random. Each step only looks at the distinct
+    masks of one first letter bucket.
+
+    A word that was already used covers nothing new, so it can never be
+    picked again and no "used" bookkeeping is needed.
+    """
+    if max_words < 1 or len(index) == 0:
+        return None
+    full = index.full_mask
+    masks = index.masks
+
+    w = rng.randrange(len(index))
+    chain = [w]
+    covered = masks[w]
+    while covered != full:
+        if len(chain) == max_words:
+            return None
+        remaining = full & ~covered
+        # A word's rank is the lowest missing letter it leaves uncovered, so
+        # covering a longer run of them ranks higher. It has to cover the
+        # first missing letter at least.
+        best = remaining & -remaining
+        best_groups = []
+        for mask, ids in index.mask_groups[index.last[w]]:
+            left = remaining & ~mask
+            rank = left & -left if left else full + 1
+            if rank > best:
+                best = rank
+                best_groups = [ids]
+            elif rank == best and best_groups:
+                best_groups.append(ids)
+        if not best_groups:
+            return None
+
+        r = rng.randrange(sum(len(ids) for ids in best_groups))
+        for ids in best_groups:
+            if r < len(ids):
+                w = ids[r]
+                break
+            r -= len(ids)
+        chain.append(w)
+        covered |= masks[w]
+
+    return [index.words[i] for i in chain]
+
+
+def monte_carlo_solutions(
+    index: CandidateIndex,
+    max_words: int,
+    break_out_counter: int,
+    deadline: Optional[float] = None,
+    rng: random.Random = random,
+    hits: Optional[Dict] = None,
+    known=None,
+    key=tuple,
+    metrics=None,
+    progress=None,
+) -> Iterator[List[str]]:
+    """
+    The monte carlo search: yield each new solution random_walk() comes up
+    with, until `break_out_counter` walks in a row found nothing new, or
+    until `deadline` passes if there is one.
+
+    Walks that dead-end count towards the break-out counter too, so the
+    search ends on a board with no solution within `max_words` words.
+
+    `hits` counts how often each solution was drawn, by `key(solution)`, to
+    estimate the coverage from (see good_turing_coverage()). Solutions in
+    `known`, e.g. found by an earlier search, aren't new. A SolveMetrics
+    `metrics` and a Progress `progress` are kept up to date if given.
+    """
+    if hits is None:
+        hits = {}
+    counter = 0
+    max_counter = 0
+    found = 0
+    while deadline is None or time.time() < deadline:
+        if metrics is None:
+            solution = random_walk(index, max_words, rng)
+        else:
+            start = time.perf_counter()
+            solution = random_walk(index, max_words, rng)
+            metrics.add_time("random_walk", time.perf_counter() - start)
+            metrics.count("iterations")
+
+        if solution is None:
+            if metrics is not None:
+                metrics.count("dead_ends")
+        else:
+            solution_key = key(solution)
+            hits[solution_key] = hits.get(solution_key, 0) + 1
+            if hits[solution_key] == 1 and (known is None or solution not in known):
+                found += 1
+                max_counter = max(max_counter, counter)
+                counter = 0
+                yield solution
+                continue
+            if metrics is not None:
+                metrics.count("duplicate_hits")
+
+        counter += 1
+        if deadline is None and counter > break_out_counter:
+            return
+        if progress is not None:
+            progress.update(found, max_counter)
+
+
+def exhaustive_chains(
+    index: CandidateIndex,
+    max_words: int,
+    first_words: Optional[Iterable[int]] = None,
+    min_words: int = 1,
+    deadline: Optional[float] = None,
+) -> Iterator[Tuple[int, ...]]:
+    """
+    Enumerate every solution of at most `max_words` words, as tuples of word ids.
+
+    A solution is a chain of words where each word starts with the last letter
+    of the previous one, no word is used twice, and the chain stops as soon as
+    every board letter is covered. Like the monte carlo walker, every word must
+    cover at least one letter that is still missing, so padding words that add
+    nothing are never generated.
+
+    `first_words` restricts the search to solutions starting with one of the
+    given word ids, which is how the search space is split between workers.
+    Solutions of fewer than `min_words` words are skipped.
+
+    The search stops early once time.time() passes `deadline`.
+    """
+    full = index.full_mask
+    chain: List[int] = []
+
+    # Returns True when the deadline has passed, to unwind the whole search
+    def extend(covered: int, words_left: int, candidates: Iterable[int]):
+        if deadline is not None and time.time() >= deadline:
+            return True
+        remaining = full & ~covered
+        # Even the best possible words can't cover what is left
+        if bin(remaining).count("1") > words_left * index.max_gain:
+            return False
+        for word_id in candidates:
+            mask = index.masks[word_id]
+            # Also rules out reusing a word, since it can't add anything new
+            if not mask & remaining:
+                continue
+            new_covered = covered | mask
+            chain.append(word_id)
+            if new_covered == full:
+                if len(chain) >= min_words:
+                    yield tuple(chain)
+            elif words_left > 1:
+                last = index.words[word_id][-1]
+                # With a single word to go, it has to cover everything that is left
+                if words_left > 2 or not (full & ~new_covered) & ~index.bucket_union[last]:
+                    if (yield from extend(new_covered, words_left - 1, index.by_first[last])):
+                        return True
+            chain.pop()
+        return False
+
+    if max_words < 1:
+        return
+    if first_words is None:
+        first_words = range(len(index))
+    yield from extend(0, max_words, first_words)
+
+
+def exhaustive_solutions(
+    index: CandidateIndex, max_words: int, deadline: Optional[float] = None
+) -> Iterator[List[str]]:
+    for chain in exhaustive_chains(index, max_words, deadline=deadline):
+        yield [index.words[i] for i in chain]
+
+
+def solutions_by_word_count(
+    index: CandidateIndex, max_words: int, deadline: Optional[float] = None
+) -> Iterator[List[str]]:
+    """
+    Same solutions as exhaustive_solutions(), fewest words first. Each word
+    count is a fresh search, which only repeats the much cheaper shallower ones.
+    """
+    for num_words in range(1, max_words + 1):
+        for chain in exhaustive_chains(index, num_words, min_words=num_words, deadline=deadline):
+            yield [index.words[i] for i in chain]
+
+
+# Each worker process builds its own read-only index once, in _init_worker
+_worker_index: Optional[CandidateIndex] = None
+
+
+def _init_worker(words: List[str], super_set: str):
+    global _worker_index
+    _worker_index = CandidateIndex(words, super_set)
+
+
+def _solve_chunk(max_words: int, first_words: List[int], deadline: Optional[float]) -> List[Tuple[int, ...]]:
+    return list(exhaustive_chains(_worker_index, max_words, first_words, deadline=deadline))
+
+
+def parallel_solutions(
+    index: CandidateIndex, max_words: int, jobs: int, deadline: Optional[float] = None
+) -> Iterator[List[str]]:
+    """
+    Same solutions as exhaustive_solutions(), found by a pool of `jobs` processes.
+
+    The search is split by first word. The candidates are sorted by coverage,
+    so first words are dealt out round-robin over many more chunks than there
+    are workers to keep the expensive ones from piling up in the same chunk.
+    """
+    if jobs <= 1:
+        yield from exhaustive_solutions(index, max_words, deadline)
+        return
+
+    num_chunks = min(len(index), jobs * CHUNKS_PER_JOB)
+    chunks = [list(range(i, len(index), num_chunks)) for i in range(num_chunks)]
+    pool = concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(index.words, index.super_set)
+    )
+    try:
+        for chains in pool.map(_solve_chunk, [max_words] * num_chunks, chunks, [deadline] * num_chunks):
+            for chain in chains:
+                yield [index.words[i] for i in chain]
+    finally:
+        # If the caller stops early, don't start on the chunks nobody will read
+        pool.shutdown(cancel_futures=True)
+
+
+def shortest_solutions(
+    index: CandidateIndex, max_words: int, k: Optional[int] = None, deadline: Optional[float] = None
+) -> Iterator[List[str]]:
+    """
+    Yield solutions of at most `max_words` words in order of total letters,
+    shortest first. Same solution space as exhaustive_solutions().
+
+    This is an A* search over partial chains. A chain's state is (last letter,
+    covered letters, words used), since that is all that decides how it can be
+    finished, and a chain costs its number of letters. Every word after the
+    first repeats the previous word's last letter, so finishing a chain that
+    still misses u letters takes at least u + 1 more letters. That bound is
+    admissible, so solutions come out in order of total length.
+
+    With `k`, a state only keeps the k cheapest chains that reach it, which is
+    all the k shortest solutions can need. Without it the search is only
+    bounded by the caller stopping early, or by `deadline` (a time.time()).
+    """
+    full = index.full_mask
+    # (letters so far + lower bound on the rest, letters so far, tie breaker, covered, words)
+    queue = []
+    tie = 0
+    # state -> costs of the k cheapest chains reaching it so far, negated as a max-heap
+    kept: Dict[Tuple[str, int, int], List[int]] = {}
+
+    def push(cost: int, covered: int, chain: Tuple[int, ...]):
+        nonlocal tie
+        if k is not None and covered != full:
+            state = (index.last[chain[-1]], covered, len(chain))
+            costs = kept.get(state)
+            if costs is None:
+                kept[state] = [-cost]
+            elif len(costs) < k:
+                heapq.heappush(costs, -cost)
+            elif cost < -costs[0]:
+                heapq.heapreplace(costs, -cost)
+            else:
+                return
+        uncovered = bin(full & ~covered).count("1")
+        heapq.heappush(queue, (cost + uncovered + bool(uncovered), cost, tie, covered, chain))
+        tie += 1
+
+    for word_id in range(len(index)):
+        push(index.lengths[word_id], index.masks[word_id], (word_id,))
+
+    found = 0
+    while queue:
+        if deadline is not None and time.time() >= deadline:
+            return
+        _, cost, _, covered, chain = heapq.heappop(queue)
+        if covered == full:
+            yield [index.words[i] for i in chain]
+            found += 1
+            if k is not None and found >= k:
+                return
+            continue
+
+        words_left = max_words - len(chain)
+        remaining = full & ~covered
+        if words_left < 1 or bin(remaining).count("1") > words_left * index.max_gain:
+            continue
+
+        masks, lengths = index.masks, index.lengths
+        for word_id in index.by_first[index.last[chain[-1]]]:
+            if masks[word_id] & remaining:
+                push(cost + lengths[word_id], covered | masks[word_id], chain + (word_id,))
+
+
+def ruled_out(index: CandidateIndex, max_words: int) -> bool:
+    """
+    True if a quick look shows the board has no solution of at most
+    `max_words` words. False means there may be one.
+
+    The words of a solution have to have enough letters between them, and
+    a chain of up to `max_words` words starting with a given letter can
+    only cover what the words of that letter, the words of their last
+    letters and so on cover. So if no first letter can reach every letter
+    that way, there is no solution.
+    """
+    full = index.full_mask
+    if max_words < 1 or bin(full).count("1") > max_words * index.max_gain:
+        return True
+    # Last letters of the words starting with each letter
+    ends = {letter: set(index.last[i] for i in ids) for letter, ids in index.by_first.items()}
+    # reach[letter]: letters a chain of up to `num_words` words starting with `letter` could cover
+    reach = dict(index.bucket_union)
+    for _ in range(max_words - 1):
+        reach = {
+            letter: _union(itertools.chain([index.bucket_union[letter]], (reach[last] for last in ends[letter])))
+            for letter in index.super_set
+        }
+    return all(covered != full for covered in reach.values())
+
+
+def superset_table(index: CandidateIndex, values: List[int], fill: int, reduce) -> "np.ndarray":
+    """
+    table[l, s] is `reduce` (np.add or np.minimum) of the `values` of the words
+    starting with the l-th board letter whose mask covers all of the letters
+    in mask s, or `fill` if there are none. Only for boards of up to
+    MAX_TABLE_LETTERS letters.
+    """
+    num_letters = len(index.super_set)
+    table = np.full((num_letters, 1 << num_letters), fill, dtype=np.int64)
+    positions = {letter: i for i, letter in enumerate(index.super_set)}
+    firsts = np.array([positions[w[0]] for w in index.words], dtype=np.intp)
+    reduce.at(table, (firsts, np.array(index.masks, dtype=np.intp)), np.array(values, dtype=np.int64))
+    # Pass each entry on to the masks with one letter less, one letter at a time
+    for bit in range(num_letters):
+        pairs = table.reshape(num_letters, -1, 2, 1 << bit)
+        reduce(pairs[:, :, 0, :], pairs[:, :, 1, :], out=pairs[:, :, 0, :])
+    return table
+
+
+def shortest_solution(index: CandidateIndex, max_words: int) -> Optional[List[str]]:
+    """
+    A solution of at most `max_words` words with the fewest letters in total,
+    or None if there is none. Same total length as the first solution
+    shortest_solutions() yields, but much quicker when only one is needed.
+
+    Only the shortest word of each (first letter, last letter, mask) can be
+    part of it, and only the cheapest chain reaching each (last letter,
+    covered letters) state matters, so the search goes through those states
+    one more word at a time instead of through chains of words.
+
+    The best solution of one or two words is found first, and longer ones
+    only need to beat it. On boards with superset tables (see
+    superset_table()), all of the states are grown a word at a time with
+    NumPy. On larger boards without a solution yet, longer solutions are
+    looked for with a limit on their total letters, starting from the
+    fewest they could have and raised to the lowest bound that was cut off
+    until one turns up, so each run only goes through the chains that can
+    still make the limit.
+
+    Boards that ruled_out() rejects are not searched at all.
+    """
+    if ruled_out(index, max_words):
+        return None
+    full = index.full_mask
+    groups: Dict[Tuple[str, str, int], int] = {}
+    for word_id, mask in enumerate(index.masks):
+        key = (index.words[word_id][0], index.last[word_id], mask)
+        other = groups.get(key)
+        if other is None or index.lengths[word_id] < index.lengths[other]:
+            groups[key] = word_id
+    # first letter -> (length, mask, last letter, word id), shortest first
+    by_first: Dict[str, List[Tuple[int, int, str, int]]] = {letter: [] for letter in index.super_set}
+    for (first, last, mask), word_id in groups.items():
+        by_first[first].append((index.lengths[word_id], mask, last, word_id))
+    for words in by_first.values():
+        words.sort()
+
+    # Shortest word (length << 32 | word id) starting with each letter that covers a given mask
+    shortest = None
+    if len(index.super_set) <= MAX_TABLE_LETTERS:
+        shortest = superset_table(
+            index, [(length << 32) | i for i, length in enumerate(index.lengths)], _NO_LIMIT, np.minimum
+        )
+
+    best_cost, best_chain = _NO_LIMIT, None
+    # (last letter, covered) -> (letters, word ids) of the cheapest one word chain reaching it
+    first_layer: Dict[Tuple[str, int], Tuple[int, Tuple[int, ...]]] = {}
+    for length, mask, last, word_id in itertools.chain.from_iterable(by_first.values()):
+        if mask == full:
+            if length < best_cost:
+                best_cost, best_chain = length, (word_id,)
+        elif (last, mask) not in first_layer or length < first_layer[(last, mask)][0]:
+            first_layer[(last, mask)] = (length, (word_id,))
+    if max_words >= 2:
+        best_cost, best_chain, _ = _finish_chains(index, by_first, shortest, first_layer, best_cost, best_chain)
+
+    # A solution of three words or more has at least two repeated letters
+    limit = bin(full).count("1") + 2
+    if shortest is not None and max_words >= 3 and limit < best_cost:
+        best_cost, best_chain = _grow_table_chains(index, by_first, shortest, first_layer, max_words, best_cost, best_chain)
+    # Without a table, deepen the limit run by run
+    while shortest is None and max_words >= 3 and limit < best_cost:
+        # With a solution already, one run finds anything shorter
+        cost, chain, next_limit = _extend_chains(
+            index, by_first, first_layer, max_words, best_cost if best_chain is not None else limit + 1
+        )
+        if chain is not None:
+            best_chain = chain
+            break
+        # If nothing was cut off by the limit, there is no longer solution at all
+        if best_chain is not None or next_limit == _NO_LIMIT:
+            break
+        limit = next_limit
+
+    if best_chain is None:
+        return None
+    return [index.words[i] for i in best_chain]
+
+
+# Bound on total letters for searches that have none
+_NO_LIMIT = 1 << 62
+
+
+def _finish_chains(
+    index: CandidateIndex, by_first, shortest, layer, best_cost: int, best_chain: Optional[Tuple[int, ...]]
+) -> Tuple[int, Optional[Tuple[int, ...]], int]:
+    """
+    Finish each chain of `layer` the cheapest way with one more word, if that
+    costs fewer than `best_cost` letters. Returns the new best cost and chain,
+    and the lowest cost that was cut off for not being below `best_cost`.
+
+    With the `shortest` superset table, that is one lookup per chain, all at once.
+    """
+    full = index.full_mask
+    if shortest is not None:
+        if not layer:
+            return best_cost, best_chain, _NO_LIMIT
+        positions = {letter: i for i, letter in enumerate(index.super_set)}
+        states = list(layer)
+        lasts = np.fromiter((positions[last] for last, _ in states), dtype=np.intp, count=len(states))
+        remaining = full & ~np.fromiter((covered for _, covered in states), dtype=np.int64, count=len(states))
+        costs = np.fromiter((cost for cost, _ in layer.values()), dtype=np.int64, count=len(states))
+        words = shortest[lasts, remaining]
+        finishable = words != _NO_LIMIT
+        totals = np.where(finishable, costs + (words >> 32), _NO_LIMIT)
+        i = int(np.argmin(totals))
+        if totals[i] < best_cost:
+            best_cost = int(totals[i])
+            best_chain = layer[states[i]][1] + (int(words[i] & 0xFFFFFFFF),)
+        over = totals[finishable & (totals >= best_cost)]
+        return best_cost, best_chain, int(over.min()) if len(over) else _NO_LIMIT
+
+    bucket_union = index.bucket_union
+    next_limit = _NO_LIMIT
+    # The cheapest chains for what they cover first, to find a good bound early
+    for (last, covered), (cost, chain) in sorted(layer.items(), key=lambda item: item[1][0] - bin(item[0][1]).count("1")):
+        remaining = full & ~covered
+        if remaining & ~bucket_union[last]:
+            continue
+        for length, mask, _, word_id in by_first[last]:
+            if cost + length >= best_cost:
+                next_limit = min(next_limit, cost + length)
+                break
+            if mask & remaining == remaining:
+                best_cost, best_chain = cost + length, chain + (word_id,)
+                break
+    return best_cost, best_chain, next_limit
+
+
+def _extend_chains(
+    index: CandidateIndex, by_first, first_layer, max_words: int, best_cost: int
+) -> Tuple[int, Optional[Tuple[int, ...]], int]:
+    """
+    The cheapest solution of three words or more under `best_cost` letters,
+    growing the one word chains of `first_layer`, like _finish_chains().
+    """
+    full = index.full_mask
+    max_gain = index.max_gain
+    best_chain = None
+    next_limit = _NO_LIMIT
+    layer = first_layer
+    # state -> fewest letters it was reached with, by any number of words so far
+    seen = {state: cost for state, (cost, _) in layer.items()}
+    for num_words in range(2, max_words):
+        words_left = max_words - num_words
+        next_layer: Dict[Tuple[str, int], Tuple[int, Tuple[int, ...]]] = {}
+        for (last, covered), (cost, chain) in layer.items():
+            # Finishing takes at least one letter per missing one, plus the
+            # repeated first letter, and this chain has to take two more words
+            bound = cost + bin(full & ~covered).count("1") + 2
+            if bound >= best_cost:
+                next_limit = min(next_limit, bound)
+                continue
+            for length, mask, new_last, word_id in by_first[last]:
+                new_cost = cost + length
+                # The words are shortest first, so the rest can't do better
+                if new_cost + 2 >= best_cost:
+                    next_limit = min(next_limit, new_cost + 2)
+                    break
+                new_covered = covered | mask
+                # Chains that can be finished right away already were
+                if new_covered == covered or new_covered == full:
+                    continue
+                new_uncovered = bin(full & ~new_covered).count("1")
+                if new_uncovered > words_left * max_gain:
+                    continue
+                if new_cost + new_uncovered + 1 >= best_cost:
+                    next_limit = min(next_limit, new_cost + new_uncovered + 1)
+                    continue
+                state = (new_last, new_covered)
+                if seen.get(state, _NO_LIMIT) <= new_cost:
+                    continue
+                seen[state] = new_cost
+                next_layer[state] = (new_cost, chain + (word_id,))
+        layer = next_layer
+        if not layer:
+            break
+        best_cost, best_chain, cut = _finish_chains(index, by_first, None, layer, best_cost, best_chain)
+        next_limit = min(next_limit, cut)
+    return best_cost, best_chain, next_limit
+
+
+def _grow_table_chains(
+    index: CandidateIndex, by_first, shortest, first_layer, max_words: int, best_cost: int, best_chain: Optional[Tuple[int, ...]]
+) -> Tuple[int, Optional[Tuple[int, ...]]]:
+    """
+    The cheapest solution of three words or more under `best_cost` letters,
+    for boards with the `shortest` superset table. Like _extend_chains(),
+    but each layer of chains is grown and finished with NumPy all at once,
+    and as it has every state, one pass is enough.
+    """
+    num_letters = len(index.super_set)
+    full = index.full_mask
+    positions = {letter: i for i, letter in enumerate(index.super_set)}
+    everything = np.arange(1 << num_letters)
+    popcount = np.zeros(1 << num_letters, dtype=np.int64)
+    for bit in range(num_letters):
+        popcount += (everything >> bit) & 1
+
+    # (masks, last letters, lengths, word ids) of the words starting with each letter
+    words = []
+    for letter in index.super_set:
+        entries = by_first[letter]
+        words.append((
+            np.array([mask for _, mask, _, _ in entries], dtype=np.int64),
+            np.array([positions[last] for _, _, last, _ in entries], dtype=np.int64),
+            np.array([length for length, _, _, _ in entries], dtype=np.int64),
+            np.array([word_id for _, _, _, word_id in entries], dtype=np.int64),
+        ))
+
+    states = list(first_layer.items())
+    last = np.array([positions[last] for (last, _), _ in states], dtype=np.int64)
+    covered = np.array([covered for (_, covered), _ in states], dtype=np.int64)
+    cost = np.array([cost for _, (cost, _) in states], dtype=np.int64)
+    chains = np.array([chain for _, (_, chain) in states], dtype=np.int64).reshape(len(states), 1)
+    # state (last << num_letters | covered) -> fewest letters it was reached with so far
+    seen = np.full(num_letters << num_letters, _NO_LIMIT, dtype=np.int64)
+    seen[(last << num_letters) | covered] = cost
+
+    for num_words in range(2, max_words):
+        most_uncovered = (max_words - num_words) * index.max_gain
+        order = np.argsort(last, kind="stable")
+        starts = np.searchsorted(last[order], np.arange(num_letters + 1))
+        grown = []
+        for letter in range(num_letters):
+            masks, lasts, lengths, word_ids = words[letter]
+            if len(masks) == 0:
+                continue
+            # A few chains at a time, so memory stays the same however many there are
+            step = max(1, GROW_CHUNK_CELLS // len(masks))
+            for chunk_start in range(starts[letter], starts[letter + 1], step):
+                ids = order[chunk_start:min(chunk_start + step, starts[letter + 1])]
+                new_covered = covered[ids, None] | masks[None, :]
+                new_cost = cost[ids, None] + lengths[None, :]
+                uncovered = popcount[full & ~new_covered]
+                # Chains that cover everything already were finished, and the rest
+                # still need a word of at least one letter more than they miss
+                keep = (
+                    (new_covered != covered[ids, None])
+                    & (uncovered > 0)
+                    & (uncovered <= most_uncovered)
+                    & (new_cost + uncovered + 1 < best_cost)
+                )
+                parent, word = np.nonzero(keep)
+                new_last = lasts[word]
+                new_covered = new_covered[parent, word]
+                new_cost = new_cost[parent, word]
+
+                # Only chains cheaper than any other to their state so far go on,
+                # whether that one has fewer words or came up in an earlier chunk
+                keys = (new_last << num_letters) | new_covered
+                pick = _cheapest_per_key(keys, new_cost)
+                pick = pick[new_cost[pick] < seen[keys[pick]]]
+                seen[keys[pick]] = new_cost[pick]
+                grown.append((new_last[pick], new_covered[pick], new_cost[pick], ids[parent[pick]], word_ids[word[pick]]))
+        if not grown:
+            break
+        new_last, new_covered, new_cost, parent, word_id = (np.concatenate(column) for column in zip(*grown))
+        if len(new_last) == 0:
+            break
+
+        # A later chunk may have found a cheaper chain to a state than an earlier one
+        pick = _cheapest_per_key((new_last << num_letters) | new_covered, new_cost)
+        last, covered, cost = new_last[pick], new_covered[pick], new_cost[pick]
+        chains = np.column_stack([chains[parent[pick]], word_id[pick]])
+
+        found = shortest[last, full & ~covered]
+        totals = np.where(found != _NO_LIMIT, cost + (found >> 32), _NO_LIMIT)
+        i = int(np.argmin(totals))
+        if totals[i] < best_cost:
+            best_cost = int(totals[i])
+            best_chain = tuple(chains[i].tolist()) + (int(found[i] & 0xFFFFFFFF),)
+    return best_cost, best_chain
+
+
+def _cheapest_per_key(keys: "np.ndarray", costs: "np.ndarray") -> "np.ndarray":
+    """Positions of the lowest cost entry of each key."""
+    order = np.lexsort((costs, keys))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = keys[order][1:] != keys[order][:-1]
+    return order[first]
+
+
+def count_two_word_solutions(index: CandidateIndex) -> int:
+    """
+    Number of 2-word solutions, the same ones exhaustive_chains() would find,
+    counted without listing them. First words are grouped by last letter and
+    mask, and second words by mask, so it only goes over pairs of groups, or
+    looks each group up in a superset table on boards that have one.
+    """
+    full = index.full_mask
+    # (last letter, mask) -> number of first words with them. A word that
+    # covers everything is a 1-word solution, and can't start a 2-word one
+    first_groups: Dict[Tuple[str, int], int] = {}
+    for word_id, mask in enumerate(index.masks):
+        if mask != full:
+            key = (index.last[word_id], mask)
+            first_groups[key] = first_groups.get(key, 0) + 1
+    if not first_groups:
+        return 0
+
+    if len(index.super_set) <= MAX_TABLE_LETTERS:
+        # Second words starting with each letter that cover what the first word left
+        counts = superset_table(index, [1] * len(index), 0, np.add)
+        positions = {letter: i for i, letter in enumerate(index.super_set)}
+        keys = list(first_groups)
+        lasts = np.array([positions[last] for last, _ in keys], dtype=np.intp)
+        remaining = full & ~np.array([mask for _, mask in keys], dtype=np.int64)
+        num_first = np.array(list(first_groups.values()), dtype=np.int64)
+        return int((num_first * counts[lasts, remaining]).sum())
+
+    total = 0
+    for (last, first_mask), num_first in first_groups.items():
+        for mask, ids in index.mask_groups[last]:
+            if first_mask | mask == full:
+                total += num_first * len(ids)
+    return total
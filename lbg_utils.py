@@ -1,20 +1,73 @@
 import ast
-from typing import Optional, List
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Dict, Hashable, Iterable, Iterator, Optional, List, Tuple
 
-def decode(lines: List[str]):
-        if lines is None or len(lines) == 0:
-              return ""
-        # `lines` is a list of strings of form: "['word1', 'word2']\n"
-        # This method decodes this string back into a list of strings,
-        # as originally solved by the lbg_solver
-        ret_list = []
+def lazy_import(name: str) -> ModuleType:
+        # The module `name`, loaded the first time one of its attributes is used.
+        # Keeps heavy dependencies like numpy out of the import of modules that
+        # only need them on some code paths.
+        if name in sys.modules:
+            return sys.modules[name]
+        spec = importlib.util.find_spec(name)
+        loader = importlib.util.LazyLoader(spec.loader)
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        loader.exec_module(module)
+        return module
+
+def parse_solution(line: str) -> List[str]:
+        # Solutions are written with str(list), so for plain words the line is
+        # always "['word1', 'word2']" and splitting it is enough. Anything else
+        # (quotes or escapes inside a word) goes through ast.
+        l = line.strip()
+        if l.startswith("['") and l.endswith("']") and '"' not in l and "\\" not in l:
+            return l[2:-2].split("', '")
+        if l == "[]":
+            return []
+        return ast.literal_eval(l)
+
+def iter_decode(lines: Iterable[str]) -> Iterator[List[str]]:
+        # Streaming version of decode(): `lines` can be an open file, and only
+        # one solution is held at a time
         for line in lines:
             l = line.strip('\n')
             if len(l) < 3:
                 print(f"Found line {line} of length {len(l)}")
             try:
-                ret_list.append(ast.literal_eval(l))
+                yield parse_solution(l)
             except SyntaxError:
                   print(f"AST Error: couldn't handle {line}")
 
-        return ret_list
+def decode(lines: List[str]):
+        if lines is None or len(lines) == 0:
+              return ""
+        # `lines` is a list of strings of form: "['word1', 'word2']\n"
+        # This method decodes this string back into a list of strings,
+        # as originally solved by the lbg_solver
+        return list(iter_decode(lines))
+
+def good_turing_coverage(hits: Dict[Hashable, int]) -> Optional[float]:
+        # Good-Turing estimate of how much of the solution space (weighted by how
+        # likely a random draw is to find each solution) has been seen, given how
+        # many times each solution was drawn: 1 - (seen exactly once) / (draws)
+        draws = sum(hits.values())
+        if draws == 0:
+              return None
+        singletons = sum(1 for n in hits.values() if n == 1)
+        return 1 - singletons / draws
+
+def parse_duration(text: str) -> float:
+        # "200ms", "2s", "1.5m" or plain seconds, in seconds
+        text = text.strip().lower()
+        for suffix, scale in (("ms", 0.001), ("s", 1.0), ("m", 60.0)):
+            if text.endswith(suffix):
+                return float(text[:-len(suffix)]) * scale
+        return float(text)
+
+def parse_geometry(text: str) -> Tuple[int, int]:
+        # "5x4" is a board of 5 sides of 4 letters
+        num_sides, side_len = text.lower().split("x")
+        return int(num_sides), int(side_len)
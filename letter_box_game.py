@@ -1,21 +1,110 @@
 import argparse
-from datetime import date
 import time
 import os
 import random
-from english_words import get_english_words_set
-from lbg_site_scraper import scrape_lbg_data
-from lbg_utils import decode
-import copy
+from lbg_puzzle_source import PuzzleSource, ArchiveSource
+from lbg_archive import SolutionArchive, TotalLengthArchive
+from lbg_utils import good_turing_coverage, lazy_import, parse_duration
+from lbg_solver import CandidateIndex, letter_bits, monte_carlo_solutions, parallel_solutions, shortest_solutions, solutions_by_word_count
+from lbg_dictionary import DictionaryIndex
+from lbg_metrics import METRICS_FILE_NAME, Progress, SolveMetrics
+from lbg_solution_store import SolutionStore
+import heapq
+import itertools
+from typing import List, Optional, Tuple
+
+np = lazy_import("numpy")
 
 # CONSTANTS
 MIN_WORD_LEN = 3
+# Shape of the NYT board. Boards can have any number of sides of any (equal)
+# length, as long as no letter is on it twice
 MAX_NUM_LETTER_SETS = 4
-ENG_DICT_FILE_PATH = os.environ["HOME"] + "/eng_dictionary.txt"
-STATS_FILE_PATH = os.environ["HOME"] + "/LetterBoxed/LetterBoxedStatistics.csv"
-SOLUTIONS_DIR_PATH = os.environ["HOME"] + "/LetterBoxed/solutions_archive/"
+LETTER_SET_LEN = 3
+SOLVE_MODES = ["monte-carlo", "exhaustive", "shortest"]
+SOLUTION_ORDERS = ["words", "length"]
+# Plain text dictionary, only read to seed ENG_DICT_INDEX_PATH if it doesn't exist yet
+HOME_PATH = os.path.expanduser("~")
+ENG_DICT_FILE_PATH = HOME_PATH + "/eng_dictionary.txt"
+ENG_DICT_INDEX_PATH = HOME_PATH + "/eng_dictionary.idx"
+STATS_FILE_PATH = HOME_PATH + "/LetterBoxed/LetterBoxedStatistics.csv"
+SOLUTIONS_DIR_PATH = HOME_PATH + "/LetterBoxed/solutions_archive/"
+
+def board_geometry(sides: List[str]) -> Tuple[int, int]:
+    """
+    (number of sides, letters per side) of a board. Raises ValueError if the
+    sides don't make one: at least two sides of the same length, made of
+    letters a-z, with every letter on the board once.
+    """
+    if not isinstance(sides, list) or not all(isinstance(s, str) for s in sides):
+        raise ValueError("sides must be a list of strings")
+    if len(sides) < 2:
+        raise ValueError(f"a board needs at least 2 sides, got {len(sides)}")
+    side_len = len(sides[0])
+    for side in sides:
+        if len(side) != side_len or not side:
+            raise ValueError(f"sides must all have the same, non-zero length, got {sides}")
+        if not all("a" <= letter <= "z" for letter in side):
+            raise ValueError(f"sides can only have the letters a-z, got {side!r}")
+    super_set = "".join(sides)
+    if len(set(super_set)) != len(super_set):
+        raise ValueError("sets need to have unique letters!")
+    return len(sides), side_len
+
+
+def load_dictionary() -> DictionaryIndex:
+    if os.path.isfile(ENG_DICT_INDEX_PATH):
+        print("pulling dictionary from index")
+        return DictionaryIndex.load(ENG_DICT_INDEX_PATH)
+
+    if (
+        os.path.isfile(ENG_DICT_FILE_PATH)
+        and os.stat(ENG_DICT_FILE_PATH).st_size > 1000
+    ):
+        print("pulling dictionary from file")
+        with open(ENG_DICT_FILE_PATH, "r") as f:
+            words = [s.strip("\n") for s in f]
+    else:
+        print("pulling dictionary from scratch")
+        from english_words import get_english_words_set
+        words = [
+            w for w in get_english_words_set(["web2"], lower=True, alpha=True)
+            if len(w) >= MIN_WORD_LEN
+        ]
+    dict_index = DictionaryIndex(words)
+    dict_index.save(ENG_DICT_INDEX_PATH)
+    return dict_index
+
+
+def open_dictionary(dict_path: Optional[str] = None) -> DictionaryIndex:
+    return load_dictionary() if dict_path is None else DictionaryIndex.load(dict_path)
+
+
+# Each pool worker opens the (memory-mapped) dictionary once, in init_dictionary_worker
+_worker_dict_index: Optional[DictionaryIndex] = None
+
+
+def init_dictionary_worker(dict_path: Optional[str] = None):
+    """ProcessPoolExecutor initializer for workers that read worker_dictionary()."""
+    global _worker_dict_index
+    _worker_dict_index = open_dictionary(dict_path)
+
+
+def worker_dictionary() -> DictionaryIndex:
+    return _worker_dict_index
+
+
+def keep_worker_dictionary(dict_index: DictionaryIndex):
+    """Hand the worker's next tasks `dict_index`, e.g. after a game pruned words from it."""
+    global _worker_dict_index
+    _worker_dict_index = dict_index
+
 
 class LBGStats:
+    """
+    Statistics of the solutions found, kept up to date by add() as each one
+    comes in, so writing them out never has to go back to the archive.
+    """
 
     def __init__(self, solution_path: str, par: int = 5):
         self.par = par
@@ -25,83 +114,140 @@ class LBGStats:
 
         self.longest_word = None
         self.most_coveraging_word = None
+        # (number of sides, letters per side)
+        self.board = None
+        self.coverage_estimate = None
 
     def __repr__(self):
         entries = [
             f"Date: {os.path.basename(self.data_root)}",
             f"Par: {self.par}",
+            f"Board: {self.board}",
             f"Total Solutions: {self.total_num_sols}",
             f"Longest Word: {self.longest_word}",
             f"Most Coveraging Word: {self.most_coveraging_word}",
+            f"Coverage Estimate: {self.coverage_estimate}",
         ]
         entries += [f"Num {i}-Solutions: {self.num_solutions[i]}" for i in range(2,self.par+1)]
         entries += [f"Length Range of {i}-Solutions: {self.len_solutions[i]}" for i in range(2,self.par+1)]
         entries += [f"Shortest & Longest of the {i}-Solutions: {self.best_solutions[i]}" for i in range(2,self.par+1)]
+        entries += [f"Total Lengths of {i}-Solutions: {dict(sorted(self.histograms[i].items()))}" for i in range(2,self.par+1)]
         return "\n".join(entries) + "\n"
 
+    def add(self, solution: List[str]):
+        n = len(solution)
+        total = sum(len(w) for w in solution)
+        self.total_num_sols += 1
+        self.num_solutions[n] = self.num_solutions.get(n, 0) + 1
+
+        histogram = self.histograms.setdefault(n, {})
+        histogram[total] = histogram.get(total, 0) + 1
+
+        # Ties go to the first one found
+        lengths = self.len_solutions.get(n)
+        if lengths is None:
+            self.len_solutions[n] = (total, total)
+            self.best_solutions[n] = (solution, solution)
+        elif total < lengths[0]:
+            self.len_solutions[n] = (total, lengths[1])
+            self.best_solutions[n] = (solution, self.best_solutions[n][1])
+        elif total > lengths[1]:
+            self.len_solutions[n] = (lengths[0], total)
+            self.best_solutions[n] = (self.best_solutions[n][0], solution)
+
     def read_solution_file(self, length: int):
-        f = f"length_{length}_solutions.txt"
-        try:
-            with open(os.path.join(self.data_root, f), "r") as sols:
-                return decode([s.strip('\n') for s in sols.readlines()])
-        except FileNotFoundError:
-            print(f"Error: could not find length {length} file ({f})")
-            return None
+        sols = SolutionArchive(self.data_root).read(length)
+        if sols is None:
+            print(f"Error: could not find length {length} file in {self.data_root}")
+        return sols
 
     def get_sols(self, length: int):
         return self.read_solution_file(length)
+
+    def iter_sols(self, length: int):
+        # Streams the solutions instead of reading the whole file at once
+        return SolutionArchive(self.data_root).iter_solutions(length)
         
     def get_num_sols(self, length: int):
-        return len(self.get_sols(length))
+        return SolutionArchive(self.data_root).count(length)
     
     def reset(self):
         self.total_num_sols = 0
         self.num_solutions = {k: 0 for k in range(2,self.par+1)}
-        self.len_solutions = {l: (0,0) for l in range(2,self.par+1)}
-        self.best_solutions = {l: "" for l in range(2,self.par+1)}
-        pass
+        # (shortest, longest) total letters and the solutions with them, None until there is one
+        self.len_solutions = {l: None for l in range(2,self.par+1)}
+        self.best_solutions = {l: None for l in range(2,self.par+1)}
+        # number of words -> {total letters: number of solutions}
+        self.histograms = {l: {} for l in range(2,self.par+1)}
 
 
 class LetterBoxGame:
-    def __init__(self):
+    def __init__(
+        self,
+        source: Optional[PuzzleSource] = None,
+        dict_index: Optional[DictionaryIndex] = None,
+        solution_path: Optional[str] = None,
+        stats_file_path: Optional[str] = None,
+    ):
+        # solution_path and stats_file_path default to the day's archive directory and the
+        # shared statistics CSV. Experiments point them elsewhere to keep their output apart
         print("initting")
-        self.get_dictionary()
+        # By default, replay today's puzzle from the archive, scraping it the first time.
+        # If it has to be fetched, that happens while the dictionary loads
+        if source is None:
+            source = ArchiveSource(SOLUTIONS_DIR_PATH)
+        source.prefetch()
+
+        # An already loaded dictionary can be shared between games, e.g. in batch runs
+        if dict_index is None:
+            self.get_dictionary()
+        else:
+            self.dict_index = dict_index
 
-        print("scraping today's game data")
-        self.lbg_data_dict = scrape_lbg_data()
+        print(f"getting game data for {source.date}")
+        self.lbg_data_dict = source.get_game_data()
         sides = self.lbg_data_dict["sides"]
         print(f"{sides=}")
+        self.num_letter_sets, self.letter_set_len = board_geometry(sides)
         self.clear_sets()
-        if len(sides) == 4:
-            for side in sides:
-                print(f"adding {side=}")
-                self.add_set(side)
+        for side in sides:
+            print(f"adding {side=}")
+            self.add_set(side)
 
         self.super_set = "".join(sides)
-        if len(set(self.super_set)) != len(self.super_set):
-            raise ValueError("sets need to have unique letters!")
+        self.letter_bits = letter_bits(self.super_set)
 
-        self.candidate_set = [word for word in self.lbg_data_dict["dictionary"]]
+        dictionary = self.lbg_data_dict["dictionary"]
+        if not source.authoritative:
+            # A dictionary given by hand may have words that don't fit the board
+            dictionary = [word for word in DictionaryIndex(dictionary).candidates(sides) if word]
+        self.candidate_set = [word for word in dictionary]
         self.candidate_set.sort(key=lambda x: self.super_set_coverage(x), reverse=True)
 
         # All viable words are in self.lbg_data_dict['dictionary']
         # Update the stored english dictionary for posterity
-        self.align_dictionaries()
+        if source.authoritative:
+            self.align_dictionaries()
 
-        self.solutions = []
+        self.solutions = SolutionStore(self.candidate_set)
         self.best_sols = []
+        self.shortest_sols = []
         self.letters_to_cover = ""
         self.solve_time = 0.0
 
         self.solution_standard = self.lbg_data_dict['par']
 
-        self.solution_path = os.path.join(SOLUTIONS_DIR_PATH, str(date.today()))
+        if solution_path is None:
+            solution_path = os.path.join(SOLUTIONS_DIR_PATH, source.date)
+        self.solution_path = solution_path
+        self.stats_file_path = STATS_FILE_PATH if stats_file_path is None else stats_file_path
         os.makedirs(self.solution_path, exist_ok=True)
         
         print(self.solution_path)
 
         self.stats = LBGStats(self.solution_path, self.solution_standard)
-        self.stats.most_coveraging_word = self.candidate_set[0]
+        self.stats.most_coveraging_word = self.candidate_set[0] if self.candidate_set else None
+        self.stats.board = (self.num_letter_sets, self.letter_set_len)
 
         print(self)
 
@@ -120,64 +266,55 @@ class LetterBoxGame:
         )
     
     def reset_stats(self):
-        self.solutions = []
+        self.solutions = SolutionStore(self.candidate_set)
         self.best_sols = []
+        self.shortest_sols = []
         self.solve_time = 0.0
         self.stats.reset()
 
     def get_dictionary(self):
-        if (
-            os.path.isfile(ENG_DICT_FILE_PATH)
-            and os.stat(ENG_DICT_FILE_PATH).st_size > 1000
-        ):
-            f = open(ENG_DICT_FILE_PATH, "r")
-            self.eng_dict = [s.strip("\n") for s in f.readlines()]
-            print("pulling dictionary from file")
-            f.close()
-        else:
-            print("pulling dictionary from scratch")
-            invalids = []
-            self.eng_dict = get_english_words_set(["web2"], lower=True, alpha=True)
-            for word in self.eng_dict:
-                if len(word) < MIN_WORD_LEN:
-                    invalids.append(word)
-            for inv in invalids:
-                self.eng_dict.remove(inv)
-            self.update_dictionary()
+        self.dict_index = load_dictionary()
 
     def update_dictionary(self):
-        f = open(ENG_DICT_FILE_PATH, "w")
-        f.write("\n".join(self.eng_dict))
-        f.close()
+        self.dict_index.save(ENG_DICT_INDEX_PATH)
+
+    @property
+    def eng_dict(self):
+        return self.dict_index.words
 
     def align_dictionaries(self):
-        removes = []
-        for word in self.eng_dict:
-            if self.is_valid_candidate(word) and word not in self.candidate_set:
-                removes.append(word)
-        for word in removes:
-            print(f"removing {word} from eng_dict")
-            self.eng_dict.remove(word)
+        index = self.dict_index
+        candidates = set(self.candidate_set)
+
+        valid = index.valid_mask(self.letter_sets)
+        keep = ~valid
+        for i in np.flatnonzero(valid):
+            word = index.word(i)
+            if word in candidates:
+                keep[i] = True
+            else:
+                print(f"removing {word} from eng_dict")
 
-        self.update_dictionary()
+        if not keep.all():
+            self.dict_index = index.select(keep)
+            self.update_dictionary()
 
     def clear_sets(self):
         self.letter_sets = []
 
     def add_set(self, letters):
-        if len(self.letter_sets) == MAX_NUM_LETTER_SETS:
+        if len(self.letter_sets) == self.num_letter_sets:
             print("Maximum Letter Sets reached!")
         else:
-            if len(letters) == 3:
+            if len(letters) == self.letter_set_len:
                 self.letter_sets.append(letters)
             else:
-                print("letter sets can only be of length 3")
+                print(f"letter sets can only be of length {self.letter_set_len}")
                 print(f"the given {letters=} is length {len(letters)}")
 
     def save_stats(self):
-        with open(STATS_FILE_PATH, "r+") as f:
-            # Put cursor at end of file
-            f.seek(0, 2)
+        # Append mode, so rows written by concurrent solves can't overwrite each other
+        with open(self.stats_file_path, "a") as f:
             # Protect against case we didn't find a length-2 solution
             if len(self.best_sols) == 0:
                 best_sol = None
@@ -210,6 +347,8 @@ class LetterBoxGame:
                 + str(self.break_out_counter)
                 + ","
                 + str(self.solve_time)
+                + ","
+                + f"{self.num_letter_sets}x{self.letter_set_len}"
                 + "\n"
             )
 
@@ -217,33 +356,15 @@ class LetterBoxGame:
         
         for sol_len in reversed(range(2, self.solution_standard + 1)):
             self.save_solution_file(sol_len)
+        for total_len in sorted(set(len("".join(s)) for s in self.shortest_sols)):
+            self.save_solution_file_best(total_len)
 
-        # TODO: Implement and use this part. 
-        # Idea for stats is:
-        #  * par
-        #  * NYT Solution
-        #  * Total solutions found
-        #  * Number of Length 2-par solutions found
-        #  * Range of total lengths of length 2 solutions (13-24 letters, e.g.)
-        #  * Range of total lengths of length 3 solutions (14-35 letters, e.g.)
-        #  * Range of total lengths of length par solutions
-        #  * Range of total lengths of length par-1 solutions
-        self.stats.longest_word = max([(c, len(c)) for c in self.candidate_set], key=lambda x: x[1])
-        for i in range(2, self.stats.par+1):
-            sols = self.stats.get_sols(i)
-            n_sols = len(sols)
-            self.stats.total_num_sols += n_sols
-            self.stats.num_solutions[i] = n_sols
-
-            if n_sols != 0:
-                best = min([(s, len(''.join(s))) for s in sols], key=lambda x: x[1])
-                most_verbose = max([(s, len(''.join(s))) for s in sols], key=lambda x: x[1])
-
-                self.stats.len_solutions[i] = (best[1], most_verbose[1])
-                self.stats.best_solutions[i] = (best[0], most_verbose[0])
-            else:
-                self.stats.len_solutions[i] = None
-                self.stats.best_solutions[i] = None
+        self.stats.coverage_estimate = self.coverage_estimate
+        longest_word = max(self.candidate_set, key=len)
+        self.stats.longest_word = (longest_word, len(longest_word))
+
+        if self.metrics is not None:
+            self.metrics.save(os.path.join(self.solution_path, METRICS_FILE_NAME))
 
         if not os.path.exists(self.solution_path + f"/stats.txt"):
             with open(self.solution_path + f"/stats.txt", "w") as r:
@@ -252,68 +373,49 @@ class LetterBoxGame:
             with open(self.solution_path + f"/stats.txt", "w+") as r:
                 r.write(str(self.stats))
 
-    # TODO: finish and call this function
-    # Idea is to save solutions based on total length of letters. 13 being the optimal solution.
+    # Save the shortest solutions found based on total length of letters. 13 being the optimal solution.
+    # These files only ever hold the `num_shortest` best of each run, so they stay small
     def save_solution_file_best(self, total_len_of_sol):
-        file_path = os.path.join(self.solution_path, f'total_length_{total_len_of_sol}_solutions.txt')
+        TotalLengthArchive(self.solution_path, total_len_of_sol).write_all(
+            [s for s in self.shortest_sols if len(''.join(s)) == total_len_of_sol]
+        )
 
-        if not os.path.exists(file_path):
-            with open(file_path, "w") as new_f:
-                new_f.write('\n'.join([str(s) for s in self.solutions if len(''.join(s)) == total_len_of_sol]))
-            
     def save_solution_file(self, len_of_sols):
-        file_path = os.path.join(self.solution_path, f'length_{len_of_sols}_solutions.txt')
-
-        if not os.path.exists(file_path):
-            with open(file_path, "w") as new_f:
-                new_f.write('\n'.join([str(s) for s in self.solutions if len(s) == len_of_sols]))
-                new_f.write('\n')
-        else:
-            with open(file_path, "r+") as update_f:
-                duplicates = []
-                our_solutions = [s for s in self.solutions if len(s) == len_of_sols]
-                found_solutions = [l.strip('\n') for l in update_f.readlines()]
-
-                for our_s in our_solutions:
-                    if str(our_s) in found_solutions:
-                        duplicates.append(our_s)
-
-                if len(duplicates) < len(our_solutions):
-                    for d in duplicates:
-                        our_solutions.remove(d)
-
-                    update_f.write('\n'.join([str(s) for s in our_solutions]))
-                    update_f.write('\n')
+        SolutionArchive(self.solution_path).write(
+            len_of_sols, list(self.solutions.solutions(len_of_sols))
+        )
 
-    def super_set_coverage(self, word):
-        coverage_set = self.super_set
+    def word_mask(self, word):
+        # Bitmask of the board letters in `word`, one bit per letter of the super set
+        bits = self.letter_bits
+        mask = 0
         for letter in word:
-            if letter in coverage_set:
-                coverage_set = coverage_set.replace(letter, "")
+            mask |= bits.get(letter, 0)
+        return mask
 
-        # Return the number of letters covered. Max is 12
-        return len(self.super_set) - len(coverage_set)
+    def super_set_coverage(self, word):
+        # Return the number of letters covered. Max is len(self.super_set)
+        return bin(self.word_mask(word)).count("1")
 
     def find_possible_words(self):
         """
         This method takes in 4 sets of 3 letters and produces possible words
         """
-        for word in self.eng_dict:
-            if self.is_valid_candidate(word):
-                self.candidate_set.append(word)
+        self.candidate_set += self.dict_index.candidates(self.letter_sets)
 
         self.candidate_set.sort(key=lambda x: self.super_set_coverage(x), reverse=True)
         self.stats.most_coveraging_word = self.candidate_set[0]
 
     def does_solution_cover_all_letters(self, words):
-        self.letters_to_cover = self.super_set
-
+        full_mask = (1 << len(self.super_set)) - 1
+        covered = 0
         for word in words:
-            for letter in word:
-                if letter in self.letters_to_cover:
-                    self.letters_to_cover = self.letters_to_cover.replace(letter, "")
-            if len(self.letters_to_cover) == 0:
+            covered |= self.word_mask(word)
+            if covered == full_mask:
+                self.letters_to_cover = ""
                 return True
+        # What is still missing, in board order
+        self.letters_to_cover = "".join(l for l in self.super_set if not covered & self.letter_bits[l])
         return False
 
     def is_valid_candidate(self, word):
@@ -335,50 +437,6 @@ class LetterBoxGame:
 
         return True
 
-    def get_next_word(self, prev_word, candidates):
-        if prev_word is None:
-            # the top of the candidates list will be the one with the most coverage
-            return candidates[0]
-        else:
-            last_letter = prev_word[-1]
-            for each in candidates:
-                if each[0] == last_letter:
-                    # attempt to complete the puzzle with next word
-                    if set(self.letters_to_cover).issubset(set(each)):
-                        return each
-            # Now, try to find the word with the most coverage
-            for i in range(1, len(self.letters_to_cover)):
-                for each in candidates:
-                    if each[0] == last_letter:
-                        if set(self.letters_to_cover[:-i]).issubset(set(each)):
-                            return each
-        return None
-
-    def find_solution(self, seed_set):
-        self.letters_to_cover = self.super_set
-
-        # NOTE: An explicit shallow copy had to be used here
-        # because removing words from the candidate_words local variable
-        # was actually removing words from self.candidate_set.
-        candidate_words = copy.copy(self.candidate_set)
-
-        guess_set = seed_set
-
-        while not self.does_solution_cover_all_letters(guess_set):
-            if (len(guess_set) == self.solution_standard):
-                # This means we have not found a solution in the requisite number of words. Move on
-                return None
-            next_word = self.get_next_word(
-                guess_set[-1] if len(guess_set) > 0 else None, candidate_words
-            )
-            if next_word is not None:
-                candidate_words.remove(next_word)
-                guess_set.append(next_word)
-            else:
-                return None
-
-        return guess_set
-
     def shuffle_candidates(self):
         first_half = self.candidate_set[: len(self.candidate_set) // 2]
         second_half = self.candidate_set[len(self.candidate_set) // 2 :]
@@ -390,53 +448,138 @@ class LetterBoxGame:
         random.shuffle(self.candidate_set)
 
     def prune_invalid_word(self, word):
-        if word in self.eng_dict:
-            self.eng_dict.remove(word)
+        i = self.dict_index.find(word)
+        if i >= 0:
+            keep = np.ones(len(self.dict_index), dtype=bool)
+            keep[i] = False
+            self.dict_index = self.dict_index.select(keep)
             self.update_dictionary()
         if word in self.candidate_set:
             self.candidate_set.remove(word)
 
-    def solve(self):
-        start_time = time.time()
+    def iter_monte_carlo(self, max_words, deadline=None):
+        # With a deadline, keep sampling until it passes instead of
+        # stopping after `break_out_counter` walks in a row found nothing new
         print("starting solution loop")
-        counter = 0
-        max_counter = 0
-        while True:
-            self.shuffle_candidates_full()
-            solution = self.find_solution(seed_set=[])
-
-            if solution is None:
-                continue
-
-            if (
-                len(solution) <= self.solution_standard
-                and solution not in self.solutions
+        index = CandidateIndex(self.candidate_set, self.super_set)
+        # How often each solution was drawn, to estimate the coverage from
+        hits = {}
+        try:
+            for solution in monte_carlo_solutions(
+                index,
+                max_words,
+                self.break_out_counter,
+                deadline,
+                hits=hits,
+                known=self.solutions,
+                key=lambda s: (len(s), self.solutions.key(s)),
+                metrics=self.metrics,
+                progress=Progress(self.progress_interval),
             ):
-                self.solutions.append(solution)
+                yield solution
                 if len(solution) <= 2:
-                    self.best_sols.append(solution)
                     print(solution, len(self.best_sols))
+        finally:
+            self.coverage_estimate = good_turing_coverage(hits)
 
-                if counter > max_counter:
-                    max_counter = counter
-                counter = 0
-            else:
-                counter += 1
+    def iter_exhaustive(self, max_words, deadline=None):
+        """
+        Deterministic alternative to the monte carlo loop: enumerate every
+        solution of at most `max_words` words using letter bitmasks,
+        split over `jobs` processes.
+        """
+        print(f"starting exhaustive search with {self.jobs} job(s)")
+        index = CandidateIndex(self.candidate_set, self.super_set)
+        yield from parallel_solutions(index, max_words, self.jobs, deadline)
+
+    def iter_by_word_count(self, max_words, deadline=None):
+        print("starting exhaustive search, fewest words first")
+        index = CandidateIndex(self.candidate_set, self.super_set)
+        yield from solutions_by_word_count(index, max_words, deadline)
+
+    def iter_shortest(self, max_words, k=None, deadline=None):
+        """
+        Optimizer mode: solutions with the fewest letters in total first,
+        without going through the rest of the solution space. Only the `k`
+        shortest if given.
+        """
+        print("starting search for the shortest solutions")
+        index = CandidateIndex(self.candidate_set, self.super_set)
+        yield from shortest_solutions(index, max_words, k, deadline)
 
-            if counter > self.break_out_counter:
-                break
+    def iter_solutions(self, max_words=None, order=None, deadline=None):
+        """
+        Yield each new solution as soon as it is found, recording it in
+        self.solutions and self.best_sols on the way. Stop iterating to end
+        the search early.
+
+        `order` is one of SOLUTION_ORDERS and picks the engine that can produce
+        it: "words" yields solutions with the fewest words first, "length" the
+        ones with the fewest letters first. Without it, solutions come in
+        whatever order `solve_mode` finds them.
+
+        The search stops once time.time() passes `deadline`, keeping what was
+        found so far. Afterwards, self.coverage_estimate holds the estimated
+        share of the solution space that was found: exact (1.0) if an
+        exhaustive search ran to the end, estimated from the rate of repeat
+        hits for monte carlo, and None if unknown.
+        """
+        if max_words is None:
+            max_words = self.solution_standard
+        self.coverage_estimate = None
+
+        # Whether running to completion means every solution was found
+        complete_search = order == "words" or (order is None and self.solve_mode == "exhaustive")
+        if order == "words":
+            engine = self.iter_by_word_count(max_words, deadline)
+        elif order == "length":
+            engine = self.iter_shortest(max_words, deadline=deadline)
+        elif order is not None:
+            raise ValueError(f"unknown solution order {order}, expected one of {SOLUTION_ORDERS}")
+        elif self.solve_mode == "exhaustive":
+            engine = self.iter_exhaustive(max_words, deadline)
+        elif self.solve_mode == "monte-carlo":
+            engine = self.iter_monte_carlo(max_words, deadline)
+        elif self.solve_mode == "shortest":
+            engine = self.iter_shortest(max_words, self.num_shortest, deadline)
+        else:
+            raise ValueError(f"unknown solve mode {self.solve_mode}, expected one of {SOLVE_MODES}")
 
-            print(len(self.solutions), max_counter, end="\r")
+        # Solutions from an earlier search are kept, so don't hand them out twice
+        for solution in engine:
+            if not self.solutions.add(solution):
+                continue
+            self.stats.add(solution)
+            if len(solution) <= 2:
+                self.best_sols.append(solution)
+            yield solution
+
+        if complete_search and (deadline is None or time.time() < deadline):
+            self.coverage_estimate = 1.0
+
+    def solve(self, save: bool = True):
+        # With save=False the solutions and stats are only kept in memory
+        if self.collect_metrics:
+            self.metrics = SolveMetrics()
+        start_time = time.time()
+        deadline = None if self.time_budget is None else start_time + self.time_budget
+        for _ in self.iter_solutions(deadline=deadline):
+            pass
 
         self.best_sols.sort(key=lambda s: len("".join(s)))
+        self.shortest_sols = heapq.nsmallest(self.num_shortest, self.solutions, key=lambda s: len("".join(s)))
 
         # self.len_set_solutions[]
         # for i in range(2, self.lbg_data_dict['par'])
 
         self.solve_time = round(time.time() - start_time, 3)
+        if self.metrics is not None:
+            self.metrics.add_time("solve", time.time() - start_time)
+            self.metrics.count("solutions", len(self.solutions))
         print("\nDONE!")
         print("====================================================")
         print(f"Solver found {len(self.solutions)} solutions in {self.solve_time}sec")
+        print(f"Estimated coverage of the solution space: {self.coverage_estimate}")
         print(
             f"The best solution found out of {len(self.best_sols)} length-2 solutions is:"
         )
@@ -445,7 +588,8 @@ class LetterBoxGame:
         else:
             print(self.best_sols[0])
         print("====================================================")
-        self.save_stats()
+        if save:
+            self.save_stats()
         # TODO: At end of solve(), should we sort the solution files? Might not be worth it
         # Maybe should do that in the data_inspector instead.
 
@@ -453,8 +597,12 @@ class LetterBoxGame:
     letter_sets = []
     solutions = []
     best_sols = []
+    shortest_sols = []
     letters_to_cover = ""
-    eng_dict = None
+    letter_bits = {}
+    num_letter_sets = MAX_NUM_LETTER_SETS
+    letter_set_len = LETTER_SET_LEN
+    dict_index = None
     candidate_set = []
     solve_time = 0.0
     len_set_solutions = {}
@@ -468,18 +616,63 @@ class LetterBoxGame:
     # we end the search and report our stats and best solution
     break_out_counter = 50
 
+    # One of SOLVE_MODES. The exhaustive mode ignores `break_out_counter`
+    # and always returns the complete set of solutions.
+    solve_mode = "monte-carlo"
+
+    # Number of worker processes used by the exhaustive mode
+    jobs = 1
+
+    # Time budget for solve() in seconds. If set, the search stops when it runs out
+    # (for monte carlo instead of using `break_out_counter`) and keeps what it found so far
+    time_budget = None
+    coverage_estimate = None
+
+    # With collect_metrics, solve() counts and times what the monte carlo loop does
+    # and save_stats() writes it to metrics.json next to stats.txt
+    collect_metrics = False
+    metrics = None
+    # Seconds between progress lines while solving, None for no progress output
+    progress_interval = 0.5
+
+    # How many of the shortest solutions (by total letters) the shortest mode looks for.
+    # Every mode saves this many of its shortest to the day's TotalLengthArchive
+    num_shortest = 10
+
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
     parser.add_argument("-c", "--counter", type=int, help="Provide the break-out counter that the program determines when it has found enough solutions")
     parser.add_argument("-l", "--solution-length", type=int, help="find solutions less than or equal to [solution-length]")
+    parser.add_argument("-d", "--date", type=str, help="re-solve the archived puzzle of [date] (YYYY-MM-DD) instead of today's")
+    parser.add_argument("-m", "--mode", choices=SOLVE_MODES, help="monte-carlo (default) samples random solutions, exhaustive finds all of them, shortest finds the ones with the fewest letters")
+    parser.add_argument("-k", "--top", type=int, help="number of shortest solutions to find in shortest mode and save by total length")
+    parser.add_argument("-t", "--time-budget", type=parse_duration, help="stop solving after [time-budget] (e.g. 200ms, 2s) and keep what was found so far")
+    parser.add_argument("--metrics", action="store_true", help="count and time the steps of the solve loop and save them to metrics.json")
+    parser.add_argument("-j", "--jobs", type=int, help="number of processes the exhaustive mode splits the search over")
+    parser.add_argument("-n", "--first", type=int, help="only print the first [first] solutions as they are found, without saving anything")
+    parser.add_argument("-o", "--order", choices=SOLUTION_ORDERS, help="with --first, find the solutions with the fewest words or letters first")
     args = parser.parse_args()
 
-    LBG = LetterBoxGame()
+    LBG = LetterBoxGame(ArchiveSource(SOLUTIONS_DIR_PATH, args.date))
 
     if args.counter is not None:
         LBG.break_out_counter = args.counter
     if args.solution_length is not None:
         LBG.solution_standard = args.solution_length
-
-    LBG.solve()
+    if args.mode is not None:
+        LBG.solve_mode = args.mode
+    if args.jobs is not None:
+        LBG.jobs = args.jobs
+    if args.top is not None:
+        LBG.num_shortest = args.top
+    if args.time_budget is not None:
+        LBG.time_budget = args.time_budget
+    if args.metrics:
+        LBG.collect_metrics = True
+
+    if args.first is not None:
+        for solution in itertools.islice(LBG.iter_solutions(order=args.order), args.first):
+            print(solution)
+    else:
+        LBG.solve()
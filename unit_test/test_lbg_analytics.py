@@ -0,0 +1,64 @@
+from lbg_analytics import *
+from lbg_puzzle_source import save_game_data
+
+from pytest import fixture
+
+STATS_ROWS = [
+    '"2024-01-01",3,abcdefghijkl,10,2,"[\'ab\', \'bc\']",True,"[\'ab\', \'bc\']",50,1.5\n',
+    '"2024-01-01",3,abcdefghijkl,12,2,"[\'ab\', \'bc\']",False,"None",10,0.5\n',
+    '"2024-01-02",4,mnopqrstuvwx,30,0,"[\'mn\', \'no\']",False,"None",50,2.5,4x3\n',
+]
+
+
+@fixture
+def history(tmp_path):
+    archive_root = tmp_path / "archive"
+    for the_date, par, two_word in [("2024-01-01", 3, [["ab", "bc"], ["ab", "bd"]]), ("2024-01-02", 4, [])]:
+        data_root = str(archive_root / the_date)
+        save_game_data({"par": par}, os.path.join(data_root, GAME_DATA_FILE_NAME))
+        SolutionArchive(data_root).write(2, two_word)
+        SolutionArchive(data_root).write(3, [["ab", "bc", "cd"]])
+    (archive_root / "not-a-date").mkdir()
+
+    stats_path = tmp_path / "stats.csv"
+    stats_path.write_text("".join(STATS_ROWS[:2]))
+    return str(stats_path), str(archive_root), str(tmp_path / "cache")
+
+
+def test_analytics(history):
+    stats_path, archive_root, cache_path = history
+    analytics = LBGAnalytics(stats_path, archive_root, cache_path)
+
+    assert analytics.runs["num_solutions"].tolist() == [10, 12]
+    assert analytics.our_solution_found_rate() == 0.5
+    assert analytics.mean_by(analytics.runs, "solve_time", "break_out_counter") == {10: 0.5, 50: 1.5}
+    assert analytics.solutions_by_par(2) == {3: 2.0, 4: 0.0}
+    assert analytics.solutions_by_par(3) == {3: 1.0, 4: 1.0}
+    assert analytics.date_mask(analytics.days, start="2024-01-02").tolist() == [False, True]
+
+    # New rows and solutions are picked up, the rest comes from the cache
+    with open(stats_path, "a") as f:
+        f.write(STATS_ROWS[2])
+        f.write('"2024-01-03",3,abc')
+    SolutionArchive(os.path.join(archive_root, "2024-01-02")).write(2, [["mn", "nq"]])
+
+    analytics = LBGAnalytics(stats_path, archive_root, cache_path)
+    assert analytics.runs["num_solutions"].tolist() == [10, 12, 30]
+    assert analytics.our_solution_found_rate("par") == {3: 0.5, 4: 0.0}
+    assert analytics.solutions_by_par(2) == {3: 2.0, 4: 1.0}
+    assert os.path.getsize(analytics.runs_path) == RUNS_HEADER_SIZE + 3 * RUN_DTYPE.itemsize
+
+    # The partial row is read once it is finished
+    with open(stats_path, "a") as f:
+        f.write('defghijkl,1,0,"[]",False,"None",5,0.1\n')
+    analytics.refresh()
+    assert analytics.runs["break_out_counter"].tolist() == [50, 10, 50, 5]
+    # Rows from before the board shape was written are the NYT's 4x3
+    assert analytics.runs["num_sides"].tolist() == [4, 4, 4, 4]
+
+    with open(stats_path, "a") as f:
+        f.write('"2024-01-04",3,abcdefghijklmnopqrstuvwx,7,1,"[]",False,"None",5,0.1,6x4\n')
+        f.write('"2024-01-05",3,abcdefghijklmnopqrstuvwx,9,1,"[]",False,"None",5,0.1,8x3\n')
+    analytics.refresh()
+    assert analytics.runs["num_sides"].tolist()[-2:] == [6, 8]
+    assert analytics.mean_by(analytics.runs, "num_solutions", "num_sides") == {4: 13.25, 6: 7.0, 8: 9.0}
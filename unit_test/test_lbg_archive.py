@@ -0,0 +1,95 @@
+import os
+
+from lbg_archive import *
+
+DEFAULT_SOLUTIONS = [["adgjbehk", "kcfil"], ["adgjbehk", "kcf"]]
+
+
+def test_write_and_read(tmp_path):
+    archive = SolutionArchive(str(tmp_path))
+    assert archive.read(2) is None
+
+    archive.write(2, DEFAULT_SOLUTIONS)
+    archive.write(2, DEFAULT_SOLUTIONS[:1])
+    archive.write(3, [])
+    assert os.path.getsize(archive.path(2)) == 2 * 2 * WORD_ID_SIZE
+
+    # A fresh reader only knows what's on disk
+    archive = SolutionArchive(str(tmp_path))
+    assert archive.read(2) == DEFAULT_SOLUTIONS
+    assert archive.read(3) == []
+    assert archive.lengths() == [2, 3]
+    assert archive.words == ["adgjbehk", "kcfil", "kcf"]
+
+
+def test_legacy_migration(tmp_path):
+    data_root = tmp_path / "2023-11-05"
+    data_root.mkdir()
+    with open(data_root / legacy_solution_file_name(2), "w") as f:
+        f.write("\n".join(str(s) for s in DEFAULT_SOLUTIONS) + "\n")
+
+    archive = SolutionArchive(str(data_root))
+    assert archive.read(2) == DEFAULT_SOLUTIONS
+    assert archive.lengths() == [2]
+
+    migrate_archive(str(tmp_path))
+    assert not os.path.exists(archive.legacy_path(2))
+    assert SolutionArchive(str(data_root)).read(2) == DEFAULT_SOLUTIONS
+
+
+def test_hash_index(tmp_path):
+    archive = SolutionArchive(str(tmp_path))
+    archive.write(2, DEFAULT_SOLUTIONS)
+    assert len(archive.hash_index(2)) == 2
+
+    # A missing index is rebuilt from the file, so duplicates are still caught
+    os.remove(archive.hash_index_path(2))
+    archive.write(2, DEFAULT_SOLUTIONS + [["kcf", "fil"]])
+    assert archive.read(2) == DEFAULT_SOLUTIONS + [["kcf", "fil"]]
+
+    # Growing the table keeps everything that was in it
+    index = SolutionHashIndex(str(tmp_path / "grow.hidx"))
+    hashes = solution_hashes(np.arange(2 * MIN_HASH_CAPACITY, dtype=WORD_ID_DTYPE).reshape(-1, 1))
+    assert index.add(hashes).all()
+    assert not index.add(hashes).any()
+    assert len(index) == 2 * MIN_HASH_CAPACITY
+
+
+def test_iter_solutions(tmp_path):
+    archive = SolutionArchive(str(tmp_path))
+    sols = [["adgjbehk", "kc" + "f" * i] for i in range(10)]
+    archive.write(2, sols)
+    assert [c.shape for c in archive.iter_ids(2, chunk_size=4)] == [(4, 2), (4, 2), (2, 2)]
+    assert list(archive.iter_solutions(2)) == sols
+    assert list(archive.iter_solutions(3)) == []
+    assert archive.count(2) == 10
+
+    with open(archive.legacy_path(3), "w") as f:
+        f.write("['ab', 'bc', 'cd']\n\n['it\\'s', 'sa']\n")
+    assert list(archive.iter_solutions(3)) == [["ab", "bc", "cd"], ["it's", "sa"]]
+    assert archive.count(3) == 2
+
+
+def test_total_length_archive(tmp_path):
+    data_root = tmp_path / "2023-11-05"
+    data_root.mkdir()
+    archive = TotalLengthArchive(str(data_root), 13)
+    archive.write_all([["adgjbehk", "kcfil"], ["ab", "bc", "cdefghijk"], ["adgjbehk", "kcfil"]])
+    archive.write_all([["adgjbehk", "kcfil"]])
+
+    # Kept apart from the day's other solutions, but sharing its word table
+    assert SolutionArchive(str(data_root)).lengths() == []
+    archive = TotalLengthArchive(str(data_root), 13)
+    assert archive.lengths() == [2, 3]
+    assert archive.read_all() == [["adgjbehk", "kcfil"], ["ab", "bc", "cdefghijk"]]
+    assert archive.words == ["adgjbehk", "kcfil", "ab", "bc", "cdefghijk"]
+
+    with open(data_root / "total_length_8_solutions.txt", "w") as f:
+        f.write("['adgjbehk', 'kcf']\n['ab', 'bc', 'cd']\n['adgjbehk', 'kcf']\n")
+    assert stored_total_lengths(str(data_root)) == [8, 13]
+    assert TotalLengthArchive(str(data_root), 8).read_all() == [["adgjbehk", "kcf"], ["ab", "bc", "cd"]]
+
+    migrate_archive(str(tmp_path))
+    assert not os.path.exists(data_root / "total_length_8_solutions.txt")
+    assert stored_total_lengths(str(data_root)) == [8, 13]
+    assert TotalLengthArchive(str(data_root), 8).read_all() == [["adgjbehk", "kcf"], ["ab", "bc", "cd"]]
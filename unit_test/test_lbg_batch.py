@@ -0,0 +1,68 @@
+import json
+
+import letter_box_game
+from lbg_batch import *
+
+from pytest import fixture, raises
+
+DEFAULT_BOARD = {"sides": ["abc", "def", "ghi", "jkl"], "dictionary": ["flag"], "par": 4, "date": "2023-11-05"}
+SOLVABLE_BOARD = {
+    "sides": ["abc", "def", "ghi", "jkl"],
+    "dictionary": ["adgjbehk", "kcfil", "kcf", "fil"],
+    "par": 3,
+    "ourSolution": ["adgjbehk", "kcfil"],
+    "date": "generated-0-000000",
+}
+
+
+@fixture
+def archive(tmp_path, monkeypatch):
+    # Keep the dictionary, solutions and stats of the batch under tmp_path
+    dict_path = str(tmp_path / "words.idx")
+    DictionaryIndex(SOLVABLE_BOARD["dictionary"] + ["flag"]).save(dict_path)
+    monkeypatch.setattr(letter_box_game, "ENG_DICT_INDEX_PATH", dict_path)
+    monkeypatch.setattr(letter_box_game, "SOLUTIONS_DIR_PATH", str(tmp_path / "archive"))
+    monkeypatch.setattr(letter_box_game, "STATS_FILE_PATH", str(tmp_path / "stats.csv"))
+    return tmp_path
+
+
+def test_file_sources(tmp_path):
+    list_path = tmp_path / "boards.json"
+    list_path.write_text(json.dumps([DEFAULT_BOARD, SOLVABLE_BOARD]))
+    sources = file_sources(str(list_path))
+    assert len(sources) == 2
+    assert sources[0].date == "2023-11-05"
+    assert sources[0].get_game_data()["dictionary"] == ["flag"]
+
+    lines_path = tmp_path / "boards.jsonl"
+    lines_path.write_text(json.dumps(DEFAULT_BOARD) + "\n\n" + json.dumps(SOLVABLE_BOARD) + "\n")
+    assert len(file_sources(str(lines_path))) == 2
+
+    # Boards without a date of their own would share an archive directory
+    lines_path.write_text(json.dumps(DEFAULT_BOARD) + "\n" + json.dumps(DEFAULT_BOARD) + "\n")
+    with raises(ValueError):
+        file_sources(str(lines_path))
+    undated = {k: v for k, v in DEFAULT_BOARD.items() if k != "date"}
+    lines_path.write_text(json.dumps(undated) + "\n")
+    with raises(ValueError):
+        file_sources(str(lines_path))
+
+
+def test_solve_batch(archive):
+    path = archive / "boards.jsonl"
+    path.write_text(json.dumps(DEFAULT_BOARD) + "\n" + json.dumps(SOLVABLE_BOARD) + "\n")
+    sources = file_sources(str(path))
+
+    results = solve_batch(sources, mode="exhaustive")
+    assert [(d, n) for d, n, _ in results] == [("2023-11-05", 0), ("generated-0-000000", 2)]
+
+    # Each board has its own directory, and a stats row
+    assert os.path.isfile(archive / "archive" / "2023-11-05" / "stats.txt")
+    with open(archive / "archive" / "generated-0-000000" / "stats.txt") as f:
+        assert "Total Solutions: 2" in f.read()
+    with open(archive / "stats.csv") as f:
+        rows = f.read().splitlines()
+    assert [row.split(",")[0] for row in rows] == ['"2023-11-05"', '"generated-0-000000"']
+
+    # Same results from the worker processes
+    assert [(d, n) for d, n, _ in solve_batch(sources, jobs=2, mode="exhaustive")] == [(d, n) for d, n, _ in results]
@@ -0,0 +1,53 @@
+from lbg_benchmark import *
+from lbg_puzzle_source import ExplicitSource
+
+DEFAULT_SETS = ["abc", "def", "ghi", "jkl"]
+DEFAULT_DICTIONARY = ["adgjbehk", "kcfil", "kcf", "fil"]
+
+
+def test_run_benchmark():
+    stats_path = letter_box_game.STATS_FILE_PATH
+    sources = [ExplicitSource(DEFAULT_SETS, DEFAULT_DICTIONARY, 3, "2000-01-01")]
+    report = run_benchmark(sources, DEFAULT_DICTIONARY + ["xyz"], repeat=2)
+
+    assert report["boards"] == {"2000-01-01": {"candidates": 4, "solutions": 2}}
+    phases = [(r["board"], r["phase"]) for r in report["results"]]
+    assert phases[:2] == [(None, "dictionary_build"), (None, "dictionary_load")]
+    assert ("2000-01-01", "solve") in phases
+    assert ("2000-01-01", "inspector_queries") in phases
+    for r in report["results"]:
+        assert len(r["runs"]) == 2
+        assert r["peak_bytes"] is not None
+
+    # Everything was written to a scratch directory
+    assert letter_box_game.STATS_FILE_PATH == stats_path
+    json.dumps(report)
+
+
+def test_scaling_benchmark():
+    words = DEFAULT_DICTIONARY + ["aeimq", "qbfjnrcgkosdhlpt", "abcdefghijklmnopqrstuvwxyz"]
+    report = run_scaling_benchmark(words, [(4, 3), (5, 4)], boards=2, par=2)
+    assert [(r["sides"], r["side_len"], r["letters"]) for r in report["results"]] == [(4, 3, 12), (5, 4, 20)]
+    for result in report["results"]:
+        assert len(result["runs"]) == 2
+        assert result["timed_out"] == 0
+        for run in result["runs"]:
+            assert len(run["sides"]) == result["sides"]
+            assert all(len(side) == result["side_len"] for side in run["sides"])
+    json.dumps(report)
+
+
+def test_import_benchmark():
+    report = run_import_benchmark(["lbg_utils", "lbg_data_inspector"], repeat=1)
+    assert [r["module"] for r in report["results"]] == ["lbg_utils", "lbg_data_inspector"]
+    assert all(r["seconds"] > 0 for r in report["results"])
+
+
+def test_imports_are_light():
+    # Heavy dependencies are only loaded by the code paths that use them
+    check = (
+        "import sys, letter_box_game, lbg_data_inspector, lbg_data_collector;"
+        "heavy = [m for m in ['numpy._core', 'selenium', 'english_words', 'concurrent.futures.process'] if m in sys.modules];"
+        "assert not heavy, heavy"
+    )
+    subprocess.run([sys.executable, "-c", check], check=True, cwd=os.path.dirname(os.path.abspath(letter_box_game.__file__)))
@@ -0,0 +1,39 @@
+from lbg_data_collector import *
+
+DEFAULT_GAME_DATA = {
+    "sides": ["abc", "def", "ghi", "jkl"],
+    "dictionary": ["adgjbehk", "kcfil", "kcf", "fil"],
+    "par": 3,
+    "ourSolution": ["adgjbehk", "kcfil"],
+    "date": "2000-01-01",
+}
+
+
+def test_experiment_trials():
+    trials = experiment_trials({1: 2, 5: 1}, seed=3)
+    assert [(c, i) for c, i, _ in trials] == [(1, 0), (1, 1), (5, 0)]
+    assert len(set(s for _, _, s in trials)) == 3
+    assert experiment_trials({1: 2, 5: 1}, seed=3) == trials
+    assert experiment_trials({1: 2, 5: 1}, seed=4) != trials
+
+
+def test_run_experiment(tmp_path):
+    # Dead-end walks count towards the break-out counter, so give the walks some room
+    config = {40: 2, 60: 1}
+    serial = run_experiment(DEFAULT_GAME_DATA, str(tmp_path / "serial"), config, jobs=1)
+    parallel = run_experiment(DEFAULT_GAME_DATA, str(tmp_path / "parallel"), config, jobs=2)
+
+    results = []
+    for path in [serial, parallel]:
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [(r["counter"], r["trial"]) for r in rows] == [("40", "0"), ("40", "1"), ("60", "0")]
+        assert all(int(r["num_solutions"]) >= 1 for r in rows)
+        results.append([{k: v for k, v in r.items() if k != "solve_time"} for r in rows])
+
+    # Trials are seeded, so where they ran makes no difference
+    assert results[0] == results[1]
+
+    # Every trial saved to its own directory
+    for counter, trial, _ in experiment_trials(config):
+        assert os.path.isfile(os.path.join(trial_path(str(tmp_path / "parallel"), counter, trial), "stats.txt"))
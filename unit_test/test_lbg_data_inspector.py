@@ -0,0 +1,42 @@
+import os
+
+from lbg_archive import SolutionArchive
+from lbg_data_inspector import *
+
+DEFAULT_DATE = "2023-11-05"
+DEFAULT_SOLUTIONS = {
+    2: [["adgjbehk", "kcfil"], ["adgjbe", "eckhfil"]],
+    3: [["adgjbehk", "kcf", "fil"]],
+}
+
+
+def make_inspector(tmp_path):
+    archive = SolutionArchive(str(tmp_path / DEFAULT_DATE))
+    os.makedirs(archive.data_root)
+    for length, sols in DEFAULT_SOLUTIONS.items():
+        archive.write(length, sols)
+    return LBGDataInspector(DEFAULT_DATE, str(tmp_path)), archive
+
+
+def test_queries(tmp_path):
+    di, _ = make_inspector(tmp_path)
+    assert di.par == 3
+    sols = di.get_sols(2)
+    assert sols == DEFAULT_SOLUTIONS[2]
+    assert di.get_range_of_sols_length(sols) == (13, 13)
+    assert di.get_sols_of_length(sols, 13) == sols
+    assert di.get_sols_of_length([["ab", "bcd"]], 5) == [["ab", "bcd"]]
+    assert di.get_length_histogram(3) == {14: 1}
+    assert di.get_sols_with_word("adgjbehk") == [["adgjbehk", "kcfil"], ["adgjbehk", "kcf", "fil"]]
+    assert di.get_sols_with_word("nope") == []
+
+
+def test_cache_invalidation(tmp_path):
+    di, archive = make_inspector(tmp_path)
+    assert len(di.get_sols(3)) == 1
+    day = di.get_day()
+    assert di.get_day() is day
+
+    archive.write(3, [["adgjbe", "eckh", "hfil"]])
+    assert len(di.get_sols(3)) == 2
+    assert di.get_day() is not day
@@ -0,0 +1,45 @@
+from lbg_dictionary import *
+
+DEFAULT_SETS = ["abc", "def", "ghi", "jkl"]
+DEFAULT_WORDS = ["beak", "bad", "flag", "hijack", "zebra", "gig", "adj", "Beak"]
+
+
+def test_candidates():
+    index = DictionaryIndex(DEFAULT_WORDS)
+    # "bad" and "hijack" have same-side neighbours, "zebra" and "Beak" use other letters,
+    # "gig" has a doubled letter
+    assert index.candidates(DEFAULT_SETS) == ["adj", "beak", "flag"]
+    assert index.words == sorted(DEFAULT_WORDS)
+    assert list(index.lengths) == [len(w) for w in index.words]
+
+    # Any number of sides of any length
+    large_sets = ["abcd", "efgh", "ijkl", "mnop", "qrst"]
+    index = DictionaryIndex(["aeimq", "qbfjnrcgkosdhlpt", "abef", "quiz"])
+    assert index.candidates(large_sets) == ["aeimq", "qbfjnrcgkosdhlpt"]
+
+
+def test_select():
+    index = DictionaryIndex(DEFAULT_WORDS)
+    sub = index.select(np.array([w != "flag" for w in index.words]))
+    assert len(sub) == len(DEFAULT_WORDS) - 1
+    assert sub.candidates(DEFAULT_SETS) == ["adj", "beak"]
+    assert sub.words == [w for w in index.words if w != "flag"]
+    assert "flag" not in sub
+    assert "beak" in sub
+
+
+def test_save_and_load(tmp_path):
+    index = DictionaryIndex(DEFAULT_WORDS)
+    path = str(tmp_path / "dictionary.idx")
+    index.save(path)
+
+    loaded = DictionaryIndex.load(path)
+    assert loaded.words == index.words
+    assert loaded.candidates(DEFAULT_SETS) == index.candidates(DEFAULT_SETS)
+    assert list(loaded.last) == list(index.last)
+    assert loaded.find("gig") == index.words.index("gig")
+    assert loaded.find("gigs") == -1
+
+
+def test_empty_dictionary():
+    assert DictionaryIndex([]).candidates(DEFAULT_SETS) == []
@@ -0,0 +1,98 @@
+import json
+import random
+
+from lbg_generator import *
+
+from pytest import fixture, raises
+
+# Enough words that some 4x3 boards drawn from them can be solved
+WORDS = [
+    "adgjbehk", "kcfil", "kcf", "fil", "lbadgj", "jehkcfi", "hello", "world", "quiz", "jinx",
+    "brave", "gloom", "frank", "thick", "mouse", "nerve", "pace", "swing", "dwarf", "lunch",
+]
+
+
+@fixture
+def dict_path(tmp_path):
+    path = str(tmp_path / "words.idx")
+    DictionaryIndex(WORDS).save(path)
+    return path
+
+
+def test_sample_sides():
+    weights = letter_weights(DictionaryIndex(WORDS))
+    assert len(weights) == 26
+    assert weights[string.ascii_lowercase.index("q")] == 1
+
+    rng = random.Random(0)
+    for num_sides, side_len in ((4, 3), (3, 5), (6, 4)):
+        sides = sample_sides(rng, weights, num_sides, side_len)
+        assert board_geometry(sides) == (num_sides, side_len)
+    with raises(ValueError):
+        sample_sides(rng, weights, 7, 4)
+
+    # Letters no word uses only come up once the others run out
+    sides = sample_sides(rng, [1] * 12 + [0] * 14, 4, 3)
+    assert sorted("".join(sides)) == list("abcdefghijkl")
+
+
+def test_make_board(dict_path):
+    dict_index = DictionaryIndex.load(dict_path)
+    weights = letter_weights(dict_index)
+    board = make_board(dict_index, weights, 3, 7, 4, 3, 3)
+    assert board == make_board(dict_index, weights, 3, 7, 4, 3, 3)
+    assert board["date"] == "generated-7-000003"
+    assert board["dictionary"] == dict_index.candidates(board["sides"])
+    assert board["score"]["candidates"] == len(board["dictionary"])
+    assert board["ourSolution"] == (board["score"]["shortest"] or [])
+    json.dumps(board)
+
+
+def test_generate_boards(tmp_path):
+    # Every 2x2 board of these words uses a, b, c and d, and only the ones
+    # with a and b on the same side can be solved
+    dict_path = str(tmp_path / "abcd.idx")
+    DictionaryIndex(["acbd", "bdac", "ac", "cb", "bd"]).save(dict_path)
+
+    boards = generate_boards(5, 2, 2, par=2, seed=1, dict_path=dict_path)
+    assert len(boards) == 5
+    for board in boards:
+        assert board["score"]["solvable"]
+        assert any(set(side) == {"a", "b"} for side in board["sides"])
+        assert len(board["ourSolution"]) <= 2
+        assert set("".join(board["ourSolution"])) == set("abcd")
+        assert board["score"]["min_letters"] == 4
+
+    # The same boards, whichever process makes them
+    assert generate_boards(5, 2, 2, par=2, seed=1, jobs=2, dict_path=dict_path) == boards
+
+    everything = generate_boards(20, 2, 2, par=2, seed=1, solvable_only=False, dict_path=dict_path)
+    assert len(everything) == 20
+    solvable = [board for board in everything if board["score"]["solvable"]]
+    assert 0 < len(solvable) < 20
+    # Keeping only the solvable boards just skips the others
+    n = min(5, len(solvable))
+    assert solvable[:n] == boards[:n]
+    assert all(board["ourSolution"] == [] for board in everything if board not in solvable)
+
+    path = str(tmp_path / "boards.jsonl")
+    write_boards(boards, path)
+    with open(path) as f:
+        assert [json.loads(line) for line in f] == boards
+
+
+def test_dense_dictionary(tmp_path):
+    # Boards of a dictionary made up of the 12 letters they are drawn from
+    # have thousands of candidates each, many more than english ones
+    rng = random.Random(0)
+    words = {"".join(rng.choice("abcdefghijkl") for _ in range(rng.randint(3, 8))) for _ in range(20000)}
+    dict_path = str(tmp_path / "dense.idx")
+    DictionaryIndex(sorted(words)).save(dict_path)
+
+    boards = generate_boards(20, par=4, seed=2, solvable_only=False, dict_path=dict_path)
+    assert len(boards) == 20
+    for board in boards:
+        assert board["score"]["candidates"] > 1000
+        # Plenty of words, so the fewest letters possible: 12 plus one repeat
+        assert board["score"]["min_letters"] == 13
+        assert board["score"]["two_word_solutions"] > 0
@@ -0,0 +1,30 @@
+from lbg_metrics import *
+
+
+def test_solve_metrics(tmp_path):
+    metrics = SolveMetrics()
+    assert metrics.to_dict()["duplicate_rate"] is None
+
+    metrics.count("iterations", 4)
+    metrics.count("duplicate_hits")
+    metrics.add_time("random_walk", 0.25)
+    metrics.add_time("random_walk", 0.25)
+
+    d = metrics.to_dict()
+    assert d["duplicate_rate"] == 0.25
+    assert d["dead_end_rate"] == 0
+    assert d["timers"] == {"random_walk": 0.5}
+
+    metrics.save(tmp_path / METRICS_FILE_NAME)
+    with open(tmp_path / METRICS_FILE_NAME) as f:
+        assert json.load(f) == d
+
+
+def test_progress(capsys):
+    progress = Progress(60)
+    progress.update(1, 2)
+    progress.update(3, 4)
+    assert capsys.readouterr().out == "1 2\r"
+
+    Progress(None).update(1, 2)
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,30 @@
+import os
+
+from lbg_puzzle_source import *
+from pytest import raises
+
+DEFAULT_SETS = ["ABC", "DEF", "GHI", "JKL"]
+DEFAULT_DATE = "2023-11-05"
+
+
+def test_explicit_source():
+    source = ExplicitSource(DEFAULT_SETS, ["Flag", "gab"], 4, DEFAULT_DATE)
+    data = source.get_game_data()
+    assert data["sides"] == ["abc", "def", "ghi", "jkl"]
+    assert data["dictionary"] == ["flag", "gab"]
+    assert data["par"] == 4
+    assert data["ourSolution"] == []
+    assert data["date"] == DEFAULT_DATE
+    assert not source.authoritative
+
+
+def test_archive_source(tmp_path):
+    archive_root = str(tmp_path)
+    source = ArchiveSource(archive_root, DEFAULT_DATE)
+    with raises(FileNotFoundError):
+        source.get_game_data()
+
+    data = ExplicitSource(DEFAULT_SETS, ["flag"], 4, DEFAULT_DATE).get_game_data()
+    save_game_data(data, os.path.join(archive_root, DEFAULT_DATE, GAME_DATA_FILE_NAME))
+    assert source.get_game_data() == data
+    assert source.authoritative
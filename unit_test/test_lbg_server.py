@@ -0,0 +1,207 @@
+import http.client
+import json
+import os
+import socket
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from lbg_server import *
+
+from pytest import fixture, raises
+
+DEFAULT_SETS = ["abc", "def", "ghi", "jkl"]
+DEFAULT_DICTIONARY = ["adgjbehk", "kcfil", "kcf", "fil"]
+# The resident dictionary: the board's words plus ones that don't fit it
+ENGLISH_WORDS = DEFAULT_DICTIONARY + ["abc", "hello", "adgjbehkcfil"]
+
+
+@fixture
+def service():
+    return SolverService(DictionaryIndex(ENGLISH_WORDS), cache_size=2)
+
+
+@fixture
+def server(service):
+    httpd = make_server(service, "127.0.0.1", 0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def post(conn: http.client.HTTPConnection, path: str, body) -> tuple:
+    conn.request("POST", path, body=json.dumps(body), headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_validate_sides():
+    assert validate_sides(["ABC", "def", "ghi", "jkl"]) == DEFAULT_SETS
+    assert validate_sides(["abcd", "efgh", "ijkl"]) == ["abcd", "efgh", "ijkl"]
+    with raises(ValueError):
+        validate_sides(["abc"])
+    with raises(ValueError):
+        validate_sides(["abc", "def", "ghi", "jk"])
+    with raises(ValueError):
+        validate_sides(["abc", "def", "ghi", "jka"])
+    with raises(ValueError):
+        validate_sides("abcdefghijkl")
+
+
+def test_solve(service):
+    response = service.solve({"sides": DEFAULT_SETS, "dictionary": DEFAULT_DICTIONARY, "par": 3})
+    assert sorted(response["solutions"]) == [["adgjbehk", "kcf", "fil"], ["adgjbehk", "kcfil"]]
+    assert response["num_candidates"] == 4
+    assert response["finished"]
+    assert response["coverage_estimate"] == 1.0
+    assert not response["cached"]
+
+    # Only the board's words are taken from the english dictionary
+    response = service.solve({"sides": DEFAULT_SETS, "par": 2})
+    assert response["num_candidates"] == 5
+    assert sorted(response["solutions"]) == [["adgjbehk", "kcfil"], ["adgjbehkcfil"]]
+
+    response = service.solve({"sides": DEFAULT_SETS, "par": 3, "order": "length", "limit": 1})
+    assert response["solutions"] == [["adgjbehkcfil"]]
+    assert not response["finished"]
+    assert response["coverage_estimate"] is None
+
+    response = service.solve({"sides": DEFAULT_SETS, "par": 3, "mode": "monte-carlo", "seed": 1, "counter": 20})
+    assert ["adgjbehkcfil"] in response["solutions"]
+    assert 0 < response["coverage_estimate"] <= 1
+
+    # A board that can't be solved still ends
+    response = service.solve({"sides": DEFAULT_SETS, "dictionary": ["kcf"], "par": 3, "mode": "monte-carlo"})
+    assert response["solutions"] == []
+
+
+def test_solve_errors(service):
+    with raises(ValueError):
+        service.solve({"sides": DEFAULT_SETS})
+    with raises(ValueError):
+        service.solve({"sides": DEFAULT_SETS, "par": 3, "mode": "fastest"})
+    with raises(ValueError):
+        service.solve({"sides": DEFAULT_SETS, "par": 3, "limit": "all"})
+    with raises(ValueError):
+        service.solve({"sides": DEFAULT_SETS, "par": 3, "dictionary": "kcfil"})
+    for word in ("", "kc"):
+        with raises(ValueError):
+            service.solve({"sides": DEFAULT_SETS, "par": 3, "dictionary": DEFAULT_DICTIONARY + [word]})
+    for time_budget in (True, -1, "-1s", "nan"):
+        with raises(ValueError):
+            service.solve({"sides": DEFAULT_SETS, "par": 3, "time_budget": time_budget})
+    with raises(ValueError):
+        service.solve({"sides": DEFAULT_SETS, "par": 3, "mode": "monte-carlo", "seed": [1]})
+
+
+def test_index_cache(service):
+    first, cached = service.candidate_index(DEFAULT_SETS)
+    assert not cached
+    again, cached = service.candidate_index(DEFAULT_SETS)
+    assert cached and again is first
+
+    # The same words in another order are the same board
+    given, cached = service.candidate_index(DEFAULT_SETS, DEFAULT_DICTIONARY)
+    assert not cached and given is not first
+    assert service.candidate_index(DEFAULT_SETS, list(reversed(DEFAULT_DICTIONARY)))[0] is given
+
+    # Least recently used goes first
+    service.candidate_index(["mno", "pqr", "stu", "vwx"])
+    assert service.candidate_index(DEFAULT_SETS, DEFAULT_DICTIONARY)[1]
+    assert not service.candidate_index(DEFAULT_SETS)[1]
+    assert service.status()["cached_boards"] == 2
+
+
+def test_http(server):
+    conn = http.client.HTTPConnection(*server)
+    request = {"sides": DEFAULT_SETS, "dictionary": DEFAULT_DICTIONARY, "par": 2}
+
+    status, body = post(conn, "/solve", request)
+    assert status == 200
+    assert body["solutions"] == [["adgjbehk", "kcfil"]]
+    assert not body["cached"]
+
+    # Same connection, second request is served from the cache
+    status, body = post(conn, "/solve", request)
+    assert status == 200 and body["cached"]
+
+    status, body = post(conn, "/solve", {"sides": ["abc"], "par": 2})
+    assert status == 400 and "sides" in body["error"]
+
+    conn.request("POST", "/solve", body="not json")
+    response = conn.getresponse()
+    assert response.status == 400
+    response.read()
+
+    status, body = post(conn, "/solve", {"sides": DEFAULT_SETS, "par": 2, "mode": "monte-carlo", "seed": [1]})
+    assert status == 400 and "seed" in body["error"]
+
+    conn.request("GET", "/status")
+    response = conn.getresponse()
+    assert response.status == 200
+    status = json.loads(response.read())
+    assert status["dictionary_words"] == len(ENGLISH_WORDS)
+    assert status["cache_hits"] == 1
+    conn.close()
+
+
+def test_http_internal_error(server, service, monkeypatch):
+    def broken(request):
+        raise TypeError("broken")
+
+    monkeypatch.setattr(service, "solve", broken)
+    conn = http.client.HTTPConnection(*server)
+    status, body = post(conn, "/solve", {"sides": DEFAULT_SETS, "par": 2})
+    assert status == 500 and "broken" in body["error"]
+    # The connection is still good
+    conn.request("GET", "/status")
+    response = conn.getresponse()
+    assert response.status == 200
+    response.read()
+    conn.close()
+
+
+def test_concurrent_requests(server):
+    requests = [{"sides": DEFAULT_SETS, "par": n} for n in (1, 2, 3)] * 4
+
+    def solve(request):
+        conn = http.client.HTTPConnection(*server)
+        try:
+            return post(conn, "/solve", request)
+        finally:
+            conn.close()
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(solve, requests))
+    assert all(status == 200 for status, _ in results)
+    for request, (_, body) in zip(requests, results):
+        assert all(len(s) <= request["par"] for s in body["solutions"])
+        assert ["adgjbehkcfil"] in body["solutions"]
+
+
+def test_unix_socket(service):
+    path = os.path.join(tempfile.mkdtemp(), "lbg.sock")
+    httpd = make_server(service, unix_socket=path)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(path)
+        body = json.dumps({"sides": DEFAULT_SETS, "par": 1}).encode()
+        sock.sendall(
+            b"POST /solve HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        data = b""
+        while chunk := sock.recv(4096):
+            data += chunk
+        sock.close()
+        head, _, payload = data.partition(b"\r\n\r\n")
+        assert head.startswith(b"HTTP/1.1 200")
+        assert json.loads(payload)["solutions"] == [["adgjbehkcfil"]]
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        os.remove(path)
@@ -0,0 +1,102 @@
+import json
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lbg_site_scraper import *
+
+from pytest import fixture, raises
+
+GAME_DATA = {
+    "sides": ["ABC", "DEF", "GHI", "JKL"],
+    "dictionary": ["ADGJBEHK", "KCFIL"],
+    "par": 3,
+    "ourSolution": ["ADGJBEHK", "KCFIL"],
+    "date": "2024-01-01",
+    "printDate": "January 1, 2024",
+}
+# Trimmed down copy of the page, with the gameData script among the others
+SAVED_PAGE = (
+    '<html><head><script>window.otherData = {"a": 1};</script></head><body>'
+    '<div id="js-hook-pz-moment__game"><script type="text/javascript">window.gameData = '
+    + json.dumps(GAME_DATA)
+    + '</script></div><script>var x = "{";</script></body></html>'
+)
+
+
+class SavedPageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pages = {
+        "/puzzles/letter-boxed": SAVED_PAGE.encode(),
+        "/no-game-data": b"<html><script>window.somethingElse = {}</script></html>",
+    }
+    # (client address, path) of every request
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.client_address, self.path))
+        if self.path == "/moved":
+            self.send_response(301)
+            self.send_header("Location", "/puzzles/letter-boxed")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = self.pages.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        body = gzip.compress(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), SavedPageHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    SavedPageHandler.requests = []
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_extract_game_data():
+    data = extract_game_data(SAVED_PAGE)
+    assert data == {
+        "sides": ["abc", "def", "ghi", "jkl"],
+        "dictionary": ["adgjbehk", "kcfil"],
+        "par": 3,
+        "ourSolution": ["adgjbehk", "kcfil"],
+        "date": "2024-01-01",
+    }
+    with raises(ValueError):
+        extract_game_data("<html></html>")
+    with raises(ValueError):
+        extract_game_data("window.gameData = {\"sides\": [\"ABC\"]}")
+
+
+def test_fetcher(server):
+    fetcher = GameDataFetcher(server + "/puzzles/letter-boxed")
+    assert fetcher.fetch() == extract_game_data(SAVED_PAGE)
+    assert fetcher.prefetch().result() == extract_game_data(SAVED_PAGE)
+    fetcher.close()
+
+    # Both requests went over the same connection
+    assert len(set(address for address, _ in SavedPageHandler.requests)) == 1
+
+    assert fetch_lbg_data(GameDataFetcher(server + "/moved"), fallback=False)["par"] == 3
+
+
+def test_fetcher_errors(server):
+    with raises(ValueError):
+        fetch_lbg_data(GameDataFetcher(server + "/no-game-data"), fallback=False)
+    with raises(OSError):
+        fetch_lbg_data(GameDataFetcher(server + "/missing"), fallback=False)
@@ -0,0 +1,24 @@
+from lbg_solution_store import *
+
+
+def test_solution_store():
+    store = SolutionStore(["abc", "cde"])
+    assert store.add(["abc", "cde"])
+    assert store.add(["efg"])
+    assert store.add(["cde", "abc", "efg"])
+    assert not store.add(["abc", "cde"])
+
+    assert len(store) == 3
+    assert ["abc", "cde"] in store
+    assert ["cde", "abc"] not in store
+    assert ["xyz"] not in store
+    assert store.words == ["abc", "cde", "efg"]
+
+    assert list(store) == [["abc", "cde"], ["efg"], ["cde", "abc", "efg"]]
+    assert store.lengths() == [1, 2, 3]
+    assert store.count(2) == 1
+    assert store.count(5) == 0
+    assert list(store.solutions(3)) == [["cde", "abc", "efg"]]
+    assert list(store.solutions(5)) == []
+
+    assert store.key(["abc", "cde"]) != store.key(["cde", "abc"])
@@ -0,0 +1,151 @@
+from lbg_solver import *
+
+DEFAULT_SUPER_SET = "abcdefghijkl"
+DEFAULT_CANDIDATES = ["adgjbehk", "kcfil", "kcf", "fil"]
+
+
+def test_word_mask():
+    index = CandidateIndex(DEFAULT_CANDIDATES, DEFAULT_SUPER_SET)
+    assert index.word_mask("abc") == 0b111
+    assert index.word_mask("lll") == 1 << 11
+    assert index.full_mask == (1 << 12) - 1
+    assert index.by_first["k"] == [1, 2]
+
+
+def test_large_board():
+    # 24 letters: six sides of four
+    super_set = "abcdefghijklmnopqrstuvwx"
+    words = ["aeimqu", "ubfjnrvcgkoswdhlptx", "ubfjnrvcgk", "kosw", "wdhlptx"]
+    index = CandidateIndex(words, super_set)
+    assert index.full_mask == (1 << 24) - 1
+    assert index.word_mask("x") == 1 << 23
+
+    assert sorted(exhaustive_solutions(index, 4)) == [
+        ["aeimqu", "ubfjnrvcgk", "kosw", "wdhlptx"],
+        ["aeimqu", "ubfjnrvcgkoswdhlptx"],
+    ]
+    assert next(shortest_solutions(index, 4)) == ["aeimqu", "ubfjnrvcgkoswdhlptx"]
+
+
+def test_exhaustive_solutions():
+    index = CandidateIndex(DEFAULT_CANDIDATES, DEFAULT_SUPER_SET)
+
+    sols = list(exhaustive_solutions(index, 2))
+    assert sols == [["adgjbehk", "kcfil"]]
+
+    sols = list(exhaustive_solutions(index, 3))
+    assert len(sols) == 2
+    assert ["adgjbehk", "kcf", "fil"] in sols
+
+    assert list(exhaustive_solutions(index, 1)) == []
+    assert list(exhaustive_solutions(index, 0)) == []
+
+
+def test_parallel_solutions():
+    index = CandidateIndex(DEFAULT_CANDIDATES, DEFAULT_SUPER_SET)
+    serial = list(exhaustive_solutions(index, 3))
+    parallel = list(parallel_solutions(index, 3, 2))
+    assert sorted(parallel) == sorted(serial)
+
+
+def test_shortest_solutions():
+    index = CandidateIndex(DEFAULT_CANDIDATES + ["adgjbehkcfil"], DEFAULT_SUPER_SET)
+    everything = sorted(exhaustive_solutions(index, 3), key=lambda s: len("".join(s)))
+
+    shortest = list(shortest_solutions(index, 3))
+    assert shortest[0] == ["adgjbehkcfil"]
+    assert [len("".join(s)) for s in shortest] == [len("".join(s)) for s in everything]
+
+    assert list(shortest_solutions(index, 3, k=2)) == shortest[:2]
+    assert list(shortest_solutions(index, 2, k=5)) == [["adgjbehkcfil"], ["adgjbehk", "kcfil"]]
+
+
+def test_solutions_by_word_count():
+    index = CandidateIndex(DEFAULT_CANDIDATES + ["adgjbehkcfil"], DEFAULT_SUPER_SET)
+    sols = list(solutions_by_word_count(index, 3))
+    assert [len(s) for s in sols] == sorted(len(s) for s in sols)
+    assert sorted(sols) == sorted(exhaustive_solutions(index, 3))
+
+
+def test_random_walk():
+    index = CandidateIndex(DEFAULT_CANDIDATES, DEFAULT_SUPER_SET)
+    rng = random.Random(0)
+    walks = [random_walk(index, 3, rng) for _ in range(200)]
+    # Only walks starting with adgjbehk get anywhere, and kcfil covers all that is
+    # left after it, so the walker always prefers it over kcf
+    assert set(tuple(w) for w in walks if w is not None) == {("adgjbehk", "kcfil")}
+    assert walks.count(None) > 0
+
+    assert random_walk(index, 1, rng) is None
+    assert random_walk(index, 0, rng) is None
+
+
+def test_shortest_solution():
+    index = CandidateIndex(DEFAULT_CANDIDATES + ["lbadgj", "jehkcfi"], DEFAULT_SUPER_SET)
+    for max_words in (1, 2, 3):
+        expected = next(shortest_solutions(index, max_words), None)
+        found = shortest_solution(index, max_words)
+        assert (found is None) == (expected is None)
+        if found is not None:
+            assert len("".join(found)) == len("".join(expected))
+            assert len(found) <= max_words
+    assert len("".join(shortest_solution(index, 3))) == 13
+
+    # Three words are needed, found by growing the chains a layer at a time
+    index = CandidateIndex(["adgjbeh", "hkcf", "fil", "adgjbehk"], DEFAULT_SUPER_SET)
+    assert shortest_solution(index, 2) is None
+    assert shortest_solution(index, 3) == ["adgjbeh", "hkcf", "fil"]
+
+
+
+def test_shortest_solution_in_chunks(monkeypatch):
+    # One chain at a time gives the same answers as all of them at once
+    index = CandidateIndex(["adgjbeh", "hkcf", "fil", "adgjbehk", "hkc", "cfil", "hk", "kcfi", "ilf"], DEFAULT_SUPER_SET)
+    expected = [shortest_solution(index, n) for n in (3, 4, 5)]
+    monkeypatch.setattr("lbg_solver.GROW_CHUNK_CELLS", 1)
+    assert [shortest_solution(index, n) for n in (3, 4, 5)] == expected
+    assert len("".join(expected[0])) == len("".join(next(shortest_solutions(index, 3))))
+    assert shortest_solution(index, 1) is None
+
+    # No superset table on boards this big
+    words = ["aeimqu", "ubfjnrvcgkoswdhlptx", "ubfjnrvcgk", "kosw", "wdhlptx"]
+    index = CandidateIndex(words, "abcdefghijklmnopqrstuvwx")
+    assert shortest_solution(index, 4) == ["aeimqu", "ubfjnrvcgkoswdhlptx"]
+    assert shortest_solution(index, 1) is None
+
+
+def test_ruled_out():
+    index = CandidateIndex(DEFAULT_CANDIDATES, DEFAULT_SUPER_SET)
+    assert not ruled_out(index, 2)
+    assert ruled_out(index, 1)
+    assert ruled_out(index, 0)
+    # No word has the l
+    assert ruled_out(CandidateIndex(["adgjbehk", "kcf"], DEFAULT_SUPER_SET), 5)
+    # Every letter is in a word, but nothing follows on from "kcfil"
+    assert ruled_out(CandidateIndex(["kcfil", "adgjbeh"], DEFAULT_SUPER_SET), 4)
+    assert not ruled_out(CandidateIndex(["adgjbeh", "hkcf", "fil"], DEFAULT_SUPER_SET), 3)
+    assert ruled_out(CandidateIndex(["adgjbeh", "hkcf", "fil"], DEFAULT_SUPER_SET), 2)
+
+
+def test_count_two_word_solutions():
+    for words, super_set in (
+        (DEFAULT_CANDIDATES + ["lbadgj", "jehkcfi", "kcfila"], DEFAULT_SUPER_SET),
+        (["aeimqu", "ubfjnrvcgkoswdhlptx", "uaeimq", "ubfjnrvcgk", "kosw"], "abcdefghijklmnopqrstuvwx"),
+    ):
+        index = CandidateIndex(words, super_set)
+        assert count_two_word_solutions(index) == len(list(exhaustive_chains(index, 2, min_words=2)))
+    assert count_two_word_solutions(CandidateIndex(["kcf"], DEFAULT_SUPER_SET)) == 0
+
+
+def test_monte_carlo_solutions():
+    index = CandidateIndex(DEFAULT_CANDIDATES, DEFAULT_SUPER_SET)
+    rng = random.Random(1)
+    hits = {}
+    sols = list(monte_carlo_solutions(index, 3, 50, rng=rng, hits=hits))
+    # The walker always prefers kcfil over kcf, see test_random_walk()
+    assert sols == [["adgjbehk", "kcfil"]]
+    assert hits[("adgjbehk", "kcfil")] >= 2
+
+    # Known solutions aren't new, and a board without any still ends
+    assert list(monte_carlo_solutions(index, 3, 50, rng=rng, known=sols)) == []
+    assert list(monte_carlo_solutions(CandidateIndex(["kcf"], DEFAULT_SUPER_SET), 3, 10)) == []
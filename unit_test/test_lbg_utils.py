@@ -0,0 +1,25 @@
+from lbg_utils import *
+
+
+def test_decode():
+    lines = ["['abc', 'cde']\n", "['it\\'s', 'sat']\n", "[]\n"]
+    assert decode(lines) == [["abc", "cde"], ["it's", "sat"], []]
+    assert decode([]) == ""
+
+
+def test_good_turing_coverage():
+    assert good_turing_coverage({}) is None
+    assert good_turing_coverage({("a",): 2, ("b",): 1, ("c",): 1}) == 0.5
+    assert good_turing_coverage({("a",): 3}) == 1
+
+
+def test_parse_duration():
+    assert parse_duration("200ms") == 0.2
+    assert parse_duration("2s") == 2
+    assert parse_duration("1.5m") == 90
+    assert parse_duration("0.5") == 0.5
+
+
+def test_parse_geometry():
+    assert parse_geometry("5x4") == (5, 4)
+    assert parse_geometry("4X3") == (4, 3)
@@ -1,18 +1,31 @@
 from letter_box_game import *
+from lbg_puzzle_source import ExplicitSource
+from lbg_archive import SolutionArchive
 from shutil import rmtree
 
-from pytest import fixture
+from pytest import fixture, raises
 
 # DEFAULT_LBG = LetterBoxGame()
 DEFAULT_SETS = ["abc", "def", "ghi", "jkl"]
 DEFAULT_SETS_2 = ["mno", "pqr", "stu", "vwx"]
+DEFAULT_DICTIONARY = ["adgjbehk", "kcfil", "kcf", "fil"]
+# Five sides of four letters
+LARGE_SETS = ["abcd", "efgh", "ijkl", "mnop", "qrst"]
+LARGE_DICTIONARY = ["aeimq", "qbfjnrcgkosdhlpt", "qbfjnrcgko", "osdhlpt"]
 
 TEST_SOLUTION_ARCHIVE_PATH = os.path.join(os.environ['HOME'], 'LetterBoxed/unit_test/test_archive')
 
 
+def solution_store(solutions):
+    store = SolutionStore()
+    for s in solutions:
+        store.add(s)
+    return store
+
+
 @fixture(scope="module")
 def default_lbg():
-    lbg = LetterBoxGame()
+    lbg = LetterBoxGame(ExplicitSource(DEFAULT_SETS, DEFAULT_DICTIONARY, 5))
     lbg.letter_sets = DEFAULT_SETS
     lbg.super_set = ''.join(lbg.letter_sets)
     yield lbg
@@ -61,69 +74,165 @@ def test_save_solution_file(default_lbg, test_archive_path):
 
     default_lbg.solution_path = TEST_SOLUTION_ARCHIVE_PATH
 
-    default_lbg.solutions = [['a','b'],['c','d','e'],['f','g','h','i']]
+    default_lbg.solutions = solution_store([['a','b'],['c','d','e'],['f','g','h','i']])
 
     default_lbg.save_solution_file(2)
-    with open(default_lbg.solution_path + f'/length_2_solutions.txt', 'r') as f:
-        lines = [s.strip('\n') for s in f.readlines()]
-        assert len(lines) == 1
-        assert lines[0] == "['a', 'b']"
+    assert SolutionArchive(default_lbg.solution_path).read(2) == [['a', 'b']]
 
     default_lbg.save_solution_file(3)
-    with open(default_lbg.solution_path + f'/length_3_solutions.txt', 'r') as f:
-        lines = [s.strip('\n') for s in f.readlines()]
-        assert len(lines) == 1
-        assert lines[0] == "['c', 'd', 'e']"
+    assert SolutionArchive(default_lbg.solution_path).read(3) == [['c', 'd', 'e']]
 
     default_lbg.save_solution_file(4)
-    with open(default_lbg.solution_path + f'/length_4_solutions.txt', 'r') as f:
-        lines = [s.strip('\n') for s in f.readlines()]
-        assert len(lines) == 1
-        assert lines[0] == "['f', 'g', 'h', 'i']"
+    assert SolutionArchive(default_lbg.solution_path).read(4) == [['f', 'g', 'h', 'i']]
 
     default_lbg.save_solution_file(2)
     default_lbg.save_solution_file(3)
     default_lbg.save_solution_file(4)
 
-    with open(default_lbg.solution_path + f'/length_2_solutions.txt', 'r') as f:
-        lines = [s.strip('\n') for s in f.readlines()]
-        assert len(lines) == 1
-        assert lines[0] == "['a', 'b']"
+    assert SolutionArchive(default_lbg.solution_path).read(2) == [['a', 'b']]
     
-    with open(default_lbg.solution_path + f'/length_3_solutions.txt', 'r') as f:
-        lines = [s.strip('\n') for s in f.readlines()]
-        assert len(lines) == 1
-        assert lines[0] == "['c', 'd', 'e']"
+    assert SolutionArchive(default_lbg.solution_path).read(3) == [['c', 'd', 'e']]
 
-    with open(default_lbg.solution_path + f'/length_4_solutions.txt', 'r') as f:
-        lines = [s.strip('\n') for s in f.readlines()]
-        assert len(lines) == 1
-        assert lines[0] == "['f', 'g', 'h', 'i']"
+    assert SolutionArchive(default_lbg.solution_path).read(4) == [['f', 'g', 'h', 'i']]
 
     for i in range(10):
         default_lbg.save_solution_file(2)
         default_lbg.save_solution_file(3)
         default_lbg.save_solution_file(4)
 
-    with open(default_lbg.solution_path + f'/length_2_solutions.txt', 'r') as f:
-        lines = [s.strip('\n') for s in f.readlines()]
-        assert len(lines) == 1
-        assert lines[0] == "['a', 'b']"
+    assert SolutionArchive(default_lbg.solution_path).read(2) == [['a', 'b']]
     
-    with open(default_lbg.solution_path + f'/length_3_solutions.txt', 'r') as f:
-        lines = [s.strip('\n') for s in f.readlines()]
-        assert len(lines) == 1
-        assert lines[0] == "['c', 'd', 'e']"
+    assert SolutionArchive(default_lbg.solution_path).read(3) == [['c', 'd', 'e']]
 
-    with open(default_lbg.solution_path + f'/length_4_solutions.txt', 'r') as f:
-        lines = [s.strip('\n') for s in f.readlines()]
-        assert len(lines) == 1
-        assert lines[0] == "['f', 'g', 'h', 'i']"
+    assert SolutionArchive(default_lbg.solution_path).read(4) == [['f', 'g', 'h', 'i']]
 
-    default_lbg.solutions = [['x', 'y', 'z']]
+    default_lbg.solutions = solution_store([['x', 'y', 'z']])
     default_lbg.save_solution_file(3)
-    with open(default_lbg.solution_path + f'/length_3_solutions.txt', 'r') as f:
-        lines = [s.strip('\n') for s in f.readlines()]
-        assert len(lines) == 2
-        assert lines[1] == "['x', 'y', 'z']"
-    
\ No newline at end of file
+    sols = SolutionArchive(default_lbg.solution_path).read(3)
+    assert len(sols) == 2
+    assert sols[1] == ['x', 'y', 'z']
+    
+def test_iter_solutions():
+    lbg = LetterBoxGame(ExplicitSource(DEFAULT_SETS, DEFAULT_DICTIONARY, 3))
+
+    first = list(itertools.islice(lbg.iter_solutions(order="words"), 1))
+    assert first == [["adgjbehk", "kcfil"]]
+    assert list(lbg.solutions) == first
+    assert lbg.best_sols == first
+
+    # Only solutions that weren't found yet are handed out
+    assert list(lbg.iter_solutions(order="length")) == [["adgjbehk", "kcf", "fil"]]
+    lbg.solve_mode = "exhaustive"
+    assert list(lbg.iter_solutions()) == []
+    assert len(lbg.solutions) == 2
+
+
+def test_time_budget():
+    lbg = LetterBoxGame(ExplicitSource(DEFAULT_SETS, DEFAULT_DICTIONARY, 3))
+    lbg.solve_mode = "exhaustive"
+    assert list(lbg.iter_solutions(deadline=time.time() - 1)) == []
+    assert lbg.coverage_estimate is None
+    assert len(list(lbg.iter_solutions())) == 2
+    assert lbg.coverage_estimate == 1.0
+
+    # Monte carlo samples until the deadline, however often it repeats itself
+    lbg.solve_mode = "monte-carlo"
+    lbg.break_out_counter = 0
+    start = time.time()
+    assert list(lbg.iter_solutions(deadline=start + 0.2)) == []
+    assert 0.2 <= time.time() - start < 1
+    assert lbg.coverage_estimate == 1
+
+
+def test_metrics():
+    lbg = LetterBoxGame(ExplicitSource(DEFAULT_SETS, DEFAULT_DICTIONARY, 3))
+    lbg.metrics = SolveMetrics()
+    lbg.break_out_counter = 5
+    assert len(list(lbg.iter_solutions())) == len(lbg.solutions)
+
+    counters = lbg.metrics.counters
+    nothing_new = counters.get("dead_ends", 0) + counters.get("duplicate_hits", 0)
+    assert counters["iterations"] == nothing_new + len(lbg.solutions)
+    # The last 6 walks found nothing new
+    assert nothing_new >= 6
+    assert lbg.metrics.timers["random_walk"] > 0
+
+
+def test_online_stats():
+    lbg = LetterBoxGame(ExplicitSource(DEFAULT_SETS, DEFAULT_DICTIONARY + ["adgjbehkcfil"], 3))
+    for _ in lbg.iter_solutions(order="words"):
+        pass
+
+    stats = lbg.stats
+    assert stats.total_num_sols == len(lbg.solutions) == 3
+    assert stats.num_solutions == {1: 1, 2: 1, 3: 1}
+    assert stats.len_solutions[2] == (13, 13)
+    assert stats.best_solutions[3] == (["adgjbehk", "kcf", "fil"], ["adgjbehk", "kcf", "fil"])
+    assert stats.histograms[2] == {13: 1}
+    assert "Total Lengths of 2-Solutions: {13: 1}" in str(stats)
+
+    stats.add(["adgjbehk", "kcfil", "lfi"])
+    stats.add(["adgjbehk", "kc", "cfil"])
+    assert stats.len_solutions[3] == (14, 16)
+    # Ties go to the first one found
+    assert stats.best_solutions[3] == (["adgjbehk", "kcf", "fil"], ["adgjbehk", "kcfil", "lfi"])
+    assert stats.histograms[3] == {14: 2, 16: 1}
+
+    lbg.reset_stats()
+    assert stats.total_num_sols == 0
+    assert stats.len_solutions[2] is None
+
+
+def test_explicit_dictionary_checked():
+    # "hello" has letters that aren't on the board, "abc" two letters of one side in a row
+    lbg = LetterBoxGame(ExplicitSource(DEFAULT_SETS, DEFAULT_DICTIONARY + ["hello", "abc", ""], 3))
+    assert sorted(lbg.candidate_set) == sorted(DEFAULT_DICTIONARY)
+    lbg.solve_mode = "exhaustive"
+    lbg.solve(save=False)
+    assert sorted(lbg.solutions) == [["adgjbehk", "kcf", "fil"], ["adgjbehk", "kcfil"]]
+
+
+def test_unsolvable_monte_carlo():
+    # Every walk dead-ends, which ends the search like repeats do
+    lbg = LetterBoxGame(ExplicitSource(DEFAULT_SETS, ["flag", "kcf"], 4))
+    lbg.break_out_counter = 10
+    assert list(lbg.iter_solutions()) == []
+
+
+def test_board_geometry():
+    assert board_geometry(DEFAULT_SETS) == (4, 3)
+    assert board_geometry(LARGE_SETS) == (5, 4)
+    for sides in (["abc"], ["abc", "de"], ["abc", "cde"], ["abc", "de1"], "abcdef"):
+        with raises(ValueError):
+            board_geometry(sides)
+    with raises(ValueError):
+        LetterBoxGame(ExplicitSource(["abc", "def", "ghi", "jkla"], DEFAULT_DICTIONARY, 3))
+
+
+def test_large_board(tmp_path):
+    stats_path = str(tmp_path / "stats.csv")
+    lbg = LetterBoxGame(ExplicitSource(LARGE_SETS, LARGE_DICTIONARY, 3), solution_path=str(tmp_path), stats_file_path=stats_path)
+    assert lbg.letter_sets == LARGE_SETS
+    assert (lbg.num_letter_sets, lbg.letter_set_len) == (5, 4)
+    assert lbg.candidate_set[0] == "qbfjnrcgkosdhlpt"
+    assert lbg.super_set_coverage("qbfjnrcgkosdhlpt") == 16
+    assert lbg.super_set_coverage("xyz") == 0
+
+    assert lbg.does_solution_cover_all_letters(["aeimq", "qbfjnrcgkosdhlpt"])
+    assert lbg.letters_to_cover == ""
+    assert not lbg.does_solution_cover_all_letters(["aeimq", "qbfjnrcgko"])
+    assert lbg.letters_to_cover == "dhlpst"
+
+    lbg.solve_mode = "exhaustive"
+    lbg.solve(save=False)
+    assert sorted(lbg.solutions) == [
+        ["aeimq", "qbfjnrcgko", "osdhlpt"],
+        ["aeimq", "qbfjnrcgkosdhlpt"],
+    ]
+    assert lbg.stats.board == (5, 4)
+    assert "Board: (5, 4)" in str(lbg.stats)
+
+    # The shape goes in the stats row too, 20 letters alone could be 4x5 as well
+    lbg.save_stats()
+    with open(stats_path) as f:
+        assert f.read().rstrip("\n").split(",")[-1] == "5x4"